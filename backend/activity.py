@@ -0,0 +1,46 @@
+from sqlalchemy import (BigInteger, Column, DateTime, Float, ForeignKey,
+                        Index, Integer, Numeric, String, Text, Time)
+from sqlalchemy.sql import func
+from database import Base
+
+
+class Activity(Base):
+    """Itinerary activity on one day of a trip"""
+
+    __tablename__ = "activities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"),
+                     nullable=False)
+    day_number = Column(Integer, nullable=False)
+    # Sparse position within the day, see ordering.py
+    order_key = Column(BigInteger, nullable=False)
+
+    name = Column(String(255), nullable=False)
+    start_time = Column(Time, nullable=True)
+    location = Column(String(255), nullable=True)
+    activity_type = Column(String(50), nullable=True)
+    cost = Column(Numeric(12, 2), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Z-order key of (latitude, longitude), see geo.py
+    geo_key = Column(BigInteger, nullable=True)
+
+    created_at = Column(DateTime(timezone=True),
+                        server_default=func.now())
+    updated_at = Column(DateTime(timezone=True),
+                        server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Itinerary reads: a trip's activities by day, in order
+        Index("ix_activities_trip_day_order",
+              "trip_id", "day_number", "order_key"),
+        # Nearby / map viewport reads: a trip's activities by location
+        Index("ix_activities_trip_geo", "trip_id", "geo_key"),
+    )
+
+    def __repr__(self):
+        return (f"<Activity(id={self.id}, trip_id={self.trip_id}, "
+                f"day={self.day_number}, name={self.name})>")
@@ -8,6 +8,12 @@ from alembic import context
 from config import settings
 from database import Base
 import user  # noqa: F401 — register model metadata
+import revoked_token  # noqa: F401
+import trip  # noqa: F401
+import activity  # noqa: F401
+import expense  # noqa: F401
+import budget_rollup  # noqa: F401
+import trip_share  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
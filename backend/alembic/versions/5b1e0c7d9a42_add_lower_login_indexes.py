@@ -0,0 +1,40 @@
+"""add_lower_login_indexes
+
+Revision ID: 5b1e0c7d9a42
+Revises: 263441f71106
+Create Date: 2026-10-18 09:12:40.118204
+
+Lower-cases stored emails and adds unique lower() indexes on email and
+username so login lookups are case-insensitive and index-backed. The
+upgrade fails if two existing rows differ only by case; resolve those
+accounts by hand first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e0c7d9a42'
+down_revision: Union[str, None] = '263441f71106'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE users SET email = lower(email)")
+    op.create_index(
+        'ix_users_email_lower', 'users', [sa.text('lower(email)')],
+        unique=True,
+    )
+    op.create_index(
+        'ix_users_username_lower', 'users',
+        [sa.text('lower(username)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index('ix_users_email_lower', table_name='users')
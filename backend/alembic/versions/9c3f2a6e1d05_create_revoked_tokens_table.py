@@ -0,0 +1,42 @@
+"""create_revoked_tokens_table
+
+Revision ID: 9c3f2a6e1d05
+Revises: 5b1e0c7d9a42
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f2a6e1d05'
+down_revision: Union[str, None] = '5b1e0c7d9a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('jti', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column(
+            'expires_at', sa.DateTime(timezone=True), nullable=False
+        ),
+        sa.PrimaryKeyConstraint('jti'),
+    )
+    op.create_index(
+        op.f('ix_revoked_tokens_expires_at'), 'revoked_tokens',
+        ['expires_at'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_revoked_tokens_expires_at'),
+        table_name='revoked_tokens',
+    )
+    op.drop_table('revoked_tokens')
@@ -0,0 +1,42 @@
+"""add_activity_locations
+
+Revision ID: a9d5e3c7f1b2
+Revises: f3b86d2e9a14
+Create Date: 2026-10-18 19:03:21.774180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d5e3c7f1b2'
+down_revision: Union[str, None] = 'f3b86d2e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'activities', sa.Column('latitude', sa.Float(), nullable=True)
+    )
+    op.add_column(
+        'activities', sa.Column('longitude', sa.Float(), nullable=True)
+    )
+    op.add_column(
+        'activities', sa.Column('geo_key', sa.BigInteger(), nullable=True)
+    )
+    op.create_index(
+        'ix_activities_trip_geo', 'activities', ['trip_id', 'geo_key'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activities_trip_geo', table_name='activities')
+    with op.batch_alter_table('activities') as batch_op:
+        batch_op.drop_column('geo_key')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -0,0 +1,66 @@
+"""create_trips_table
+
+Revision ID: b7d41e8f2c63
+Revises: 9c3f2a6e1d05
+Create Date: 2026-10-18 12:24:51.207336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e8f2c63'
+down_revision: Union[str, None] = '9c3f2a6e1d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'trips',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column(
+            'destination', sa.String(length=255), nullable=False
+        ),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column(
+            'budget', sa.Numeric(precision=12, scale=2), nullable=True
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'),
+            nullable=True,
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ['user_id'], ['users.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_trips_id'), 'trips', ['id'], unique=False,
+    )
+    op.create_index(
+        'ix_trips_user_start_id', 'trips',
+        ['user_id', 'start_date', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trips_user_start_id', table_name='trips')
+    op.drop_index(op.f('ix_trips_id'), table_name='trips')
+    op.drop_table('trips')
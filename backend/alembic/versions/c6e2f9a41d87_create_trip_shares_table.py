@@ -0,0 +1,49 @@
+"""create_trip_shares_table
+
+Revision ID: c6e2f9a41d87
+Revises: a9d5e3c7f1b2
+Create Date: 2026-10-18 21:14:05.318422
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2f9a41d87'
+down_revision: Union[str, None] = 'a9d5e3c7f1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'trip_shares',
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'permission_level', sa.String(length=10), nullable=False
+        ),
+        sa.Column(
+            'created_at', sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ['trip_id'], ['trips.id'], ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(
+            ['user_id'], ['users.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('trip_id', 'user_id'),
+    )
+    op.create_index(
+        'ix_trip_shares_user_trip', 'trip_shares',
+        ['user_id', 'trip_id', 'permission_level'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trip_shares_user_trip', table_name='trip_shares')
+    op.drop_table('trip_shares')
@@ -0,0 +1,70 @@
+"""create_activities_table
+
+Revision ID: d2a85c1f7e30
+Revises: b7d41e8f2c63
+Create Date: 2026-10-18 14:05:33.861502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a85c1f7e30'
+down_revision: Union[str, None] = 'b7d41e8f2c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'activities',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('day_number', sa.Integer(), nullable=False),
+        sa.Column('order_key', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=True),
+        sa.Column('location', sa.String(length=255), nullable=True),
+        sa.Column(
+            'activity_type', sa.String(length=50), nullable=True
+        ),
+        sa.Column(
+            'cost', sa.Numeric(precision=12, scale=2), nullable=True
+        ),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'),
+            nullable=True,
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ['trip_id'], ['trips.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_activities_id'), 'activities', ['id'], unique=False,
+    )
+    op.create_index(
+        'ix_activities_trip_day_order', 'activities',
+        ['trip_id', 'day_number', 'order_key'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_activities_trip_day_order', table_name='activities'
+    )
+    op.drop_index(op.f('ix_activities_id'), table_name='activities')
+    op.drop_table('activities')
@@ -0,0 +1,62 @@
+"""create_expenses_table
+
+Revision ID: e4c19b7a3f58
+Revises: d2a85c1f7e30
+Create Date: 2026-10-18 15:40:12.093377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c19b7a3f58'
+down_revision: Union[str, None] = 'd2a85c1f7e30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'expenses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('activity_id', sa.Integer(), nullable=True),
+        sa.Column('day_number', sa.Integer(), nullable=True),
+        sa.Column(
+            'amount', sa.Numeric(precision=12, scale=2), nullable=False
+        ),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column(
+            'description', sa.String(length=255), nullable=True
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ['activity_id'], ['activities.id'], ondelete='SET NULL'
+        ),
+        sa.ForeignKeyConstraint(
+            ['trip_id'], ['trips.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_expenses_id'), 'expenses', ['id'], unique=False,
+    )
+    op.create_index(
+        op.f('ix_expenses_trip_id'), 'expenses', ['trip_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_expenses_trip_id'), table_name='expenses')
+    op.drop_index(op.f('ix_expenses_id'), table_name='expenses')
+    op.drop_table('expenses')
@@ -0,0 +1,50 @@
+"""create_budget_rollups_table
+
+Revision ID: f3b86d2e9a14
+Revises: e4c19b7a3f58
+Create Date: 2026-10-18 18:12:47.509213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b86d2e9a14'
+down_revision: Union[str, None] = 'e4c19b7a3f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'budget_rollups',
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('day_number', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column(
+            'total', sa.Numeric(precision=14, scale=2), nullable=False
+        ),
+        sa.Column('expense_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['trip_id'], ['trips.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint(
+            'trip_id', 'day_number', 'category', 'currency'
+        ),
+    )
+    # Backfill from the expenses recorded so far
+    op.execute(
+        "INSERT INTO budget_rollups "
+        "(trip_id, day_number, category, currency, total, expense_count) "
+        "SELECT trip_id, COALESCE(day_number, 0), category, currency, "
+        "SUM(amount), COUNT(*) FROM expenses "
+        "GROUP BY trip_id, COALESCE(day_number, 0), category, currency"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('budget_rollups')
@@ -1,18 +1,22 @@
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+import hashing
 from config import settings
-from database import get_db
+from database import get_async_db
+from hashing import HasherBusyError, password_hasher
 from schemas import TokenData
+from token_cache import Principal, token_cache
 from user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# python-jose is imported inside the functions that use it: it is slow to
+# import and only needed once a token is issued or missed by the cache
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/v1/auth/login"
@@ -23,12 +27,40 @@ def verify_password(
     plain_password: str, hashed_password: str
 ) -> bool:
     """Verify a plain password against a hashed one."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
+
+
+def _hasher_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> bool:
+    """Verify a password on the hashing pool (503 if saturated)."""
+    try:
+        return await password_hasher.verify(
+            plain_password, hashed_password
+        )
+    except HasherBusyError:
+        raise _hasher_busy_exception()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool (503 if saturated)."""
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusyError:
+        raise _hasher_busy_exception()
 
 
 def create_access_token(
@@ -36,6 +68,8 @@ def create_access_token(
     expires_delta: Optional[timedelta] = None,
 ) -> str:
     """Create a JWT access token."""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -43,7 +77,7 @@ def create_access_token(
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(
         to_encode,
         settings.SECRET_KEY,
@@ -52,11 +86,66 @@ def create_access_token(
     return encoded_jwt
 
 
-def get_current_user(
+def create_refresh_token(username: str) -> Tuple[str, str, datetime]:
+    """Create a single-use JWT refresh token.
+
+    Returns the encoded token, its unique ``jti`` and its expiry.
+    """
+    from jose import jwt
+
+    jti = uuid.uuid4().hex
+    expire = datetime.now(timezone.utc) + timedelta(
+        minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
+    )
+    encoded_jwt = jwt.encode(
+        {"sub": username, "jti": jti, "exp": expire, "type": "refresh"},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+    return encoded_jwt, jti, expire
+
+
+def decode_refresh_token(token: str) -> dict:
+    """Validate a refresh token's signature, expiry and claims."""
+    from jose import JWTError, jwt
+
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+        )
+    except JWTError:
+        raise invalid_exception
+    if (
+        payload.get("type") != "refresh"
+        or not payload.get("sub")
+        or not payload.get("jti")
+    ):
+        raise invalid_exception
+    return payload
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """Extract and validate user from JWT Bearer token."""
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """Extract and validate user from JWT Bearer token.
+
+    Verified tokens are served from ``token_cache`` so hot requests skip
+    both the JWT decode and the users query.
+    """
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal
+
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -69,17 +158,29 @@ def get_current_user(
             algorithms=[settings.ALGORITHM],
         )
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("type") == "refresh":
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
 
-    user = (
-        db.query(User)
-        .filter(User.username == token_data.username)
-        .first()
+    user = await db.scalar(
+        select(User).where(User.username == token_data.username)
     )
-    if user is None:
+    if user is None or not user.is_active:
         raise credentials_exception
-    return user
+
+    principal = Principal.from_user(user)
+    if "exp" in payload:
+        token_cache.put(token, principal, payload["exp"])
+    return principal
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_cached_tokens(mapper, connection, target: User):
+    """Forget cached tokens when a user is deactivated or re-keyed."""
+    state = inspect(target)
+    for attr in ("is_active", "hashed_password", "username"):
+        if state.attrs[attr].history.has_changes():
+            token_cache.invalidate_user(target.id)
+            return
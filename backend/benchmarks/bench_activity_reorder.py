@@ -0,0 +1,165 @@
+"""Reorder cost on a 500-activity trip: dense positions vs. sparse keys.
+
+"Dense" is the naive scheme where ``order`` is 0..n-1 within a day, so a
+move rewrites every row in the affected days. "Sparse" is what the
+activities router does: ``plan_moves`` gives the moved row a key between
+its neighbours and writes all changes with one executemany UPDATE.
+
+    python benchmarks/bench_activity_reorder.py --moves 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import bindparam, insert, select, update  # noqa: E402
+
+import main  # noqa: E402, F401 -- registers every model
+from activity import Activity  # noqa: E402
+from database import Base, engine  # noqa: E402
+from ordering import GAP, plan_moves  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+TRIP_ID = 1
+
+
+def _seed(activities, days):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            id=1, email="b@example.com", username="b", hashed_password="x"
+        ))
+        conn.execute(insert(Trip).values(
+            id=TRIP_ID, user_id=1, title="Bench", destination="Here",
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, days),
+        ))
+        conn.execute(insert(Activity), [
+            {
+                "trip_id": TRIP_ID,
+                "day_number": 1 + i % days,
+                "order_key": (i // days + 1) * GAP,
+                "name": f"Activity {i}",
+            }
+            for i in range(activities)
+        ])
+
+
+def _random_moves(activities, days, count, rng):
+    """Random (id, day, after_id) moves, valid when applied in order."""
+    layout = {day: [] for day in range(1, days + 1)}
+    for i in range(activities):
+        layout[1 + i % days].append(i + 1)
+    moves = []
+    for _ in range(count):
+        activity_id = rng.randint(1, activities)
+        day = rng.randint(1, days)
+        for items in layout.values():
+            if activity_id in items:
+                items.remove(activity_id)
+        target = layout[day]
+        index = rng.randint(0, len(target))
+        after_id = target[index - 1] if index else None
+        target.insert(index, activity_id)
+        moves.append((activity_id, day, after_id))
+    return moves
+
+
+def _dense(conn, moves):
+    """Naive scheme: renumber the source and target days."""
+    stmt = (
+        update(Activity.__table__)
+        .where(Activity.__table__.c.id == bindparam("b_id"))
+        .values(day_number=bindparam("b_day"),
+                order_key=bindparam("b_key"))
+    )
+    written = 0
+    for activity_id, day, after_id in moves:
+        rows = conn.execute(
+            select(Activity.id, Activity.day_number)
+            .where(Activity.trip_id == TRIP_ID)
+            .order_by(Activity.day_number, Activity.order_key)
+        ).all()
+        days = {}
+        for row_id, row_day in rows:
+            days.setdefault(row_day, []).append(row_id)
+        for items in days.values():
+            if activity_id in items:
+                source = items
+                items.remove(activity_id)
+        target = days.setdefault(day, [])
+        index = 0 if after_id is None else target.index(after_id) + 1
+        target.insert(index, activity_id)
+        changed = [
+            {"b_id": i, "b_day": d, "b_key": n}
+            for d, items in days.items()
+            if items is target or items is source
+            for n, i in enumerate(items)
+        ]
+        conn.execute(stmt, changed)
+        written += len(changed)
+    return written
+
+
+def _sparse(conn, moves):
+    written = 0
+    for move in moves:
+        rows = conn.execute(
+            select(Activity.id, Activity.day_number, Activity.order_key)
+            .where(Activity.trip_id == TRIP_ID)
+        ).all()
+        changed = plan_moves(rows, [move])
+        conn.execute(
+            update(Activity.__table__)
+            .where(Activity.__table__.c.id == bindparam("b_id"))
+            .values(day_number=bindparam("b_day"),
+                    order_key=bindparam("b_key")),
+            [
+                {"b_id": i, "b_day": d, "b_key": k}
+                for i, (d, k) in changed.items()
+            ],
+        )
+        written += len(changed)
+    return written
+
+
+def run(args):
+    moves = _random_moves(
+        args.activities, args.days, args.moves, random.Random(1)
+    )
+    results = {}
+    for label, apply in (("dense", _dense), ("sparse", _sparse)):
+        _seed(args.activities, args.days)
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            written = apply(conn, moves)
+        results[label] = (written, time.perf_counter() - start)
+
+    print(f"{args.activities} activities over {args.days} days, "
+          f"{args.moves} moves")
+    for label, (written, seconds) in results.items():
+        print(
+            f"{label:>6}: {written / args.moves:7.1f} rows written/move, "
+            f"{seconds / args.moves * 1000:7.3f} ms/move"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activities", type=int, default=500)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--moves", type=int, default=200)
+    run(parser.parse_args())
@@ -0,0 +1,156 @@
+"""Budget reads from rollups vs. summing expenses, and the write cost.
+
+Seeds one long trip with ``--expenses`` expenses spread over its days,
+categories and currencies, then times building the budget summary from
+the ``budget_rollups`` rows (what ``GET /trips/{id}/budget`` does)
+against aggregating the expenses table on every read. It also times
+recording expenses with and without the rollup upsert, which is what
+the faster reads cost each write.
+
+    python benchmarks/bench_budget.py --expenses 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import insert  # noqa: E402
+
+import main  # noqa: E402, F401 -- registers every model
+from budget import (  # noqa: E402
+    apply_to_rollup,
+    bucket_key,
+    expense_buckets,
+    find_drift,
+    rebuild_rollups,
+    rollup_buckets,
+    summarize,
+)
+from database import Base, engine, init_engines  # noqa: E402
+from expense import Expense  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+TRIP_ID = 1
+CATEGORIES = [
+    "food", "lodging", "transport", "activities", "shopping", "tips",
+    "fees", "health", "communication", "other",
+]
+CURRENCIES = ["USD", "EUR", "JPY"]
+
+
+def _seed(expenses, days):
+    rng = random.Random(1)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            id=1, email="b@example.com", username="b", hashed_password="x"
+        ))
+        start = date(2026, 1, 1)
+        conn.execute(insert(Trip).values(
+            id=TRIP_ID, user_id=1, title="Bench", destination="Everywhere",
+            start_date=start, end_date=start + timedelta(days=days - 1),
+            budget=Decimal("50000"),
+        ))
+        conn.execute(insert(Expense), [
+            {
+                "trip_id": TRIP_ID,
+                "day_number": rng.randint(1, days),
+                "amount": Decimal(rng.randint(100, 20000)) / 100,
+                "currency": rng.choice(CURRENCIES),
+                "category": rng.choice(CATEGORIES),
+            }
+            for _ in range(expenses)
+        ])
+
+
+async def _time_reads(session_factory, trip, load, repeat):
+    samples = []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            summarize(trip, await load(db, TRIP_ID))
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def _time_writes(session_factory, count, with_rollup):
+    rng = random.Random(2)
+    started = time.perf_counter()
+    for _ in range(count):
+        async with session_factory() as db:
+            expense = Expense(
+                trip_id=TRIP_ID,
+                day_number=rng.randint(1, 10),
+                amount=Decimal("12.34"),
+                currency=rng.choice(CURRENCIES),
+                category=rng.choice(CATEGORIES),
+            )
+            db.add(expense)
+            await db.flush()
+            if with_rollup:
+                await apply_to_rollup(
+                    db, bucket_key(expense), expense.amount, 1
+                )
+            await db.commit()
+    return (time.perf_counter() - started) / count
+
+
+async def run(args):
+    _seed(args.expenses, args.days)
+    session_factory = init_engines().AsyncSessionLocal
+    async with session_factory() as db:
+        await rebuild_rollups(db)
+        await db.commit()
+        trip = await db.get(Trip, TRIP_ID)
+        buckets = len(await rollup_buckets(db, TRIP_ID))
+
+    rollup = await _time_reads(
+        session_factory, trip, rollup_buckets, args.repeat
+    )
+    scan = await _time_reads(
+        session_factory, trip, expense_buckets, args.repeat
+    )
+    print(f"{args.expenses} expenses over {args.days} days "
+          f"-> {buckets} rollup rows")
+    print(f"  rollups:    {rollup * 1000:8.2f} ms/budget")
+    print(f"  aggregate:  {scan * 1000:8.2f} ms/budget "
+          f"({scan / rollup:.0f}x slower)")
+
+    plain = await _time_writes(session_factory, args.writes, False)
+    async with session_factory() as db:
+        await rebuild_rollups(db)
+        await db.commit()
+    rolled = await _time_writes(session_factory, args.writes, True)
+    print(f"  write:      {plain * 1000:8.2f} ms/expense without rollup, "
+          f"{rolled * 1000:.2f} ms with (+{(rolled - plain) * 1000:.2f})")
+
+    async with session_factory() as db:
+        drift = await find_drift(db, TRIP_ID)
+    print(f"  drift after writes: {len(drift)} bucket(s)")
+    await init_engines().async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""Batch currency conversion vs. a per-row Decimal loop.
+
+Converts ``--amounts`` random amounts in a handful of currencies into
+one target three ways: a per-row loop doing ``amount / rate * rate`` in
+Decimal and quantizing (the obvious implementation), ``RateTable.convert``
+(Decimals in and out, integer arithmetic in between) and
+``RateTable.convert_minor`` on amounts already in minor units. Results
+are checked against each other before timing.
+
+    python benchmarks/bench_currency.py --amounts 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from currency import RateTable, minor_digits  # noqa: E402
+
+RATES = {
+    "EUR": Decimal("0.9215"), "GBP": Decimal("0.7904"),
+    "JPY": Decimal("149.32"), "MXN": Decimal("18.0412"),
+    "CAD": Decimal("1.3702"), "KWD": Decimal("0.3071"),
+}
+
+
+def per_row(amounts, currencies, target):
+    rates = {**RATES, "USD": Decimal(1)}
+    exponent = Decimal(1).scaleb(-minor_digits(target))
+    target_rate = rates[target]
+    return [
+        (amount / rates[code] * target_rate).quantize(
+            exponent, ROUND_HALF_UP
+        )
+        for amount, code in zip(amounts, currencies)
+    ]
+
+
+def _timed(label, count, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - started
+    print(f"  {label:<14} {seconds:7.3f} s  "
+          f"{seconds / count * 1e9:7.0f} ns/amount")
+    return result, seconds
+
+
+def run(args):
+    rng = random.Random(3)
+    table = RateTable.from_rates("USD", RATES)
+    currencies = [rng.choice(table.codes) for _ in range(args.amounts)]
+    minor = [rng.randint(1, 10 ** 7) for _ in range(args.amounts)]
+    amounts = [
+        Decimal(value).scaleb(-minor_digits(code))
+        for value, code in zip(minor, currencies)
+    ]
+    indexes = [table.index[code] for code in currencies]
+
+    sample = slice(0, 10000)
+    batch = table.convert(amounts[sample], currencies[sample], args.target)
+    loop = per_row(amounts[sample], currencies[sample], args.target)
+    mismatches = sum(a != b for a, b in zip(batch, loop))
+    print(f"{args.amounts} amounts in {len(table.codes)} currencies "
+          f"-> {args.target} ({mismatches} of 10000 sample rows differ "
+          f"from the Decimal loop's 28-digit rounding)")
+
+    _, loop_seconds = _timed(
+        "per-row loop", args.amounts, per_row,
+        amounts, currencies, args.target,
+    )
+    _, batch_seconds = _timed(
+        "convert", args.amounts, table.convert,
+        amounts, currencies, args.target,
+    )
+    _, minor_seconds = _timed(
+        "convert_minor", args.amounts, table.convert_minor,
+        minor, indexes, args.target,
+    )
+    print(f"  speedup: {loop_seconds / batch_seconds:.1f}x (Decimal in/out), "
+          f"{loop_seconds / minor_seconds:.1f}x (minor units)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--amounts", type=int, default=1_000_000)
+    parser.add_argument("--target", default="EUR")
+    run(parser.parse_args())
@@ -0,0 +1,141 @@
+"""Destination autocomplete: index memory, load time and query latency.
+
+Writes ``--destinations`` synthetic names to a TSV file, then builds a
+``DestinationIndex`` over it and reports the load time, the heap it
+holds (tracemalloc) and the process RSS growth. Query latency (p50 and
+p99) is measured for exact prefixes of 1-8 characters and for prefixes
+with one typo, next to the same top-10 query as ``LIKE 'abc%' ORDER BY
+popularity`` on an in-memory SQLite table.
+
+    python benchmarks/bench_destinations.py --destinations 200000
+"""
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from destinations import DestinationIndex, normalize  # noqa: E402
+
+SYLLABLES = [
+    "ba", "ca", "da", "el", "fo", "ga", "ha", "is", "jo", "ka", "la",
+    "ma", "na", "or", "pa", "qu", "ra", "sa", "ta", "ur", "va", "wi",
+    "yo", "zi", "ber", "con", "del", "san", "ton", "vil", "burg",
+    "ville", "port", "mont", "lin", "ria", "sk", "ov",
+]
+COUNTRIES = ["France", "Brazil", "Japan", "Kenya", "Peru", "Norway"]
+
+
+def _name(rng):
+    words = [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(rng.choice((1, 1, 1, 2)))
+    ]
+    return " ".join(word.capitalize() for word in words)
+
+
+def _write_dataset(path, count, rng):
+    names = []
+    with open(path, "w", encoding="utf-8") as dataset:
+        for i in range(count):
+            name = f"{_name(rng)} {i}" if i % 50 == 0 else _name(rng)
+            names.append(name)
+            popularity = int(rng.paretovariate(1.2) * 10)
+            dataset.write(f"{name}\t{rng.choice(COUNTRIES)}\t{popularity}\n")
+    return names
+
+
+def _typo(rng, text):
+    i = rng.randrange(1, len(text))
+    edit = rng.choice(("swap", "drop", "replace"))
+    if edit == "swap" and i < len(text) - 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if edit == "drop":
+        return text[:i] + text[i + 1:]
+    return text[:i] + rng.choice("aeiourst") + text[i + 1:]
+
+
+def _latency(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return (
+        statistics.median(samples) * 1e6,
+        samples[int(len(samples) * 0.99)] * 1e6,
+    )
+
+
+def run(args):
+    rng = random.Random(8)
+    path = os.path.join(tempfile.mkdtemp(), "destinations.tsv")
+    names = _write_dataset(path, args.destinations, rng)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = DestinationIndex(path)
+    load_seconds = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Again under tracemalloc (much slower) for the heap the index holds
+    tracemalloc.start()
+    traced = DestinationIndex(path)
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    traced.close()
+    print(f"{args.destinations} destinations, "
+          f"{os.path.getsize(path) / 2 ** 20:.1f} MiB file")
+    print(f"  load:        {load_seconds:6.2f} s, heap "
+          f"{heap / 2 ** 20:.1f} MiB, peak RSS +"
+          f"{(rss_after - rss_before) / 1024:.1f} MiB")
+
+    exact = [
+        names[rng.randrange(len(names))][:rng.randint(1, 8)]
+        for _ in range(args.queries)
+    ]
+    typos = [
+        _typo(rng, names[rng.randrange(len(names))][:rng.randint(4, 8)])
+        for _ in range(args.queries)
+    ]
+    for label, queries in (("exact", exact), ("one typo", typos)):
+        p50, p99 = _latency(lambda q: index.suggest(q, 10), queries)
+        print(f"  {label:<12} p50 {p50:7.1f} us   p99 {p99:7.1f} us")
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE destinations (key TEXT, popularity INTEGER)")
+    db.execute("CREATE INDEX ix_key ON destinations (key)")
+    db.executemany(
+        "INSERT INTO destinations VALUES (?, ?)",
+        ((normalize(name), i % 1000) for i, name in enumerate(names)),
+    )
+    like = (
+        "SELECT key FROM destinations WHERE key LIKE ? "
+        "ORDER BY popularity DESC LIMIT 10"
+    )
+    p50, p99 = _latency(
+        lambda q: db.execute(like, (normalize(q) + "%",)).fetchall(),
+        exact[:args.like_queries],
+    )
+    print(f"  {'SQLite LIKE':<12} p50 {p50:7.1f} us   p99 {p99:7.1f} us "
+          f"(exact only)")
+    index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--destinations", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--like-queries", type=int, default=300)
+    run(parser.parse_args())
@@ -0,0 +1,188 @@
+"""Nearby-activity search: geo_key ranges vs. brute-force haversine.
+
+Seeds ``--activities`` located activities on ``--trips`` trips of one
+user, clustered around a few dozen cities, then answers random "what is
+within ``--radius`` meters of here" queries two ways, both in the
+database and in memory:
+
+* database: ``geo_key BETWEEN`` the ``circle_ranges`` cover through
+  ``ix_activities_trip_geo`` (what ``GET /activities/nearby`` does)
+  vs. reading every located activity of the user and filtering with
+  ``haversine_m``;
+* memory: ``GeoIndex.nearby`` over all the points vs. a haversine loop
+  over the same list (what a per-trip index saves on large trips).
+
+Results are checked against each other before timing.
+
+    python benchmarks/bench_geo.py --activities 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import insert, or_, select  # noqa: E402
+
+import main  # noqa: E402, F401 -- registers every model
+from activity import Activity  # noqa: E402
+from database import Base, engine  # noqa: E402
+from geo import GeoIndex, circle_ranges, geo_key, haversine_m  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+BATCH = 50_000
+
+
+def _cities(rng, count):
+    return [(rng.uniform(-60, 65), rng.uniform(-180, 180))
+            for _ in range(count)]
+
+
+def _point(rng, cities):
+    lat, lon = rng.choice(cities)
+    # Within roughly 20 km of the city center
+    return (lat + rng.gauss(0, 0.08), lon + rng.gauss(0, 0.1))
+
+
+def _seed(args, rng, cities):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    points = []
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            id=1, email="b@example.com", username="b", hashed_password="x"
+        ))
+        conn.execute(insert(Trip), [
+            {
+                "id": trip_id, "user_id": 1, "title": f"Trip {trip_id}",
+                "destination": "Somewhere", "start_date": date(2026, 1, 1),
+                "end_date": date(2026, 1, 10),
+            }
+            for trip_id in range(1, args.trips + 1)
+        ])
+        for start in range(0, args.activities, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, args.activities)):
+                lat, lon = _point(rng, cities)
+                points.append((lat, lon, i + 1))
+                rows.append({
+                    "id": i + 1, "trip_id": i % args.trips + 1,
+                    "day_number": 1, "name": "Place", "order_key": i,
+                    "latitude": lat, "longitude": lon,
+                    "geo_key": geo_key(lat, lon),
+                })
+            conn.execute(insert(Activity), rows)
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+    return points
+
+
+def _user_activities():
+    return select(
+        Activity.latitude, Activity.longitude, Activity.id
+    ).where(
+        Activity.geo_key.is_not(None),
+        Activity.trip_id.in_(select(Trip.id).where(Trip.user_id == 1)),
+    )
+
+
+def db_indexed(conn, lat, lon, radius):
+    query = _user_activities().where(or_(*(
+        Activity.geo_key.between(lo, hi - 1)
+        for lo, hi in circle_ranges(lat, lon, radius)
+    )))
+    return GeoIndex(conn.execute(query).all()).nearby(lat, lon, radius)
+
+
+def db_brute_force(conn, lat, lon, radius):
+    return brute_force(conn.execute(_user_activities()).all(),
+                       lat, lon, radius)
+
+
+def brute_force(points, lat, lon, radius):
+    found = []
+    for point_lat, point_lon, item in points:
+        distance = haversine_m(lat, lon, point_lat, point_lon)
+        if distance <= radius:
+            found.append((distance, item))
+    found.sort()
+    return found
+
+
+def _median_ms(fn, queries, *args):
+    samples = []
+    for lat, lon in queries:
+        started = time.perf_counter()
+        fn(*args, lat, lon)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def run(args):
+    rng = random.Random(4)
+    cities = _cities(rng, args.cities)
+    started = time.perf_counter()
+    points = _seed(args, rng, cities)
+    print(f"{args.activities} activities on {args.trips} trips around "
+          f"{args.cities} cities (seeded in "
+          f"{time.perf_counter() - started:.0f} s), radius {args.radius} m")
+
+    queries = [_point(rng, cities) for _ in range(args.queries)]
+    radius = args.radius
+    index = GeoIndex(points)
+    with engine.connect() as conn:
+        lat, lon = queries[0]
+        expected = brute_force(points, lat, lon, radius)
+        assert sorted(index.nearby(lat, lon, radius)) == expected
+        assert sorted(db_indexed(conn, lat, lon, radius)) == expected
+        print(f"  ~{len(expected)} activities per query")
+
+        indexed = _median_ms(
+            lambda la, lo: db_indexed(conn, la, lo, radius), queries
+        )
+        scanned = _median_ms(
+            lambda la, lo: db_brute_force(conn, la, lo, radius),
+            queries[:args.brute_queries],
+        )
+    print(f"  database  geo_key ranges: {indexed:9.2f} ms/query")
+    print(f"            brute force:    {scanned:9.2f} ms/query "
+          f"({scanned / indexed:.0f}x slower)")
+
+    in_memory = _median_ms(
+        lambda la, lo: index.nearby(la, lo, radius), queries
+    )
+    looped = _median_ms(
+        lambda la, lo: brute_force(points, la, lo, radius),
+        queries[:args.brute_queries],
+    )
+    print(f"  memory    GeoIndex:       {in_memory:9.2f} ms/query")
+    print(f"            brute force:    {looped:9.2f} ms/query "
+          f"({looped / in_memory:.0f}x slower)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activities", type=int, default=1_000_000)
+    parser.add_argument("--trips", type=int, default=1000)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--radius", type=float, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--brute-queries", type=int, default=5,
+        help="queries timed for the (slow) brute-force paths",
+    )
+    run(parser.parse_args())
@@ -0,0 +1,94 @@
+"""Login lookup latency on a large users table.
+
+Seeds ``--rows`` users (1M by default) and compares the old
+``username = x OR email = x`` predicate against ``login_lookup``, which
+picks the lower(email) or lower(username) index from the input shape.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_login_lookup.py
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from database import Base, engine  # noqa: E402
+from router_auth import login_lookup  # noqa: E402
+from user import User  # noqa: E402
+
+CHUNK = 50_000
+
+
+def _seed(rows):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, CHUNK):
+            conn.execute(insert(User), [
+                {
+                    "email": f"user{i}@example.com",
+                    "username": f"User{i}",
+                    "hashed_password": "x",
+                }
+                for i in range(start, min(start + CHUNK, rows))
+            ])
+
+
+def _time(conn, statements):
+    timings = []
+    for statement in statements:
+        start = time.perf_counter()
+        assert conn.execute(statement).first() is not None
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main(rows, lookups):
+    start = time.perf_counter()
+    _seed(rows)
+    print(f"seeded {rows} users in {time.perf_counter() - start:.1f}s")
+
+    picks = [random.randrange(rows) for _ in range(lookups)]
+    identifiers = [
+        f"user{i}@example.com" if n % 2 else f"User{i}"
+        for n, i in enumerate(picks)
+    ]
+    legacy = [
+        select(User).where(
+            (User.username == ident) | (User.email == ident)
+        )
+        for ident in identifiers
+    ]
+    normalized = [
+        login_lookup(ident.upper() if n % 3 == 0 else ident)
+        for n, ident in enumerate(identifiers)
+    ]
+    with engine.connect() as conn:
+        for label, statements in (
+            ("username OR email", legacy),
+            ("login_lookup (lower index)", normalized),
+        ):
+            p50, p99 = _time(conn, statements)
+            print(f"{label:>28}: p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.rows, args.lookups)
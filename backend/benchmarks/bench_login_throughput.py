@@ -0,0 +1,105 @@
+"""Login throughput vs. password hashing pool size.
+
+Fires bursts of concurrent ``POST /api/v1/auth/login`` requests at the
+app in-process and reports logins/second for each worker count, along
+with ``/health`` latency measured during the burst.
+
+    python benchmarks/bench_login_throughput.py --requests 64
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx  # noqa: E402
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from hashing import hash_password, password_hasher  # noqa: E402
+from main import app  # noqa: E402
+from user import User  # noqa: E402
+
+PASSWORD = "benchmark-password"
+
+
+def _seed_user():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="bench@example.com",
+        username="bench",
+        hashed_password=hash_password(PASSWORD),
+    ))
+    db.commit()
+    db.close()
+
+
+async def _timed(coro):
+    start = time.perf_counter()
+    response = await coro
+    return response, time.perf_counter() - start
+
+
+async def _run(client, requests):
+    login = [
+        _timed(client.post(
+            "/api/v1/auth/login",
+            data={"username": "bench", "password": PASSWORD},
+        ))
+        for _ in range(requests)
+    ]
+    health = [_timed(client.get("/health")) for _ in range(8)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*login, *health)
+    elapsed = time.perf_counter() - start
+    statuses = [r.status_code for r, _ in results[:requests]]
+    health_ms = [t * 1000 for _, t in results[requests:]]
+    return elapsed, statuses, health_ms
+
+
+async def main(worker_counts, requests):
+    _seed_user()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        print(
+            f"{'workers':>7} {'logins/s':>9} {'ok':>5} {'503':>5} "
+            f"{'health p50 ms':>14}"
+        )
+        for workers in worker_counts:
+            password_hasher.configure(
+                max_workers=workers, max_pending=requests
+            )
+            await _run(client, workers)  # spawn and warm the pool
+            elapsed, statuses, health_ms = await _run(client, requests)
+            print(
+                f"{workers:>7} {requests / elapsed:>9.1f} "
+                f"{statuses.count(200):>5} {statuses.count(503):>5} "
+                f"{statistics.median(health_ms):>14.1f}"
+            )
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.requests))
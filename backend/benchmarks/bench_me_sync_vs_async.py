@@ -0,0 +1,129 @@
+"""Concurrent ``/me`` throughput: sync Session vs. AsyncSession.
+
+Mounts two copies of the ``/api/v1/auth/me`` lookup on a scratch app --
+one using ``get_db`` in a sync endpoint (threadpool), one using
+``get_async_db`` -- and fires the same concurrent load at each. The token
+cache is bypassed so every request pays the JWT decode and users query.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_me_sync_vs_async.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from jose import jwt  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from auth import create_access_token, oauth2_scheme  # noqa: E402
+from config import settings  # noqa: E402
+from database import (  # noqa: E402
+    Base,
+    SessionLocal,
+    engine,
+    get_async_db,
+    get_db,
+)
+from schemas import UserResponse  # noqa: E402
+from user import User  # noqa: E402
+
+app = FastAPI()
+
+
+def _subject(token: str) -> str:
+    return jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )["sub"]
+
+
+@app.get("/sync/me", response_model=UserResponse)
+def sync_me(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    return db.query(User).filter(
+        User.username == _subject(token)
+    ).first()
+
+
+@app.get("/async/me", response_model=UserResponse)
+async def async_me(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.scalar(
+        select(User).where(User.username == _subject(token))
+    )
+
+
+def _seed_user():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="bench@example.com",
+        username="bench",
+        hashed_password="x",
+    ))
+    db.commit()
+    db.close()
+
+
+async def _burst(client, path, headers, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests, concurrency_levels):
+    _seed_user()
+    headers = {
+        "Authorization": "Bearer "
+        + create_access_token(data={"sub": "bench"})
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        print(f"{'concurrency':>11} {'sync req/s':>11} {'async req/s':>12}")
+        for concurrency in concurrency_levels:
+            sync_rps = await _burst(
+                client, "/sync/me", headers, requests, concurrency
+            )
+            async_rps = await _burst(
+                client, "/async/me", headers, requests, concurrency
+            )
+            print(
+                f"{concurrency:>11} {sync_rps:>11.0f} {async_rps:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10, 50, 100]
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,149 @@
+"""Per-request overhead of the metrics middleware and SQL hooks.
+
+Serves the same requests through the app with and without
+``MetricsMiddleware`` (alternating rounds, median kept) and reports
+the added time per request. ``/health`` shows the fixed cost on an empty
+request; the trip endpoints show it relative to real work, and the script
+exits non-zero if it exceeds ``--max-overhead-pct`` there.
+
+    python benchmarks/bench_metrics_overhead.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+# The baseline app is built without metrics; they are wrapped on below
+os.environ["METRICS_ENABLED"] = "false"
+# Measure the endpoints themselves, not 304s from the response cache
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import Base, SessionLocal, engine, init_engines  # noqa: E402
+from metrics import MetricsMiddleware, MetricsRegistry  # noqa: E402
+from user import User  # noqa: E402
+
+
+def _seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="bench@example.com", username="bench", hashed_password="x"
+    ))
+    db.commit()
+    db.close()
+    return {
+        "Authorization": "Bearer "
+        + create_access_token(data={"sub": "bench"})
+    }
+
+
+async def _round(client, path, headers, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def _fixed_cost(calls=50_000):
+    """Microseconds the middleware adds around a no-op ASGI app."""
+    async def noop_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/"}
+    costs = []
+    for app in (noop_app, MetricsMiddleware(noop_app, MetricsRegistry())):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await app(scope, receive, send)
+        costs.append((time.perf_counter() - start) / calls * 1e6)
+    return costs[1] - costs[0]
+
+
+async def run(requests, rounds, max_overhead_pct):
+    print(f"middleware fixed cost: {await _fixed_cost():.1f} us/request\n")
+    headers = _seed()
+    apps = {
+        "plain": main.app,
+        "metrics": MetricsMiddleware(main.app, registry=MetricsRegistry()),
+    }
+    clients = {
+        name: httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        )
+        for name, app in apps.items()
+    }
+    trip = (await clients["plain"].post("/api/v1/trips", json={
+        "title": "Bench", "destination": "Rome",
+        "start_date": "2026-04-01", "end_date": "2026-04-05",
+    }, headers=headers)).json()
+    for n in range(20):
+        await clients["plain"].post("/api/v1/activities", json={
+            "trip_id": trip["id"], "day_number": n % 5 + 1,
+            "name": f"Stop {n}",
+        }, headers=headers)
+
+    paths = ["/health", "/api/v1/trips", f"/api/v1/trips/{trip['id']}/full"]
+    print(f"{'path':<24} {'plain us':>9} {'metrics us':>11} {'overhead':>9}")
+    failed = False
+    for path in paths:
+        timings = {name: [] for name in clients}
+        for n in range(rounds):
+            # Alternate which app goes first to cancel drift
+            order = list(clients) if n % 2 == 0 else list(clients)[::-1]
+            for name in order:
+                timings[name].append(await _round(
+                    clients[name], path, headers, requests
+                ))
+        plain = statistics.median(timings["plain"])
+        with_metrics = statistics.median(timings["metrics"])
+        pct = statistics.median(
+            (m - p) / p * 100
+            for p, m in zip(timings["plain"], timings["metrics"])
+        )
+        print(
+            f"{path:<24} {plain:>9.0f} {with_metrics:>11.0f}"
+            f" {pct:>8.1f}%"
+        )
+        if path != "/health" and pct > max_overhead_pct:
+            failed = True
+    for client in clients.values():
+        await client.aclose()
+    await init_engines().async_engine.dispose()
+    if failed:
+        print(f"FAIL: overhead above {max_overhead_pct}% on an API route")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-overhead-pct", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(
+        run(args.requests, args.rounds, args.max_overhead_pct)
+    ))
@@ -0,0 +1,167 @@
+"""Payload size and query time with and without ``?fields=``.
+
+Seeds one trip with ``--activities`` activities (with notes) and
+``--trips`` trips (with descriptions), then for a trip page and the
+itinerary list, full and narrowed to a few fields, reports:
+
+- bytes on the wire uncompressed, gzipped and (with the ``brotli``
+  package installed) Brotli-compressed, from the app's responses
+- the median time of the SELECT plus loading the rows, with and without
+  the ``load_only`` options the endpoints use
+
+    python benchmarks/bench_payload.py --activities 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, time as clock, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from activity import Activity  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from compression import brotli  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from fieldsets import load_fields  # noqa: E402
+from main import app  # noqa: E402
+from router_trips import keyset_page  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+WORDS = (
+    "book ahead in high season the queue at side entrance is shorter "
+    "bring water cash for lockers and a light jacket tram stop viewpoint "
+    "closed on mondays tickets online guided tour starts every hour near "
+    "river tiles museum garden lunch sunset"
+).split()
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _seed(trips, activities):
+    rng = random.Random(5)
+    Base.metadata.create_all(bind=engine)
+    start = date(2026, 5, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            email="bench@example.com", username="bench",
+            hashed_password="x",
+        ))
+        conn.execute(insert(Trip), [
+            {
+                "user_id": 1,
+                "title": f"Trip {i}",
+                "destination": "Lisbon, Portugal",
+                "description": _text(rng, 40),
+                "start_date": start + timedelta(days=i),
+                "end_date": start + timedelta(days=i + 30),
+                "budget": Decimal("1500.00"),
+            }
+            for i in range(trips)
+        ])
+        conn.execute(insert(Activity), [
+            {
+                "trip_id": 1,
+                "day_number": i // 60 + 1,
+                "order_key": (i % 60 + 1) * 1024,
+                "name": _text(rng, 3),
+                "start_time": clock(9 + i % 10, 15),
+                "location": "Rua Augusta 100, Lisboa",
+                "activity_type": "sight",
+                "cost": Decimal("12.50"),
+                "notes": _text(rng, 50),
+                "latitude": 38.71,
+                "longitude": -9.14,
+            }
+            for i in range(activities)
+        ])
+
+
+def _wire_bytes(client, url, params, headers):
+    sizes = []
+    encodings = ["identity", "gzip"] + (["br"] if brotli else [])
+    for encoding in encodings:
+        with client.stream(
+            "GET", url, params=params,
+            headers={**headers, "Accept-Encoding": encoding},
+        ) as response:
+            sizes.append(sum(len(chunk) for chunk in response.iter_raw()))
+    return sizes
+
+
+def _query_ms(query, repeat):
+    samples = []
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            list(db.scalars(query))
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def run(args):
+    _seed(args.trips, args.activities)
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': 'bench'})}"
+    }
+    client = TestClient(app)
+    itinerary = (
+        select(Activity)
+        .where(Activity.trip_id == 1)
+        .order_by(Activity.day_number, Activity.order_key)
+    )
+    cases = [
+        (
+            f"{args.activities} activities", "/api/v1/activities",
+            {"trip_id": 1}, "id,name,day_number,start_time",
+            lambda fields: itinerary.options(
+                *load_fields(Activity, fields)
+            ),
+        ),
+        (
+            "100 trips", "/api/v1/trips", {"limit": 100},
+            "id,title,start_date",
+            lambda fields: keyset_page(1, None, 101).options(
+                *load_fields(Trip, fields, "start_date")
+            ),
+        ),
+    ]
+    print(f"{'':<18} {'fields':<32} {'bytes':>9} {'gzip':>8} "
+          f"{'br':>8} {'query':>9}")
+    for label, url, params, fields, query in cases:
+        for selected in (None, fields):
+            request = dict(params, fields=selected) if selected else params
+            sizes = _wire_bytes(client, url, request, headers)
+            sizes += ["-"] * (3 - len(sizes))
+            ms = _query_ms(
+                query(tuple(selected.split(",")) if selected else None),
+                args.repeat,
+            )
+            print(f"{label:<18} {selected or '(all)':<32} "
+                  f"{sizes[0]:>9} {sizes[1]:>8} {sizes[2]:>8} "
+                  f"{ms:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activities", type=int, default=2000)
+    parser.add_argument("--trips", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
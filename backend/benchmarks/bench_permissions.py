@@ -0,0 +1,158 @@
+"""Trip authorization overhead for a user with many shared trips.
+
+Shares ``--trips`` trips (5k by default) with one user, then times the
+"may this user view this trip" check three ways:
+
+- ``authorize_trip`` with the user's permission map cached
+- a per-request query on ``trips`` and ``trip_shares`` for that one trip
+- loading the whole permission map after an invalidation (cold)
+
+and the full ``GET /trips/{id}`` request with the map cached, as the
+share of a request that authorization takes.
+
+    python benchmarks/bench_permissions.py --trips 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+# Measure the endpoint, not 304s or replays from the response cache
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+from sqlalchemy import exists, insert, or_, select  # noqa: E402
+
+from auth import create_access_token  # noqa: E402
+from database import (  # noqa: E402
+    Base,
+    dispose_engines,
+    engine,
+    init_engines,
+)
+from main import app  # noqa: E402
+from permissions import (  # noqa: E402
+    authorize_trip,
+    load_permissions,
+    trip_permissions,
+)
+from token_cache import Principal  # noqa: E402
+from trip import Trip  # noqa: E402
+from trip_share import TripShare  # noqa: E402
+from user import User  # noqa: E402
+
+GUEST_ID = 2
+
+
+def _seed(trips):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": f"{name}@example.com", "username": name,
+             "hashed_password": "x"}
+            for name in ("owner", "bench")
+        ])
+        conn.execute(insert(Trip), [
+            {"user_id": 1, "title": f"Trip {i}", "destination": "Lisbon",
+             "start_date": date(2026, 5, 1), "end_date": date(2026, 5, 9)}
+            for i in range(trips)
+        ])
+        conn.execute(insert(TripShare), [
+            {"trip_id": trip_id, "user_id": GUEST_ID,
+             "permission_level": "editor" if trip_id % 2 else "viewer"}
+            for trip_id in range(1, trips + 1)
+        ])
+
+
+def _query_check(trip_id):
+    """The per-request check a map-less design runs."""
+    shared = exists().where(
+        TripShare.trip_id == Trip.id, TripShare.user_id == GUEST_ID
+    )
+    return select(Trip.id).where(
+        Trip.id == trip_id, or_(Trip.user_id == GUEST_ID, shared)
+    )
+
+
+async def _per_call_us(call, trip_ids):
+    start = time.perf_counter()
+    for trip_id in trip_ids:
+        await call(trip_id)
+    return (time.perf_counter() - start) / len(trip_ids) * 1e6
+
+
+async def run(args):
+    _seed(args.trips)
+    rng = random.Random(3)
+    trip_ids = [rng.randint(1, args.trips) for _ in range(args.checks)]
+    user = Principal(
+        id=GUEST_ID, email="bench@example.com", username="bench",
+        full_name=None, is_active=True, created_at=None,
+    )
+
+    async with init_engines().AsyncSessionLocal() as db:
+        async def warm(trip_id):
+            await authorize_trip(db, user, trip_id)
+
+        async def per_query(trip_id):
+            assert await db.scalar(_query_check(trip_id)) is not None
+
+        await warm(1)
+        size = len(trip_permissions.get(GUEST_ID))
+        cold = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await load_permissions(db, GUEST_ID)
+            cold.append(time.perf_counter() - start)
+        cached_us = await _per_call_us(warm, trip_ids)
+        query_us = await _per_call_us(per_query, trip_ids)
+    cold_ms = statistics.median(cold) * 1000
+
+    headers = {
+        "Authorization": "Bearer "
+        + create_access_token(data={"sub": "bench"})
+    }
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        async def request(trip_id):
+            response = await client.get(
+                f"/api/v1/trips/{trip_id}", headers=headers
+            )
+            assert response.status_code == 200, response.text
+
+        await request(1)
+        request_us = await _per_call_us(request, trip_ids[:args.requests])
+
+    print(f"permission map: {size} trips, cold load {cold_ms:.2f}ms")
+    print(f"{'check':<28} {'per request':>12}")
+    print(f"{'cached map (authorize_trip)':<28} {cached_us:>10.1f}us")
+    print(f"{'query per request':<28} {query_us:>10.1f}us")
+    print(f"GET /trips/{{id}}: {request_us:.0f}us, "
+          f"{cached_us / request_us:.1%} of it authorizing; "
+          f"a cold load pays for itself after "
+          f"{cold_ms * 1000 / (query_us - cached_us):.0f} requests")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trips", type=int, default=5000)
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,214 @@
+"""Connection pool load harness: checkout wait as uvicorn workers scale.
+
+For each worker count, starts that many single-worker uvicorn processes
+(one pool each, like ``uvicorn --workers N``) against the same database,
+drives ``GET /api/v1/trips`` at a fixed total concurrency spread across
+them, then scrapes every worker's ``/metrics`` for pool checkout time and
+request time. The share of request time spent waiting for a connection
+shows where the pool, not the database or the app, becomes the limit.
+
+Pool settings are passed through to the workers, so e.g.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_pool_load.py \\
+        --workers 1 2 4 8 --concurrency 64 --pool-size 5 --max-overflow 0
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = (
+        f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    )
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402, F401 -- registers every model
+from auth import create_access_token  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTE = "/api/v1/trips"
+SAMPLE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+
+
+def _seed(trips):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(
+        email="bench@example.com", username="bench", hashed_password="x"
+    )
+    db.add(user)
+    db.flush()
+    db.add_all(
+        Trip(
+            user_id=user.id, title=f"Trip {n}", destination="Vienna",
+            start_date=date(2026, n % 12 + 1, 1),
+            end_date=date(2026, n % 12 + 1, 5),
+        )
+        for n in range(trips)
+    )
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def _start_workers(count, base_port, pool_env):
+    env = {
+        **os.environ, **pool_env,
+        # Every request must reach the pool
+        "RESPONSE_CACHE_ENABLED": "false",
+    }
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--port", str(base_port + n), "--log-level", "warning",
+            ],
+            cwd=BACKEND_DIR, env=env,
+        )
+        for n in range(count)
+    ]
+    deadline = time.time() + 30
+    for n in range(count):
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{base_port + n}/health")
+                break
+            except httpx.TransportError:
+                if time.time() > deadline:
+                    raise RuntimeError("workers did not start")
+                time.sleep(0.1)
+    return processes
+
+
+def _scrape(port):
+    """Sum of the series this harness reports, from one worker."""
+    text = httpx.get(f"http://127.0.0.1:{port}/metrics").text
+    totals = {"request": 0.0, "wait": 0.0, "connects": 0.0, "timeouts": 0.0}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        if f'route="{ROUTE}"' in labels and name.startswith("http_request"):
+            if name == "http_request_duration_seconds_sum":
+                totals["request"] += float(value)
+            elif name == "http_request_db_pool_wait_seconds_total":
+                totals["wait"] += float(value)
+        elif 'pool="async"' in labels:
+            if name == "db_pool_connections_total":
+                totals["connects"] += float(value)
+            elif name == "db_pool_timeouts_total":
+                totals["timeouts"] += float(value)
+    return totals
+
+
+async def _load(ports, concurrency, duration, headers):
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def client_loop(client, port):
+        nonlocal errors
+        url = f"http://127.0.0.1:{port}{ROUTE}"
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await asyncio.gather(*(
+            client_loop(client, ports[n % len(ports)])
+            for n in range(concurrency)
+        ))
+    return latencies, errors
+
+
+def run(worker_counts, concurrency, duration, base_port, pool_env):
+    _seed(trips=50)
+    headers = {
+        "Authorization": "Bearer "
+        + create_access_token(data={"sub": "bench"})
+    }
+    print(
+        f"concurrency {concurrency}, pool "
+        + ", ".join(f"{k}={v}" for k, v in pool_env.items())
+    )
+    print(
+        f"{'workers':>7} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7}"
+        f" {'wait ms':>8} {'wait %':>7} {'conns':>6} {'errors':>7}"
+    )
+    for workers in worker_counts:
+        processes = _start_workers(workers, base_port, pool_env)
+        ports = [base_port + n for n in range(workers)]
+        try:
+            latencies, errors = asyncio.run(
+                _load(ports, concurrency, duration, headers)
+            )
+            totals = [_scrape(port) for port in ports]
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+        request = sum(t["request"] for t in totals)
+        wait = sum(t["wait"] for t in totals)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+        print(
+            f"{workers:>7} {len(latencies) / duration:>7.0f}"
+            f" {statistics.median(latencies or [0]) * 1000:>7.1f}"
+            f" {p95 * 1000:>7.1f}"
+            f" {wait / max(len(latencies), 1) * 1000:>8.2f}"
+            f" {wait / request * 100 if request else 0:>6.1f}%"
+            f" {sum(t['connects'] for t in totals):>6.0f}"
+            f" {errors + sum(t['timeouts'] for t in totals):>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    parser.add_argument(
+        "--pool-mode", choices=["queue", "null"], default="queue"
+    )
+    parser.add_argument(
+        "--no-pre-ping", action="store_true",
+        help="skip the checkout ping (DB_POOL_PRE_PING=false)",
+    )
+    args = parser.parse_args()
+    run(args.workers, args.concurrency, args.duration, args.port, {
+        "DB_POOL_MODE": args.pool_mode,
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": str(args.max_overflow),
+        "DB_POOL_TIMEOUT": str(args.pool_timeout),
+        "DB_POOL_PRE_PING": str(not args.no_pre_ping).lower(),
+    })
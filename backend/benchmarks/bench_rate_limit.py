@@ -0,0 +1,202 @@
+"""Rate limiter overhead, and what it saves during a login flood.
+
+Reports the cost of one ``TokenBuckets.take`` (for a single key and
+spread over many keys) and of ``RateLimiter.check`` with and without
+the in-memory shared backend, then the latency of a login for an
+unknown user (a DB lookup, no bcrypt) with the limits on and off.
+
+The attack replays ``--attempts`` wrong-password logins from ``--ips``
+addresses, half of them at one real account and half at random names,
+and reports wall time, CPU (this process plus the hashing workers, less
+starting the workers) and how many attempts reached the database and
+bcrypt.
+
+    python benchmarks/bench_rate_limit.py --attempts 200
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx  # noqa: E402
+
+from database import (  # noqa: E402
+    Base,
+    SessionLocal,
+    dispose_engines,
+    engine,
+)
+from hashing import hash_password, password_hasher  # noqa: E402
+from main import app  # noqa: E402
+from rate_limit import (  # noqa: E402
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    TokenBuckets,
+    rate_limits,
+)
+from user import User  # noqa: E402
+
+LOGIN = "/api/v1/auth/login"
+
+
+def _seed_user():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="victim@example.com",
+        username="victim",
+        hashed_password=hash_password("correct-password"),
+    ))
+    db.commit()
+    db.close()
+
+
+def _per_call_ns(fn, keys):
+    started = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - started) / len(keys) * 1e9
+
+
+async def _per_check_ns(limiter, backend, keys):
+    started = time.perf_counter()
+    for key in keys:
+        await limiter.check(key, backend)
+    return (time.perf_counter() - started) / len(keys) * 1e9
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    # Hashing workers count once they have exited (pool shut down)
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        own.ru_utime + own.ru_stime + workers.ru_utime + workers.ru_stime
+    )
+
+
+async def _overhead(calls):
+    print("per call:")
+    one_key = ["203.0.113.7"] * calls
+    many_keys = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+                 for i in range(calls)]
+    buckets = TokenBuckets(1e12, 10, max_keys=calls + 1)
+    one = _per_call_ns(buckets.take, one_key)
+    many = _per_call_ns(buckets.take, many_keys)
+    print(f"  take, one key       {one:7.0f} ns")
+    print(f"  take, {calls} keys  {many:7.0f} ns")
+    limiter = RateLimiter("bench", 1e12, 10, max_keys=calls + 1)
+    local = await _per_check_ns(limiter, None, one_key)
+    shared = await _per_check_ns(
+        limiter, InMemoryRateLimitBackend(), one_key
+    )
+    print(f"  check, local        {local:7.0f} ns")
+    print(f"  check, + backend    {shared:7.0f} ns")
+
+
+async def _login_latency(client, requests):
+    samples = []
+    for i in range(requests):
+        started = time.perf_counter()
+        await client.post(
+            LOGIN, data={"username": f"nobody{i}", "password": "x"}
+        )
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def _pool_cpu():
+    """CPU of starting and stopping the hashing workers alone."""
+    cpu = _cpu_seconds()
+    password_hasher.configure()
+    await password_hasher.warm_up()
+    password_hasher.shutdown()
+    return _cpu_seconds() - cpu
+
+
+async def _attack(attempts, ips, pool_cpu):
+    rate_limits.clear()
+    cpu = _cpu_seconds()
+    password_hasher.configure()
+    await password_hasher.warm_up()
+    started = time.perf_counter()
+    statuses = []
+    clients = [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(
+                app=app, client=(f"198.51.100.{i}", 4000)
+            ),
+            base_url="http://bench",
+        )
+        for i in range(ips)
+    ]
+    for i in range(attempts):
+        username = "victim" if i % 2 else f"guess{i}"
+        response = await clients[i % ips].post(
+            LOGIN, data={"username": username, "password": f"pw{i}"}
+        )
+        statuses.append((username, response.status_code))
+    for client in clients:
+        await client.aclose()
+    elapsed = time.perf_counter() - started
+    password_hasher.shutdown()
+    return elapsed, _cpu_seconds() - cpu - pool_cpu, statuses
+
+
+async def main(args):
+    _seed_user()
+    await _overhead(args.calls)
+
+    auth_ip = rate_limits.auth_ip
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        print("unknown-user login, median:")
+        for enabled in (False, True):
+            rate_limits.enabled = enabled
+            # High enough that nothing is rejected
+            rate_limits.auth_ip = RateLimiter("auth-ip", 1e9, 10 ** 6)
+            await _login_latency(client, 20)
+            ms = await _login_latency(client, args.requests)
+            label = "limited" if enabled else "unlimited"
+            print(f"  {label:<10} {ms:7.2f} ms")
+
+    rate_limits.auth_ip = auth_ip
+    pool_cpu = await _pool_cpu()
+    print(f"attack: {args.attempts} attempts from {args.ips} IPs")
+    print(f"  {'':<10} {'wall':>8} {'CPU':>8} {'to DB':>6} "
+          f"{'bcrypt':>7} {'429':>5}")
+    for enabled in (False, True):
+        rate_limits.enabled = enabled
+        elapsed, cpu, statuses = await _attack(
+            args.attempts, args.ips, pool_cpu
+        )
+        label = "limited" if enabled else "unlimited"
+        rejected = sum(status == 429 for _, status in statuses)
+        hashed = sum(
+            name == "victim" and status == 401 for name, status in statuses
+        )
+        print(f"  {label:<10} {elapsed:>7.2f}s {cpu:>7.2f}s "
+              f"{len(statuses) - rejected:>6} {hashed:>7} {rejected:>5}")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--ips", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,227 @@
+"""Fan-out of live trip updates to 10k connected WebSockets.
+
+Connects ``--sockets`` WebSockets to one trip through the app (the real
+``/ws/trips/{id}`` handshake, JWT and permission check included), over
+in-memory ASGI connections so no OS sockets or client library are
+needed, then reports:
+
+- handshake rate and memory per connected socket
+- publish-to-delivery latency across all sockets for one change
+  (including the ``REALTIME_BATCH_MS`` window)
+- a burst of ``--burst`` edits: messages each socket receives
+- with ``--slow-pct`` of the sockets never reading: whether the others
+  keep up, and how much the stalled ones hold (bounded by the queue)
+
+    python benchmarks/bench_realtime.py --sockets 10000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+os.environ["METRICS_ENABLED"] = "false"
+
+from sqlalchemy import insert  # noqa: E402
+
+from auth import create_access_token  # noqa: E402
+from config import settings  # noqa: E402
+from database import Base, dispose_engines, engine  # noqa: E402
+from main import app  # noqa: E402
+from realtime import change, trip_hub  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+TRIP_ID = 1
+
+
+def _seed():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            email="bench@example.com", username="bench",
+            hashed_password="x",
+        ))
+        conn.execute(insert(Trip).values(
+            user_id=1, title="Bench", destination="Lisbon",
+            start_date=date(2026, 5, 1), end_date=date(2026, 5, 9),
+        ))
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class Deliveries:
+    """Counts messages reaching the reading sockets."""
+
+    def __init__(self):
+        self.expected = 0
+        self.times = []
+        self.done = asyncio.Event()
+
+    def expect(self, count):
+        self.expected = count
+        self.times = []
+        self.done.clear()
+
+    def arrived(self):
+        self.times.append(time.perf_counter())
+        if len(self.times) >= self.expected:
+            self.done.set()
+
+
+class Connection:
+    """One in-memory WebSocket client speaking ASGI to the app."""
+
+    def __init__(self, index, token, deliveries, slow):
+        self.inbox = asyncio.Queue()
+        self.accepted = asyncio.Event()
+        self.messages = 0
+        self.close_code = None
+        self.deliveries = deliveries
+        self.slow = slow
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": f"/ws/trips/{TRIP_ID}",
+            "raw_path": f"/ws/trips/{TRIP_ID}".encode(),
+            "root_path": "",
+            "query_string": f"token={token}".encode(),
+            "headers": [(b"host", b"bench")],
+            "client": ("10.0.0.1", index),
+            "server": ("bench", 80),
+            "subprotocols": [],
+        }
+
+    async def receive(self):
+        return await self.inbox.get()
+
+    async def send(self, message):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            if self.slow:
+                # Never reads: the server's send stalls here
+                await asyncio.Event().wait()
+            self.messages += 1
+            self.deliveries.arrived()
+        elif message["type"] == "websocket.close":
+            self.close_code = message.get("code")
+            self.accepted.set()
+
+    def start(self):
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        return asyncio.create_task(
+            app(self.scope, self.receive, self.send)
+        )
+
+
+async def _fan_out(deliveries, fast, *changes):
+    deliveries.expect(len(fast))
+    started = time.perf_counter()
+    await trip_hub.publish(TRIP_ID, *changes)
+    await deliveries.done.wait()
+    return [(t - started) * 1000 for t in deliveries.times]
+
+
+async def run(args):
+    _seed()
+    token = create_access_token(data={"sub": "bench"})
+    deliveries = Deliveries()
+    slow_every = round(100 / args.slow_pct) if args.slow_pct else 0
+    connections = [
+        Connection(i, token, deliveries,
+                   slow=bool(slow_every) and i % slow_every == 0)
+        for i in range(args.sockets)
+    ]
+    fast = [c for c in connections if not c.slow]
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    tasks = []
+    for offset in range(0, len(connections), 500):
+        batch = connections[offset:offset + 500]
+        tasks += [c.start() for c in batch]
+        await asyncio.gather(*(c.accepted.wait() for c in batch))
+    connect_s = time.perf_counter() - started
+    assert all(c.close_code is None for c in connections)
+    per_socket_kb = (_rss_mb() - rss_before) * 1024 / len(connections)
+    print(f"{len(connections)} sockets ({len(fast)} reading) connected "
+          f"in {connect_s:.2f}s ({len(connections) / connect_s:.0f}/s), "
+          f"{per_socket_kb:.1f}kB each; hub {trip_hub.stats()}")
+
+    single = await _fan_out(
+        deliveries, fast, change("activity", 1, {"name": "Belem"})
+    )
+    print(f"one change to {len(fast)} sockets "
+          f"(batch window {settings.REALTIME_BATCH_MS}ms): "
+          f"first {single[0]:.1f}ms, "
+          f"p50 {statistics.median(single):.1f}ms, "
+          f"last {single[-1]:.1f}ms")
+
+    before = sum(c.messages for c in fast)
+    burst = [
+        change("activity", i % 20 + 1, {"order_key": i * 1024})
+        for i in range(args.burst)
+    ]
+    timings = await _fan_out(deliveries, fast, *burst)
+    received = (sum(c.messages for c in fast) - before) / len(fast)
+    print(f"burst of {args.burst} edits (20 activities): "
+          f"{received:.0f} message per socket, last after "
+          f"{timings[-1]:.1f}ms")
+
+    if slow_every:
+        rounds = settings.REALTIME_SEND_QUEUE * 2
+        lags = []
+        for i in range(rounds):
+            timings = await _fan_out(
+                deliveries, fast, change("trip", TRIP_ID, {"title": str(i)})
+            )
+            lags.append(timings[-1] - settings.REALTIME_BATCH_MS)
+        held = [
+            s.queue.qsize()
+            for s in trip_hub._channels[TRIP_ID].subscribers
+        ]
+        resyncs = sum(
+            s.resyncs for s in trip_hub._channels[TRIP_ID].subscribers
+        )
+        print(f"{rounds} batches with {args.slow_pct}% stalled sockets: "
+              f"readers' last delivery p50 "
+              f"{statistics.median(lags):.1f}ms after the window; "
+              f"max queued per socket {max(held)} "
+              f"(limit {settings.REALTIME_SEND_QUEUE}), {resyncs} resyncs")
+
+    for connection in connections:
+        connection.inbox.put_nowait(
+            {"type": "websocket.disconnect", "code": 1000}
+        )
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    print(f"after disconnect: hub {trip_hub.stats()}")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sockets", type=int, default=10_000)
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--slow-pct", type=float, default=5)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""bcrypt calls saved per active user per day by refresh tokens.
+
+Replays one user's day against the real endpoints: every time the access
+token would expire (``ACCESS_TOKEN_EXPIRE_MINUTES``) the client either
+re-posts credentials to ``/login`` or exchanges its refresh token at
+``/refresh``. Password verifications are counted on the hashing pool.
+
+    python benchmarks/bench_refresh_bcrypt_savings.py --active-hours 10
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from config import settings  # noqa: E402
+from database import Base, engine  # noqa: E402
+from hashing import password_hasher  # noqa: E402
+from main import app  # noqa: E402
+
+CREDENTIALS = {"username": "bench", "password": "benchmark-password"}
+
+
+class _CountingVerify:
+    def __init__(self, verify):
+        self.verify = verify
+        self.calls = 0
+        self.seconds = 0.0
+
+    async def __call__(self, *args):
+        self.calls += 1
+        start = time.perf_counter()
+        try:
+            return await self.verify(*args)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def main(active_hours):
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    client.post("/api/v1/auth/register", json={
+        "email": "bench@example.com", **CREDENTIALS,
+    })
+    counter = _CountingVerify(password_hasher.verify)
+    password_hasher.verify = counter
+    renewals = math.ceil(
+        active_hours * 60 / settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+
+    for _ in range(renewals):
+        assert client.post(
+            "/api/v1/auth/login", data=CREDENTIALS
+        ).status_code == 200
+    login_only = counter.calls
+    per_call = counter.seconds / max(counter.calls, 1)
+
+    counter.calls = 0
+    tokens = client.post("/api/v1/auth/login", data=CREDENTIALS).json()
+    for _ in range(renewals - 1):
+        tokens = client.post("/api/v1/auth/refresh", json={
+            "refresh_token": tokens["refresh_token"],
+        }).json()
+    with_refresh = counter.calls
+    password_hasher.shutdown()
+
+    saved = login_only - with_refresh
+    print(f"access token lifetime:      "
+          f"{settings.ACCESS_TOKEN_EXPIRE_MINUTES} min")
+    print(f"active hours per day:       {active_hours}")
+    print(f"bcrypt calls, login only:   {login_only}")
+    print(f"bcrypt calls, with refresh: {with_refresh}")
+    print(f"saved per active user/day:  {saved} "
+          f"(~{saved * per_call:.2f}s CPU at {per_call * 1000:.0f} ms each)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--active-hours", type=float, default=10)
+    args = parser.parse_args()
+    main(args.active_hours)
@@ -0,0 +1,150 @@
+"""Bytes and queries saved by ETag revalidation on a polling client.
+
+Seeds one trip with ``--activities`` activities, then simulates a client
+that polls ``GET /api/v1/trips/{id}/full`` ``--polls`` times, editing
+the trip every ``--write-every`` polls. The run is repeated with the body
+cache disabled, with a client that ignores ETags (served from the body
+cache) and with one that revalidates with ``If-None-Match``, comparing
+bytes transferred, SQL statements executed and latency.
+
+    python benchmarks/bench_response_cache.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from response_cache import (  # noqa: E402
+    response_cache_backend,
+    response_cache_stats,
+)
+from user import User  # noqa: E402
+
+_statements = [0]
+
+
+def _count(conn, cursor, statement, parameters, context, many):
+    _statements[0] += 1
+
+
+def _seed_user():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="bench@example.com", username="bench", hashed_password="x"
+    ))
+    db.commit()
+    db.close()
+
+
+async def _seed_trip(client, headers, activities):
+    trip = (await client.post("/api/v1/trips", json={
+        "title": "Bench trip",
+        "destination": "Lisbon, Portugal",
+        "start_date": "2026-05-01",
+        "end_date": "2026-05-10",
+    }, headers=headers)).json()
+    for n in range(activities):
+        await client.post("/api/v1/activities", json={
+            "trip_id": trip["id"],
+            "day_number": n % 10 + 1,
+            "name": f"Activity {n}",
+            "location": "Somewhere in Lisbon",
+            "notes": "Bring a jacket and the booking reference.",
+            "cost": 12.5,
+        }, headers=headers)
+    return trip["id"]
+
+
+async def _poll(client, headers, trip_id, polls, write_every, conditional):
+    url = f"/api/v1/trips/{trip_id}/full"
+    etag = None
+    received = 0
+    latencies = []
+    _statements[0] = 0
+    for n in range(polls):
+        if write_every and n and n % write_every == 0:
+            reads = _statements[0]
+            await client.put(
+                f"/api/v1/trips/{trip_id}",
+                json={"description": f"edit {n}"},
+                headers=headers,
+            )
+            # Only count the statements the polling itself causes
+            _statements[0] = reads
+        request_headers = dict(headers)
+        if conditional and etag:
+            request_headers["If-None-Match"] = etag
+        start = time.perf_counter()
+        response = await client.get(url, headers=request_headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code in (200, 304), response.text
+        received += len(response.content)
+        etag = response.headers.get("ETag", etag)
+    return received, _statements[0], latencies
+
+
+async def run(activities, polls, write_every):
+    _seed_user()
+    headers = {
+        "Authorization": "Bearer "
+        + create_access_token(data={"sub": "bench"})
+    }
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        trip_id = await _seed_trip(client, headers, activities)
+        print(
+            f"{'client':>14} {'bytes':>10} {'statements':>11}"
+            f" {'p50 ms':>7} {'p95 ms':>7}"
+        )
+        max_entries = response_cache_backend.max_entries
+        for label, conditional, bodies in (
+            ("uncached", False, 0),
+            ("body cache", False, max_entries),
+            ("if-none-match", True, max_entries),
+        ):
+            response_cache_backend.clear()
+            response_cache_backend.max_entries = bodies
+            response_cache_stats.reset()
+            received, statements, latencies = await _poll(
+                client, headers, trip_id, polls, write_every, conditional
+            )
+            latencies.sort()
+            print(
+                f"{label:>14} {received:>10} {statements:>11}"
+                f" {statistics.median(latencies):>7.2f}"
+                f" {latencies[int(len(latencies) * 0.95)]:>7.2f}"
+            )
+        print("if-none-match stats:", response_cache_stats.as_dict())
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activities", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--write-every", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.activities, args.polls, args.write_every))
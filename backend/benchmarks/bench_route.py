@@ -0,0 +1,102 @@
+"""Day route optimization time and quality by number of stops.
+
+For each ``--stops`` size, optimizes random days of stops spread over a
+city (a tenth of them with a start time) and reports the median time of
+``optimize_route`` and of its distance matrix, next to a matrix of
+per-pair ``haversine_m`` calls. Quality is the path length against the
+stops' input order and against nearest-neighbour alone.
+
+    python benchmarks/bench_route.py --stops 50 100 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from geo import haversine_m  # noqa: E402
+from routing import (  # noqa: E402
+    Stop,
+    _Planner,
+    distance_matrix,
+    optimize_route,
+)
+
+
+def _day(rng, count):
+    stops = []
+    for i in range(count):
+        opens = None
+        if i % 10 == 0:
+            opens = rng.randint(10 * 60, 20 * 60)
+        stops.append(Stop(
+            41.85 + rng.uniform(0, 0.1), 12.45 + rng.uniform(0, 0.1), opens
+        ))
+    return stops
+
+
+def haversine_matrix(points):
+    return [
+        [haversine_m(lat, lon, lat2, lon2) for lat2, lon2 in points]
+        for lat, lon in points
+    ]
+
+
+def _median_ms(fn, days):
+    samples = []
+    for day in days:
+        started = time.perf_counter()
+        fn(day)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def _length(planner, path):
+    return sum(
+        planner.dist[a][b] for a, b in zip([0, *path], path)
+    )
+
+
+def run(args):
+    rng = random.Random(6)
+    print(f"{'stops':>6} {'optimize':>10} {'matrix':>9} {'haversine':>10}"
+          f" {'vs input':>9} {'vs NN':>7} {'late':>6}")
+    for count in args.stops:
+        days = [_day(rng, count) for _ in range(args.days)]
+        points = [[(s.lat, s.lon) for s in day] for day in days]
+        optimize = _median_ms(
+            lambda day: optimize_route(day, speed_kmh=20, stay_minutes=5),
+            days,
+        )
+        matrix = _median_ms(distance_matrix, points)
+        baseline = _median_ms(haversine_matrix, points)
+
+        vs_input, vs_nn, late = [], [], 0.0
+        for day in days:
+            planner = _Planner(day, None, 9 * 60, 20 * 1000 / 60, 5)
+            route = optimize_route(day, speed_kmh=20, stay_minutes=5)
+            nodes = list(range(1, count + 1))
+            vs_input.append(route.distance_m / _length(planner, nodes))
+            vs_nn.append(route.distance_m / _length(
+                planner, planner.nearest_neighbour()
+            ))
+            late += sum(route.late)
+        print(f"{count:>6} {optimize:>8.1f}ms {matrix:>7.1f}ms "
+              f"{baseline:>8.1f}ms {statistics.mean(vs_input):>8.0%} "
+              f"{statistics.mean(vs_nn):>6.0%} {late / len(days):>5.0f}m")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--stops", type=int, nargs="+", default=[25, 50, 100, 200]
+    )
+    parser.add_argument("--days", type=int, default=20)
+    run(parser.parse_args())
@@ -0,0 +1,104 @@
+"""Serializing a page of trips: response model vs. direct row encoding.
+
+Builds ``--trips`` ORM ``Trip`` rows and times turning them into a
+``TripPage`` response body three ways:
+
+- response model: FastAPI's ``serialize_response`` (validation and
+  JSON-mode dump) rendered by Starlette's ``JSONResponse`` (stdlib json)
+- + orjson: the same, rendered by ``ORJSONResponse``
+- row encoder: ``trip_row`` dicts rendered by ``ORJSONResponse``, as the
+  list endpoints do
+
+    python benchmarks/bench_serialization.py --trips 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from schemas import TripPage  # noqa: E402
+from serialization import ORJSONResponse, trip_row  # noqa: E402
+from trip import Trip  # noqa: E402
+
+
+def _trips(count):
+    start = date(2026, 1, 1)
+    return [
+        Trip(
+            id=i,
+            user_id=1,
+            title=f"Trip {i}",
+            destination="Lisbon, Portugal",
+            description="Tiles, trams and custard tarts" if i % 3 else None,
+            start_date=start + timedelta(days=i % 365),
+            end_date=start + timedelta(days=i % 365 + 4),
+            budget=Decimal(f"{1000 + i % 500}.50") if i % 4 else None,
+            created_at=datetime(2025, 12, 1, 9, 30, i % 60),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def run(args):
+    trips = _trips(args.trips)
+    field = create_response_field(name="response", type_=TripPage)
+
+    def through_model(response_class):
+        content = asyncio.run(serialize_response(
+            field=field,
+            response_content={"items": trips, "next_cursor": None},
+        ))
+        return response_class(content).body
+
+    def through_rows():
+        return ORJSONResponse({
+            "items": [trip_row(trip) for trip in trips],
+            "next_cursor": None,
+        }).body
+
+    assert json.loads(through_model(JSONResponse)) == json.loads(
+        through_rows()
+    )
+    paths = (
+        ("response model", lambda: through_model(JSONResponse)),
+        ("+ orjson", lambda: through_model(ORJSONResponse)),
+        ("row encoder", through_rows),
+    )
+    print(f"{args.trips} trips, "
+          f"{len(through_rows()) / 2 ** 20:.1f} MiB of JSON")
+    baseline = None
+    for label, fn in paths:
+        ms = _median_ms(fn, args.repeat)
+        baseline = baseline or ms
+        print(f"  {label:<15} {ms:8.1f} ms  {baseline / ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trips", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=9)
+    run(parser.parse_args())
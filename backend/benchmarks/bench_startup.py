@@ -0,0 +1,155 @@
+"""Cold-start cost of the API: import time and lifespan startup.
+
+Imports ``main`` in fresh interpreters under ``python -X importtime``,
+reports the median import time and the slowest modules, then runs the
+lifespan once and prints its step timings.
+
+Most of the import is FastAPI, pydantic and SQLAlchemy, which vary a lot
+between machines and runs, so two budgets are checked on the median of
+``--runs``: the app's own modules (their self time: schemas, route
+registration, ...), which is what a change here moves, with
+``--max-app-import-ms``; and the whole import with a generous
+``--max-import-ms``. Also exits non-zero if startup exceeds
+``--max-startup-ms`` or if a module that should load lazily (database
+drivers, python-jose, passlib) is imported eagerly.
+
+    python benchmarks/bench_startup.py --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_MODULES = {
+    name[:-3] for name in os.listdir(BACKEND_DIR) if name.endswith(".py")
+}
+
+LAZY_MODULES = ["aiosqlite", "asyncpg", "jose", "passlib", "psycopg2"]
+
+LIFESPAN_SCRIPT = """
+import json, time
+from fastapi.testclient import TestClient
+import main
+started = time.perf_counter()
+with TestClient(main.app):
+    total = (time.perf_counter() - started) * 1000
+    print(json.dumps({**main.app.state.startup_timings, "total": total}))
+"""
+
+
+def _env():
+    db_dir = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{db_dir}/bench.db")
+    env.setdefault("SECRET_KEY", "bench-secret-key")
+    env.setdefault("DEBUG", "false")
+    return env
+
+
+def _import_once(env):
+    """Return ({module: (self_us, cumulative_us)}, eagerly loaded)."""
+    code = (
+        "import sys, main; "
+        f"print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split(
+            "|"
+        )
+        if self_us.strip().isdigit():
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules, json.loads(result.stdout.replace("'", '"'))
+
+
+def _app_ms(modules):
+    """Self time of the app's own modules, in ms."""
+    return sum(
+        self_us for name, (self_us, _) in modules.items()
+        if name.split(".")[0] in APP_MODULES
+    ) / 1000
+
+
+def main(runs, top, max_import_ms, max_app_import_ms, max_startup_ms):
+    env = _env()
+    totals = []
+    app_totals = []
+    for _ in range(runs):
+        modules, eager = _import_once(env)
+        totals.append(modules["main"][1] / 1000)
+        app_totals.append(_app_ms(modules))
+    import_ms = statistics.median(totals)
+    app_import_ms = statistics.median(app_totals)
+
+    print(f"import main: median {import_ms:.0f} ms over {runs} runs "
+          f"({min(totals):.0f}-{max(totals):.0f})")
+    print(f"  app modules: median {app_import_ms:.0f} ms "
+          f"({min(app_totals):.0f}-{max(app_totals):.0f})")
+    print(f"\n{'self ms':>8} {'cumul ms':>9}  module (slowest by self time)")
+    for name, (self_us, cumulative_us) in sorted(
+        modules.items(), key=lambda item: item[1][0], reverse=True
+    )[:top]:
+        print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}  {name}")
+
+    # The app no longer creates tables; migrate the scratch database
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, check=True,
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", LIFESPAN_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout)
+    print("\nlifespan startup (ms):")
+    for name, ms in timings.items():
+        print(f"  {name:<16} {ms:>8.1f}")
+
+    failures = []
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if import_ms > max_import_ms:
+        failures.append(
+            f"import took {import_ms:.0f} ms (budget {max_import_ms} ms)"
+        )
+    if app_import_ms > max_app_import_ms:
+        failures.append(
+            f"app modules took {app_import_ms:.0f} ms"
+            f" (budget {max_app_import_ms} ms)"
+        )
+    if timings["total"] > max_startup_ms:
+        failures.append(
+            f"startup took {timings['total']:.0f} ms"
+            f" (budget {max_startup_ms} ms)"
+        )
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=15)
+    # Headroom: FastAPI/pydantic alone take 1-2 s on slower machines
+    parser.add_argument("--max-import-ms", type=float, default=4000)
+    # 300-450 ms on a developer laptop, 2x that on slow CI runners
+    parser.add_argument("--max-app-import-ms", type=float, default=1000)
+    parser.add_argument("--max-startup-ms", type=float, default=500)
+    args = parser.parse_args()
+    sys.exit(main(
+        args.runs, args.top, args.max_import_ms, args.max_app_import_ms,
+        args.max_startup_ms,
+    ))
@@ -0,0 +1,179 @@
+"""NDJSON trip import/export throughput and peak memory.
+
+Streams ``--trips`` trips of ``--activities`` activities each (100k
+activities by default) into ``POST /api/v1/trips/import``, then streams
+them back out of ``GET /api/v1/trips/export``. The app is driven as a raw
+ASGI callable so neither side of the transfer is buffered by a test
+client, and each phase runs in a fresh process so its peak RSS is its
+own.
+
+    python benchmarks/bench_trip_transfer.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = (
+        f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    )
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+import main  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import Base, SessionLocal, engine, init_engines  # noqa: E402
+from user import User  # noqa: E402
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _ndjson(trips, activities):
+    """Yield the import body a line at a time."""
+    for n in range(trips):
+        yield (json.dumps({
+            "title": f"Trip {n}",
+            "destination": "Kyoto, Japan",
+            "description": "Temples, gardens and a day trip to Nara.",
+            "start_date": "2026-03-01",
+            "end_date": "2026-03-10",
+            "budget": "2500.00",
+            "activities": [
+                {
+                    "day_number": a % 10 + 1,
+                    "name": f"Stop {a}",
+                    "start_time": "09:30:00",
+                    "location": "Higashiyama",
+                    "activity_type": "sightseeing",
+                    "cost": "12.50",
+                    "notes": "Book ahead; closed on Mondays.",
+                }
+                for a in range(activities)
+            ],
+        }) + "\n").encode()
+
+
+async def _call(method, path, body_chunks=()):
+    """Run one request through the ASGI app; returns (status, bytes)."""
+    token = create_access_token(data={"sub": "bench"})
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path,
+        "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    chunks = iter(body_chunks)
+    state = {"status": None, "bytes": 0, "body_sent": False}
+    response_done = asyncio.Event()
+
+    async def receive():
+        if state["body_sent"]:
+            # Like a server: block until the client goes away
+            await response_done.wait()
+            return {"type": "http.disconnect"}
+        chunk = next(chunks, None)
+        if chunk is None:
+            state["body_sent"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            # Count and drop: the client keeps nothing
+            state["bytes"] += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    await main.app(scope, receive, send)
+    return state["status"], state["bytes"]
+
+
+async def _phase(name, trips, activities):
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if name == "import":
+        status, size = await _call(
+            "POST", "/api/v1/trips/import", _ndjson(trips, activities)
+        )
+        assert status == 201, status
+    else:
+        status, size = await _call("GET", "/api/v1/trips/export")
+        assert status == 200, status
+    elapsed = time.perf_counter() - start
+    await init_engines().async_engine.dispose()
+    rows = trips * (activities + 1)
+    print(json.dumps({
+        "phase": name,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed,
+        "response_bytes": size,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": _peak_rss_mb(),
+    }))
+
+
+def _seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="bench@example.com", username="bench", hashed_password="x"
+    ))
+    db.commit()
+    db.close()
+
+
+def run(trips, activities):
+    _seed()
+    body_mb = sum(len(line) for line in _ndjson(trips, activities)) / 2**20
+    print(
+        f"{trips} trips x {activities} activities"
+        f" ({body_mb:.1f} MB of NDJSON)\n"
+    )
+    print(
+        f"{'phase':<8} {'seconds':>8} {'rows/s':>9}"
+        f" {'baseline MB':>12} {'peak MB':>8}"
+    )
+    for phase in ("import", "export"):
+        output = subprocess.run(
+            [
+                sys.executable, __file__, "--phase", phase,
+                "--trips", str(trips), "--activities", str(activities),
+            ],
+            env=os.environ, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{phase:<8} {result['seconds']:>8.2f}"
+            f" {result['rows_per_sec']:>9.0f}"
+            f" {result['baseline_rss_mb']:>12.0f}"
+            f" {result['peak_rss_mb']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trips", type=int, default=1000)
+    parser.add_argument("--activities", type=int, default=100)
+    parser.add_argument(
+        "--phase", choices=["import", "export"], help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+    if args.phase:
+        asyncio.run(_phase(args.phase, args.trips, args.activities))
+    else:
+        run(args.trips, args.activities)
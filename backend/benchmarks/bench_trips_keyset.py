@@ -0,0 +1,135 @@
+"""Trip list page latency deep into a power user's trips.
+
+Seeds ``--trips`` trips (1M by default) across ``--users`` users, one of
+whom owns ``--power-trips`` of them, then walks that user's whole list
+with the keyset query used by ``GET /api/v1/trips`` and, for contrast,
+with LIMIT/OFFSET. Exits non-zero if the deepest keyset pages are more
+than ``--max-ratio`` times slower than the first ones.
+
+    python benchmarks/bench_trips_keyset.py
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{_db_dir}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+import main  # noqa: E402, F401 -- registers every model
+from database import Base, engine  # noqa: E402
+from router_trips import keyset_page  # noqa: E402
+from trip import Trip  # noqa: E402
+from user import User  # noqa: E402
+
+CHUNK = 50_000
+POWER_USER_ID = 1
+
+
+def _seed(trips, users, power_trips):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    epoch = date(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "x",
+            }
+            for i in range(1, users + 1)
+        ])
+        owners = [POWER_USER_ID] * power_trips
+        for start in range(0, trips, CHUNK):
+            rows = []
+            for n in range(start, min(start + CHUNK, trips)):
+                user_id = (
+                    owners[n] if n < power_trips
+                    else rng.randint(2, users)
+                )
+                start_date = epoch + timedelta(days=rng.randrange(3650))
+                rows.append({
+                    "user_id": user_id,
+                    "title": f"Trip {n}",
+                    "destination": "Somewhere",
+                    "start_date": start_date,
+                    "end_date": start_date + timedelta(days=5),
+                })
+            conn.execute(insert(Trip), rows)
+
+
+def _timed(conn, query):
+    start = time.perf_counter()
+    rows = conn.execute(query).all()
+    return rows, (time.perf_counter() - start) * 1000
+
+
+def _walk_keyset(conn, limit):
+    timings, after = [], None
+    while True:
+        rows, ms = _timed(
+            conn, keyset_page(POWER_USER_ID, after, limit)
+        )
+        if not rows:
+            return timings
+        timings.append(ms)
+        after = (rows[-1].start_date, rows[-1].id)
+
+
+def _walk_offset(conn, limit, pages):
+    base = (
+        select(Trip)
+        .where(Trip.user_id == POWER_USER_ID)
+        .order_by(Trip.start_date, Trip.id)
+        .limit(limit)
+    )
+    return [
+        _timed(conn, base.offset(page * limit))[1] for page in pages
+    ]
+
+
+def run(args):
+    start = time.perf_counter()
+    _seed(args.trips, args.users, args.power_trips)
+    print(f"seeded {args.trips} trips in {time.perf_counter() - start:.1f}s")
+
+    with engine.connect() as conn:
+        keyset = _walk_keyset(conn, args.limit)
+        first = statistics.median(keyset[:10])
+        deep = statistics.median(keyset[-10:])
+        pages = len(keyset)
+        offset = _walk_offset(
+            conn, args.limit, list(range(10)) + list(range(pages - 10, pages))
+        )
+    print(f"power user pages ({args.limit}/page): {pages}")
+    print(f"keyset  first 10 p50 {first:.3f} ms, last 10 p50 {deep:.3f} ms")
+    print(
+        f"offset  first 10 p50 {statistics.median(offset[:10]):.3f} ms, "
+        f"last 10 p50 {statistics.median(offset[10:]):.3f} ms"
+    )
+    ratio = deep / first
+    print(f"keyset deep/first ratio: {ratio:.2f} (max {args.max_ratio})")
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trips", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--power-trips", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    sys.exit(run(parser.parse_args()))
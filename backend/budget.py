@@ -0,0 +1,327 @@
+"""Per-trip expense rollups behind ``GET /trips/{id}/budget``.
+
+``budget_rollups`` keeps one row per (trip, day, category, currency)
+with the total and count of the trip's expenses in that bucket. The
+expense endpoints call ``apply_to_rollup`` in the same transaction as
+each insert, update and delete -- an upsert, so concurrent writes to a
+bucket serialize on its row -- and a budget read then sums a few dozen
+rollup rows instead of every expense.
+
+``find_drift`` recomputes the buckets from the expenses table and lists
+the ones that disagree; ``rebuild_rollups`` replaces them. From the
+command line (run from ``backend/``)::
+
+    python budget.py [--trip-id N] [--repair]
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from budget_rollup import BudgetRollup
+from currency import RateTable
+from expense import Expense
+from schemas import (
+    BudgetCategory,
+    BudgetDay,
+    BudgetTotal,
+    ConvertedBudget,
+    TripBudget,
+)
+from trip import Trip
+
+# Rollup day for expenses not tied to a trip day
+NO_DAY = 0
+CENTS = Decimal("0.01")
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class BucketKey(NamedTuple):
+    """Primary key of a rollup row."""
+
+    trip_id: int
+    day_number: int
+    category: str
+    currency: str
+
+
+class Bucket(NamedTuple):
+    """Total and number of the expenses in a bucket."""
+
+    total: Decimal
+    count: int
+
+
+class Drift(NamedTuple):
+    """A bucket whose rollup disagrees with the expenses (None: absent)."""
+
+    key: BucketKey
+    expected: Optional[Bucket]
+    stored: Optional[Bucket]
+
+
+def bucket_key(expense: Expense) -> BucketKey:
+    """The rollup bucket an expense counts towards."""
+    return BucketKey(
+        expense.trip_id,
+        expense.day_number or NO_DAY,
+        expense.category,
+        expense.currency,
+    )
+
+
+def _cents(value) -> Decimal:
+    # SQLite hands back sums as floats
+    return Decimal(str(value)).quantize(CENTS)
+
+
+async def apply_to_rollup(
+    db: AsyncSession, key: BucketKey, amount: Decimal, count: int
+) -> None:
+    """Add ``amount`` and ``count`` (either may be negative) to a bucket.
+
+    Runs in the caller's transaction; emptied buckets are deleted.
+    """
+    upsert = _UPSERTS[db.get_bind().dialect.name]
+    stmt = upsert(BudgetRollup).values(
+        **key._asdict(), total=amount, expense_count=count
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=list(BucketKey._fields),
+        set_={
+            "total": BudgetRollup.total + stmt.excluded.total,
+            "expense_count": (
+                BudgetRollup.expense_count + stmt.excluded.expense_count
+            ),
+        },
+    ))
+    if count < 0:
+        await db.execute(delete(BudgetRollup).where(
+            *(
+                getattr(BudgetRollup, field) == value
+                for field, value in key._asdict().items()
+            ),
+            BudgetRollup.expense_count <= 0,
+        ))
+
+
+async def move_in_rollup(
+    db: AsyncSession,
+    old_key: BucketKey,
+    old_amount: Decimal,
+    new_key: BucketKey,
+    new_amount: Decimal,
+) -> None:
+    """Account for an expense whose bucket or amount changed."""
+    if old_key == new_key:
+        if new_amount != old_amount:
+            await apply_to_rollup(db, new_key, new_amount - old_amount, 0)
+        return
+    await apply_to_rollup(db, old_key, -old_amount, -1)
+    await apply_to_rollup(db, new_key, new_amount, 1)
+
+
+async def rollup_buckets(
+    db: AsyncSession, trip_id: Optional[int] = None
+) -> Dict[BucketKey, Bucket]:
+    """Buckets as stored in the rollup table."""
+    query = select(
+        BudgetRollup.trip_id,
+        BudgetRollup.day_number,
+        BudgetRollup.category,
+        BudgetRollup.currency,
+        BudgetRollup.total,
+        BudgetRollup.expense_count,
+    )
+    if trip_id is not None:
+        query = query.where(BudgetRollup.trip_id == trip_id)
+    return {
+        BucketKey(*row[:4]): Bucket(_cents(row[4]), row[5])
+        for row in await db.execute(query)
+    }
+
+
+def _expense_groups():
+    day = func.coalesce(Expense.day_number, NO_DAY)
+    columns = (Expense.trip_id, day, Expense.category, Expense.currency)
+    return select(
+        *columns, func.sum(Expense.amount), func.count()
+    ).group_by(*columns)
+
+
+async def expense_buckets(
+    db: AsyncSession, trip_id: Optional[int] = None
+) -> Dict[BucketKey, Bucket]:
+    """Buckets recomputed from the expenses table (scans every row)."""
+    query = _expense_groups()
+    if trip_id is not None:
+        query = query.where(Expense.trip_id == trip_id)
+    return {
+        BucketKey(*row[:4]): Bucket(_cents(row[4]), row[5])
+        for row in await db.execute(query)
+    }
+
+
+def _fold(buckets: Iterable[Tuple[BucketKey, Bucket]]):
+    """Sum buckets by currency, (category, currency) and (day, currency)."""
+    spent: Dict[str, list] = defaultdict(lambda: [Decimal(0), 0])
+    by_category: Dict[tuple, list] = defaultdict(lambda: [Decimal(0), 0])
+    by_day: Dict[tuple, list] = defaultdict(lambda: [Decimal(0), 0])
+    for key, bucket in buckets:
+        for sums in (
+            spent[key.currency],
+            by_category[(key.category, key.currency)],
+            by_day[(key.day_number, key.currency)],
+        ):
+            sums[0] += bucket.total
+            sums[1] += bucket.count
+    return (
+        [
+            BudgetTotal(currency=currency, total=float(total), count=count)
+            for currency, (total, count) in sorted(spent.items())
+        ],
+        [
+            BudgetCategory(
+                category=category,
+                currency=currency,
+                total=float(total),
+                count=count,
+            )
+            for (category, currency), (total, count)
+            in sorted(by_category.items())
+        ],
+        [
+            BudgetDay(
+                day_number=day or None,
+                currency=currency,
+                total=float(total),
+                count=count,
+            )
+            for (day, currency), (total, count) in sorted(by_day.items())
+        ],
+    )
+
+
+def _converted(
+    buckets: Dict[BucketKey, Bucket], rates: RateTable, currency: str
+) -> ConvertedBudget:
+    """Buckets converted into ``currency`` in one batch, then folded."""
+    rates.currency_index(currency)  # UnknownCurrencyError up front
+    known = [
+        (key, bucket) for key, bucket in buckets.items()
+        if key.currency in rates.index
+    ]
+    totals = rates.convert(
+        [bucket.total for _, bucket in known],
+        [key.currency for key, _ in known],
+        currency,
+    )
+    spent, by_category, by_day = _fold(
+        (key._replace(currency=currency), Bucket(total, bucket.count))
+        for (key, bucket), total in zip(known, totals)
+    )
+    return ConvertedBudget(
+        rates_as_of=rates.as_of,
+        spent=spent[0] if spent else BudgetTotal(
+            currency=currency, total=0, count=0
+        ),
+        by_category=by_category,
+        by_day=by_day,
+        unconverted=sorted(
+            {key.currency for key in buckets} - rates.index.keys()
+        ),
+    )
+
+
+def summarize(
+    trip: Trip,
+    buckets: Dict[BucketKey, Bucket],
+    rates: Optional[RateTable] = None,
+    currency: Optional[str] = None,
+) -> TripBudget:
+    """Fold a trip's buckets into totals by currency, category and day.
+
+    With ``rates`` and ``currency``, also convert everything into that
+    currency (``UnknownCurrencyError`` if the rates lack it).
+    """
+    spent, by_category, by_day = _fold(buckets.items())
+    return TripBudget(
+        trip_id=trip.id,
+        planned=float(trip.budget) if trip.budget is not None else None,
+        spent=spent,
+        by_category=by_category,
+        by_day=by_day,
+        converted=(
+            _converted(buckets, rates, currency)
+            if rates is not None and currency is not None else None
+        ),
+    )
+
+
+async def find_drift(
+    db: AsyncSession, trip_id: Optional[int] = None
+) -> List[Drift]:
+    """Compare the rollups with the expenses they summarize."""
+    expected = await expense_buckets(db, trip_id)
+    stored = await rollup_buckets(db, trip_id)
+    return [
+        Drift(key, expected.get(key), stored.get(key))
+        for key in sorted(expected.keys() | stored.keys())
+        if expected.get(key) != stored.get(key)
+    ]
+
+
+async def rebuild_rollups(
+    db: AsyncSession, trip_id: Optional[int] = None
+) -> None:
+    """Recompute the rollups from the expenses; the caller commits.
+
+    Expense writes racing with a rebuild can be lost from it, so run it
+    while the trips involved are quiet (or re-check afterwards).
+    """
+    groups = _expense_groups()
+    clear = delete(BudgetRollup)
+    if trip_id is not None:
+        groups = groups.where(Expense.trip_id == trip_id)
+        clear = clear.where(BudgetRollup.trip_id == trip_id)
+    await db.execute(clear)
+    await db.execute(insert(BudgetRollup).from_select(
+        [*BucketKey._fields, "total", "expense_count"], groups
+    ))
+
+
+async def _check(trip_id: Optional[int], repair: bool) -> int:
+    from database import dispose_engines, init_engines
+
+    async with init_engines().AsyncSessionLocal() as db:
+        drift = await find_drift(db, trip_id)
+        for key, expected, stored in drift:
+            print(f"{tuple(key)}: expenses {expected}, rollup {stored}")
+        print(f"{len(drift)} bucket(s) out of date")
+        if drift and repair:
+            await rebuild_rollups(db, trip_id)
+            await db.commit()
+            print("Rollups rebuilt")
+    await dispose_engines()
+    return 1 if drift and not repair else 0
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Check budget rollups against the expenses table."
+    )
+    parser.add_argument("--trip-id", type=int)
+    parser.add_argument(
+        "--repair", action="store_true", help="rebuild drifted rollups"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_check(args.trip_id, args.repair)))
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, String
+from database import Base
+
+
+class BudgetRollup(Base):
+    """Total of a trip's expenses for one day, category and currency.
+
+    Maintained by budget.py alongside every expense write; expenses
+    without a day are kept under day_number 0.
+    """
+
+    __tablename__ = "budget_rollups"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"),
+                     primary_key=True)
+    day_number = Column(Integer, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+
+    total = Column(Numeric(14, 2), nullable=False)
+    expense_count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (f"<BudgetRollup(trip_id={self.trip_id}, "
+                f"day={self.day_number}, category={self.category}, "
+                f"total={self.total} {self.currency})>")
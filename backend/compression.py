@@ -0,0 +1,151 @@
+"""Response compression: Brotli when installed, otherwise gzip.
+
+Text and JSON bodies of at least ``COMPRESSION_MIN_BYTES`` are
+compressed for clients that accept it. Brotli (``br``) is preferred
+but needs the optional ``brotli`` package; without it only gzip is
+offered. Streaming responses (the NDJSON export) are compressed chunk
+by chunk, each chunk flushed so rows still reach the client as they
+are produced.
+
+The middleware sits outside the response cache, so cached bodies are
+stored once, uncompressed, and compressed per client encoding.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._stream.compress(data) + self._stream.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._stream.compress(data) + self._stream.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._stream = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._stream.process(data) + self._stream.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._stream.process(data) + self._stream.finish()
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """``"br"``, ``"gzip"`` or None for an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        weight = params.replace(" ", "")
+        # "q=0" (or "q=0.0", ...) refuses the coding
+        if weight.startswith("q=") and not weight[2:].strip("0."):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large text and JSON responses."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = settings.COMPRESSION_MIN_BYTES,
+        gzip_level: int = settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = settings.COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compressible(
+        self, headers: MutableHeaders, size: int, more_body: bool
+    ) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            return False
+        # Streams are compressed whatever the size of their first chunk
+        return more_body or size >= self.minimum_size
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            return _Brotli(self.brotli_quality)
+        return _Gzip(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        encoding = None
+        if scope["type"] == "http":
+            encoding = accepted_encoding(
+                Headers(scope=scope).get("accept-encoding", "")
+            )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body shows whether to compress;
+                # copied, as replayed responses may share their headers
+                start = {**message, "headers": list(message["headers"])}
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if self._compressible(headers, len(body), more_body):
+                    compressor = self._compressor(encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    del headers["Content-Length"]
+            if compressor is not None:
+                body = (
+                    compressor.chunk(body) if more_body
+                    else compressor.finish(body)
+                )
+                message = {**message, "body": body}
+            if start is not None:
+                if compressor is not None and not more_body:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -29,6 +29,120 @@ class Settings(BaseSettings):
     # 7 days for refresh tokens
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
+    # Password hashing pool
+    # Worker processes for bcrypt; 0 means one per CPU core
+    PASSWORD_HASH_WORKERS: int = 0
+    # Pending hash/verify calls before requests get a 503
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Verified-token cache used by get_current_user
+    TOKEN_CACHE_SIZE: int = 10000
+    # Upper bound on staleness across workers (e.g. deactivation)
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    # Per-user maps of accessible trips used to authorize trip requests.
+    # Shares changed on another worker apply there within the TTL
+    PERMISSION_CACHE_USERS: int = 10000
+    PERMISSION_CACHE_TTL_SECONDS: float = 60
+    # Recently revoked refresh-token JTIs kept in memory (and loaded at
+    # startup); replays of older ones are caught by the table
+    REVOKED_TOKEN_CACHE_SIZE: int = 10000
+    # How often expired refresh-token revocations are deleted
+    REVOKED_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # ETag / 304 handling for authenticated GETs. The built-in backend
+    # is per process: keep one worker or plug in a shared backend.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 256 * 1024
+
+    # Database connection pool (SQLite ignores the sizes).
+    # "queue" keeps a pool per process; "null" opens a connection per
+    # checkout, for running behind PgBouncer in transaction mode
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing the request
+    DB_POOL_TIMEOUT: float = 30
+    # Ping on every checkout (one extra round-trip); alternatively set
+    # DB_POOL_RECYCLE below the server/proxy idle timeout and turn it off
+    DB_POOL_PRE_PING: bool = True
+    # Replace connections older than this many seconds; -1 disables
+    DB_POOL_RECYCLE: int = -1
+    # Reuse the most recently returned connection so surplus idle ones
+    # can expire server-side
+    DB_POOL_USE_LIFO: bool = False
+
+    # Read replicas for GET requests, as a JSON list of URLs (empty: all
+    # traffic uses DATABASE_URL). Uses the DB_POOL_* settings above
+    DATABASE_REPLICA_URLS: List[str] = []
+    # A user's reads stay on the primary this long after they write;
+    # keep it above the replicas' usual lag
+    REPLICA_STICKY_SECONDS: float = 5
+    # Replicas failing a SELECT 1 are skipped until one succeeds
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = 10
+    REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+
+    # Startup. The schema is managed by alembic (alembic upgrade head);
+    # nothing is created or checked at import time.
+    # Open the DB pool's connections before the first request
+    STARTUP_WARM_DB_POOL: bool = False
+    # Start the hashing workers and load bcrypt before the first login
+    STARTUP_WARM_PASSWORD_HASHER: bool = False
+
+    # Rows per INSERT batch / cursor fetch for NDJSON import and export
+    BULK_BATCH_ROWS: int = 1000
+
+    # Activity location search (geo.py): largest nearby radius, and the
+    # per-trip in-memory indexes kept for trip-scoped searches
+    NEARBY_MAX_RADIUS_M: float = 100_000
+    GEO_INDEX_CACHE_TRIPS: int = 256
+    GEO_INDEX_CACHE_TTL_SECONDS: float = 60
+
+    # Most located activities a day can have to be route-optimized
+    ROUTE_MAX_STOPS: int = 250
+
+    # Destination autocomplete dataset (TSV, see destinations.py) loaded
+    # at startup, and how long clients may cache suggestions
+    DESTINATIONS_FILE: str = "destinations.tsv"
+    DESTINATIONS_CACHE_SECONDS: int = 3600
+
+    # Exchange rates snapshot (JSON, see currency.py) used to convert
+    # budgets; re-read when it changes. A snapshot is bundled
+    CURRENCY_RATES_FILE: str = "currency_rates.json"
+    CURRENCY_RATES_REFRESH_SECONDS: float = 300
+
+    # Rate limits (token buckets, see rate_limit.py): a burst allowance
+    # refilled at a steady per-minute rate, kept per process unless a
+    # shared backend is plugged in. Login and register are limited per
+    # client IP, login also per username, and writes per user
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_AUTH_IP_PER_MINUTE: float = 30
+    RATE_LIMIT_AUTH_IP_BURST: int = 10
+    RATE_LIMIT_LOGIN_USER_PER_MINUTE: float = 5
+    RATE_LIMIT_LOGIN_USER_BURST: int = 5
+    RATE_LIMIT_WRITE_PER_MINUTE: float = 600
+    RATE_LIMIT_WRITE_BURST: int = 200
+    # Keys tracked per limit before refilled buckets are dropped
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # Live trip updates (/ws/trips/{id}): changes arriving within this
+    # window go out as one message; a client with this many messages
+    # unsent gets a single "resync" instead
+    REALTIME_BATCH_MS: int = 50
+    REALTIME_SEND_QUEUE: int = 64
+
+    # Compress text/JSON responses of at least this many bytes (gzip, or
+    # Brotli if the brotli package is installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Request/SQL instrumentation served at /metrics (Prometheus)
+    METRICS_ENABLED: bool = True
+    # Log every SQL statement (noisy; independent of DEBUG)
+    SQL_ECHO: bool = False
+
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
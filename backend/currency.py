@@ -0,0 +1,235 @@
+"""Offline currency conversion from a rates snapshot.
+
+Rates come from a JSON file (``CURRENCY_RATES_FILE``, a snapshot is
+bundled as ``currency_rates.json``) rather than an FX API, so conversion
+works offline and costs no network round-trip::
+
+    {"base": "USD", "as_of": "2026-10-01",
+     "rates": {"EUR": "0.9215", "JPY": "149.32"}}
+
+where each rate is units of the currency per one unit of ``base``. A
+snapshot is loaded into a ``RateTable``: currency codes map to indexes
+into an ``array`` of fixed-point integer rates. ``convert_minor`` takes
+a batch of amounts in integer minor units (cents, yen, fils) and
+converts it in one list comprehension of integer multiply/divide, with
+no Decimal arithmetic per amount and exact rounding (half away from
+zero). ``convert`` wraps it for Decimal amounts; the conversions in and
+out of Decimal cost more than the arithmetic, so bulk callers should
+select minor units (``benchmarks/bench_currency.py``).
+
+``CurrencyRates`` holds the current table and swaps in a new one with a
+single assignment when the file changes, so readers always see one
+complete snapshot.
+"""
+import asyncio
+import json
+import logging
+import os
+from math import gcd
+from array import array
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rates are stored as integers scaled by 10**RATE_DIGITS
+RATE_DIGITS = 10
+RATE_SCALE = 10 ** RATE_DIGITS
+
+# ISO 4217 minor units where they differ from 2
+MINOR_DIGITS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0,
+    "KMF": 0, "KRW": 0, "PYG": 0, "RWF": 0, "UGX": 0, "UYI": 0,
+    "VND": 0, "VUV": 0, "XAF": 0, "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3,
+    "TND": 3,
+}
+
+
+def minor_digits(currency: str) -> int:
+    """Decimal places of ``currency``'s minor unit."""
+    return MINOR_DIGITS.get(currency, 2)
+
+
+class UnknownCurrencyError(KeyError):
+    """The snapshot has no rate for a currency."""
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """One immutable rates snapshot."""
+
+    base: str
+    as_of: Optional[str]
+    codes: Tuple[str, ...]
+    index: Dict[str, int]
+    # Units per base unit, times RATE_SCALE, by currency index
+    rates: array
+    # 10 ** minor digits, by currency index
+    minor_scales: array
+    # rates[i] * minor_scales[i]
+    denominators: List[int]
+
+    @classmethod
+    def from_rates(
+        cls,
+        base: str,
+        rates: Dict[str, Decimal],
+        as_of: Optional[str] = None,
+    ) -> "RateTable":
+        rates = {**rates, base: Decimal(1)}
+        codes = tuple(sorted(rates))
+        scaled = []
+        for code in codes:
+            rate = Decimal(str(rates[code]))
+            if rate <= 0:
+                raise ValueError(f"rate for {code} must be positive")
+            scaled.append(int(
+                (rate * RATE_SCALE).to_integral_value(ROUND_HALF_UP)
+            ))
+        minor_scales = [10 ** minor_digits(code) for code in codes]
+        return cls(
+            base=base,
+            as_of=as_of,
+            codes=codes,
+            index={code: i for i, code in enumerate(codes)},
+            rates=array("q", scaled),
+            minor_scales=array("q", minor_scales),
+            denominators=[
+                rate * scale for rate, scale in zip(scaled, minor_scales)
+            ],
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "RateTable":
+        with open(path) as snapshot:
+            data = json.load(snapshot)
+        return cls.from_rates(
+            data["base"],
+            {
+                code: Decimal(str(rate))
+                for code, rate in data["rates"].items()
+            },
+            as_of=data.get("as_of"),
+        )
+
+    def currency_index(self, currency: str) -> int:
+        try:
+            return self.index[currency]
+        except KeyError:
+            raise UnknownCurrencyError(currency) from None
+
+    def convert_minor(
+        self,
+        amounts: Sequence[int],
+        currency_indexes: Sequence[int],
+        target: str,
+    ) -> List[int]:
+        """Convert minor-unit amounts into minor units of ``target``.
+
+        ``currency_indexes[i]`` is the ``currency_index`` of
+        ``amounts[i]``. Rounds half away from zero, exactly.
+        """
+        t = self.currency_index(target)
+        # amount * n / d, n and d being rate * minor scale of the target
+        # and of the source; per source, (2n, d, 2d) in lowest terms
+        n = self.denominators[t]
+        factors = []
+        for d in self.denominators:
+            g = gcd(n, d)
+            factors.append((2 * n // g, d // g, 2 * d // g))
+        pairs = zip(amounts, map(factors.__getitem__, currency_indexes))
+        # (2an + d) // 2d is round-half-up of an / d for a >= 0
+        if min(amounts, default=0) >= 0:
+            return [(a * n2 + d) // d2 for a, (n2, d, d2) in pairs]
+        return [
+            (a * n2 + d) // d2 if a >= 0 else -((d - a * n2) // d2)
+            for a, (n2, d, d2) in pairs
+        ]
+
+    def convert(
+        self,
+        amounts: Sequence[Decimal],
+        currencies: Sequence[str],
+        target: str,
+    ) -> List[Decimal]:
+        """Convert Decimal amounts in ``currencies`` into ``target``.
+
+        Amounts carrying more places than their currency's minor unit
+        are rounded to it first.
+        """
+        indexes = [self.currency_index(code) for code in currencies]
+        minor = [
+            int((amount * self.minor_scales[i]).to_integral_value(
+                ROUND_HALF_UP
+            ))
+            for amount, i in zip(amounts, indexes)
+        ]
+        places = -minor_digits(target)
+        return [
+            Decimal(value).scaleb(places)
+            for value in self.convert_minor(minor, indexes, target)
+        ]
+
+
+class CurrencyRates:
+    """The current ``RateTable``, reloaded when its file changes."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.table = RateTable.from_rates("USD", {})
+        self._mtime: Optional[float] = None
+
+    def load(self) -> bool:
+        """Reload the file if it changed; returns whether it did.
+
+        A missing or invalid file keeps the current table.
+        """
+        if not self.path:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return False
+            table = RateTable.from_file(self.path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring rates file %s: %r", self.path, exc)
+            return False
+        # One assignment: readers see the old or the new table, whole
+        self.table = table
+        self._mtime = mtime
+        logger.info(
+            "Loaded %d currency rates (base %s, as of %s)",
+            len(table.codes), table.base, table.as_of,
+        )
+        return True
+
+    async def refresh_forever(
+        self,
+        interval: float,
+        on_change: Optional[Callable[[], Awaitable[object]]] = None,
+    ) -> None:
+        """Re-check the file every ``interval`` seconds.
+
+        ``on_change`` is awaited after each reload that changed the table.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if await asyncio.to_thread(self.load) and on_change:
+                await on_change()
+
+
+currency_rates = CurrencyRates(settings.CURRENCY_RATES_FILE)
@@ -1,36 +1,223 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import AsyncExitStack
+from typing import NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event, exc, make_url, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from config import settings
-import os
+from metrics import PoolMetrics, metrics_registry
+from replicas import SAFE_METHODS, Replica, ReplicaRouter
+from token_cache import token_cache
 
-# Build engine kwargs based on database type
-engine_kwargs = {
-    "echo": settings.DEBUG,
+# Async drivers for each sync DATABASE_URL scheme
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
 }
 
-# SQLite does not support pool_size or pool_pre_ping
-if not settings.DATABASE_URL.startswith("sqlite"):
-    engine_kwargs["pool_pre_ping"] = True
-    engine_kwargs["pool_size"] = int(
-        os.getenv("DB_POOL_SIZE", "5")
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use its async driver."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+POOL_MODES = ("queue", "null")
+
+
+class _TimedCheckout:
+    """Pool mixin reporting how long each checkout takes to PoolMetrics."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_checkout(
+                    time.perf_counter() - started, timed_out
+                )
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _sqlite_in_memory(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(url: str, asynchronous: bool = False) -> dict:
+    """``create_engine`` keyword arguments from the DB_POOL_* settings."""
+    options = {"echo": settings.SQL_ECHO}
+    queue_pool = TimedAsyncQueuePool if asynchronous else TimedQueuePool
+
+    # SQLite does not support pool_size or pool_pre_ping
+    if url.startswith("sqlite"):
+        if not asynchronous:
+            options["connect_args"] = {"check_same_thread": False}
+        if not _sqlite_in_memory(url):
+            options["poolclass"] = queue_pool
+        return options
+
+    if settings.DB_POOL_MODE not in POOL_MODES:
+        raise ValueError(
+            f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}"
+        )
+    if settings.DB_POOL_MODE == "null":
+        options["poolclass"] = NullPool
+        if asynchronous:
+            # PgBouncer in transaction mode cannot keep prepared
+            # statements across transactions
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+    else:
+        options.update(
+            poolclass=queue_pool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_use_lifo=settings.DB_POOL_USE_LIFO,
+        )
+    options.update(
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
     )
-    engine_kwargs["max_overflow"] = int(
-        os.getenv("DB_MAX_OVERFLOW", "10")
+    return options
+
+
+class Engines(NamedTuple):
+    """The engines and session factories, created together."""
+
+    engine: Engine
+    async_engine: AsyncEngine
+    SessionLocal: sessionmaker
+    AsyncSessionLocal: async_sessionmaker
+    replicas: ReplicaRouter
+
+
+# Built on first use (or by init_engines() in the app lifespan), so
+# importing this module never loads a driver or touches the database
+_engines: Optional[Engines] = None
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces ON DELETE CASCADE with foreign keys enabled
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def init_engines() -> Engines:
+    """Create the engines and session factories on first call."""
+    global _engines
+    if _engines is not None:
+        return _engines
+
+    # Create database engine with configurable pool settings
+    engine = create_engine(
+        settings.DATABASE_URL,
+        **engine_options(settings.DATABASE_URL)
     )
-else:
-    engine_kwargs["connect_args"] = {
-        "check_same_thread": False
-    }
-
-# Create database engine with configurable pool settings
-engine = create_engine(
-    settings.DATABASE_URL,
-    **engine_kwargs
-)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Async engine sharing the same database and pool settings
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        **engine_options(settings.DATABASE_URL, asynchronous=True)
+    )
+    metrics_registry.add_pool(PoolMetrics("sync").attach(engine))
+    metrics_registry.add_pool(
+        PoolMetrics("async").attach(async_engine.sync_engine)
+    )
+
+    # Read replicas for GET requests (see replicas.py)
+    replica_engines = [
+        create_async_engine(
+            async_database_url(url),
+            **engine_options(url, asynchronous=True)
+        )
+        for url in settings.DATABASE_REPLICA_URLS
+    ]
+    replicas = ReplicaRouter(
+        replica_engines, sticky_seconds=settings.REPLICA_STICKY_SECONDS
+    )
+    for replica in replicas.replicas:
+        metrics_registry.add_pool(
+            PoolMetrics(replica.name).attach(replica.engine.sync_engine)
+        )
+
+    if settings.DATABASE_URL.startswith("sqlite"):
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "connect", _enable_sqlite_foreign_keys)
+
+    _engines = Engines(
+        engine=engine,
+        async_engine=async_engine,
+        SessionLocal=sessionmaker(
+            autocommit=False, autoflush=False, bind=engine
+        ),
+        AsyncSessionLocal=async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        ),
+        replicas=replicas,
+    )
+    return _engines
+
+
+def __getattr__(name: str):
+    # ``from database import engine`` etc. keep working, lazily
+    if name in Engines._fields:
+        return getattr(init_engines(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def warm_pool() -> int:
+    """Open the pool's connections ahead of the first request.
+
+    Returns the number of connections opened.
+    """
+    async_engine = init_engines().async_engine
+    connections = getattr(async_engine.pool, "size", lambda: 1)()
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            conn = await stack.enter_async_context(async_engine.connect())
+            await conn.execute(text("SELECT 1"))
+    return connections
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections (the pools reopen on demand)."""
+    if _engines is not None:
+        await _engines.async_engine.dispose()
+        _engines.engine.dispose()
+        await _engines.replicas.dispose()
 
 # Base class for models
 Base = declarative_base()
@@ -41,8 +228,60 @@ def get_db():
     Dependency function to get database session.
     Yields a database session and closes it after use.
     """
-    db = SessionLocal()
+    db = init_engines().SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def _bearer_user(request: Request) -> Tuple[Optional[str], Optional[int]]:
+    """The request's bearer token and, if cached, its user's id."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None, None
+    principal = token_cache.peek(token)
+    return token, principal.id if principal is not None else None
+
+
+def read_replica(request: Request) -> Optional[Replica]:
+    """The replica to serve ``request`` from, or None for the primary.
+
+    Tokens missing from the token cache are looked up on the primary, so
+    a user who has just registered can sign in despite replica lag.
+    """
+    if request.method not in SAFE_METHODS:
+        return None
+    token, user_id = _bearer_user(request)
+    if token is not None and user_id is None:
+        return None
+    return init_engines().replicas.reader(user_id)
+
+
+async def get_async_db(request: Request):
+    """
+    Dependency function to get an async database session.
+    Yields an AsyncSession and closes it after use. Reads may be routed
+    to a replica; writes use the primary and pin the user's next reads
+    to it for REPLICA_STICKY_SECONDS.
+    """
+    engines = init_engines()
+    replica = read_replica(request)
+    session_factory = (
+        replica.sessionmaker if replica is not None
+        else engines.AsyncSessionLocal
+    )
+    try:
+        async with session_factory() as db:
+            yield db
+    except (exc.OperationalError, exc.InterfaceError) as error:
+        if replica is not None:
+            replica.mark(False, repr(error))
+        raise
+    finally:
+        if request.method not in SAFE_METHODS:
+            # The endpoint has authenticated, so the token is cached
+            _, user_id = _bearer_user(request)
+            if user_id is not None:
+                engines.replicas.record_write(user_id)
@@ -0,0 +1,256 @@
+"""Destination autocomplete from a bundled, memory-mapped dataset.
+
+The dataset (``DESTINATIONS_FILE``) is a tab-separated file of
+``name, country, popularity`` lines. At startup it is memory-mapped
+and indexed as a sorted array of match keys: every word suffix of each
+name, accent-folded and lowercased (``"São Paulo"`` is found by
+``"sao"`` and by ``"paulo"``), each pointing back to its line in the
+mapping. Only the keys, line offsets and popularities live on the heap;
+names are decoded from the mapping for the few results returned.
+
+A prefix is one ``bisect`` range of the keys. Results are ranked by
+popularity: the top matches of prefixes with many matches are computed
+at load, smaller ranges are ranked on the fly. If a query of at least
+``FUZZY_MIN_LENGTH`` characters has fewer matches than asked for, the
+remaining slots go to prefixes one edit (insert, delete, substitute,
+transpose) away, past the first character, trying only the characters
+the index actually has at the edited position.
+"""
+import heapq
+import logging
+import mmap
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Most suggestions one query returns
+MAX_SUGGESTIONS = 20
+# Prefixes matching more keys than this get their ranking precomputed
+PRECOMPUTE_ABOVE = 64
+FUZZY_MIN_LENGTH = 3
+# Leading characters typo tolerance never edits
+FUZZY_FIXED = 1
+# Sorts after every key that starts with a given prefix
+_PREFIX_END = "\U0010ffff"
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Match key of ``text``: accents folded, lowercase, single spaces."""
+    if not text.isascii():
+        text = "".join(
+            c for c in unicodedata.normalize("NFKD", text)
+            if not unicodedata.combining(c)
+        )
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+class Suggestion(NamedTuple):
+    """One destination; ``fuzzy`` if only matched with an edit."""
+
+    name: str
+    country: str
+    popularity: int
+    fuzzy: bool
+
+
+class DestinationIndex:
+    """Sorted-array prefix index over a mapped destinations file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._file = None
+        self._map = None
+        entries: List[Tuple[str, int, int]] = []
+        if path:
+            self._file = open(path, "rb")
+            if self._file.seek(0, 2):
+                self._map = mmap.mmap(
+                    self._file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+                entries = self._read_entries()
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._offsets = array("Q", [offset for _, offset, _ in entries])
+        self._popularity = array("q", [rank for _, _, rank in entries])
+        self._top = self._precompute_top()
+        self.size = len({offset for offset in self._offsets})
+
+    def _read_entries(self) -> List[Tuple[str, int, int]]:
+        entries = []
+        offset, data = 0, self._map
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            if end < 0:
+                end = len(data)
+            line = data[offset:end]
+            if line.strip() and not line.startswith(b"#"):
+                name, _, popularity = line.decode().split("\t")
+                words = normalize(name).split(" ")
+                for i in range(len(words)):
+                    entries.append(
+                        (" ".join(words[i:]), offset, int(popularity))
+                    )
+            offset = end + 1
+        return entries
+
+    def _children(self, prefix: str, lo: int, hi: int):
+        """``(char, lo, hi)`` of each ``prefix + char`` in keys lo..hi."""
+        keys, depth = self._keys, len(prefix)
+        i = lo
+        while i < hi:
+            if len(keys[i]) <= depth:
+                i += 1
+                continue
+            char = keys[i][depth]
+            end = bisect_left(keys, prefix + char + _PREFIX_END, i, hi)
+            yield char, i, end
+            i = end
+
+    def _precompute_top(self) -> Dict[str, List[int]]:
+        """Top entries of every prefix with many matches."""
+        top: Dict[str, List[int]] = {}
+        pending = [("", 0, len(self._keys))]
+        while pending:
+            prefix, lo, hi = pending.pop()
+            top[prefix] = self._rank(range(lo, hi))
+            for char, child_lo, child_hi in self._children(prefix, lo, hi):
+                if child_hi - child_lo > PRECOMPUTE_ABOVE:
+                    pending.append((prefix + char, child_lo, child_hi))
+        return top
+
+    def _rank(self, entries) -> List[int]:
+        # Room for a name matching through more than one of its words
+        count = MAX_SUGGESTIONS * 2
+        if isinstance(entries, range) and len(entries) > 4 * count:
+            return heapq.nlargest(
+                count, entries, key=self._popularity.__getitem__
+            )
+        # Small inputs: one sort in C beats the heap
+        return sorted(
+            entries, key=self._popularity.__getitem__, reverse=True
+        )[:count]
+
+    def _range(self, prefix: str, lo: int = 0, hi: Optional[int] = None):
+        keys = self._keys
+        hi = len(keys) if hi is None else hi
+        start = bisect_left(keys, prefix, lo, hi)
+        return start, bisect_left(keys, prefix + _PREFIX_END, start, hi)
+
+    def _candidates(self, prefix: str, lo: int, hi: int):
+        """Entries worth ranking among keys ``lo..hi`` of ``prefix``."""
+        top = self._top.get(prefix)
+        return range(lo, hi) if top is None else top
+
+    def _one_edit(self, query: str) -> Dict[str, Tuple[int, int]]:
+        """Key ranges of the prefixes one edit from ``query``.
+
+        The first ``FUZZY_FIXED`` characters are taken as typed. Edits
+        at a position keep the query before it, so each is looked up
+        within that head's range, and inserted or substituted letters
+        are only those the index has there.
+        """
+        found: Dict[str, Tuple[int, int]] = {}
+
+        def look(variant, lo, hi):
+            if variant not in found:
+                start, end = self._range(variant, lo, hi)
+                if start < end:
+                    found[variant] = (start, end)
+
+        lo, hi = self._range(query[:FUZZY_FIXED])
+        for p in range(FUZZY_FIXED, len(query) + 1):
+            head, rest = query[:p], query[p:]
+            for char, child_lo, child_hi in self._children(head, lo, hi):
+                look(head + char + rest, child_lo, child_hi)  # insert
+                if rest and char != rest[0]:
+                    # substitute
+                    look(head + char + rest[1:], child_lo, child_hi)
+            # Deleting the last letter would just match a shorter prefix
+            if len(rest) > 1:
+                look(head + rest[1:], lo, hi)  # delete
+                if rest[0] != rest[1]:
+                    look(head + rest[1] + rest[0] + rest[2:], lo, hi)
+            if not rest:
+                break
+            # Edits further on keep query[:p + 1]: stop once it is gone
+            lo, hi = self._range(query[:p + 1], lo, hi)
+            if lo == hi:
+                break
+        found.pop(query, None)
+        return found
+
+    def _suggestion(self, entry: int, fuzzy: bool) -> Suggestion:
+        offset = self._offsets[entry]
+        end = self._map.find(b"\n", offset)
+        line = self._map[offset:end if end >= 0 else len(self._map)]
+        name, country, _ = line.decode().split("\t")
+        return Suggestion(name, country, self._popularity[entry], fuzzy)
+
+    def suggest(self, query: str, limit: int = 10) -> List[Suggestion]:
+        """Up to ``limit`` destinations for what the user has typed."""
+        key = normalize(query)
+        limit = min(limit, MAX_SUGGESTIONS)
+        if not key or not self._keys:
+            return []
+        seen = set()
+        results = []
+
+        def take(entries, fuzzy):
+            for entry in entries:
+                offset = self._offsets[entry]
+                if offset not in seen:
+                    seen.add(offset)
+                    results.append((entry, fuzzy))
+
+        take(self._rank(self._candidates(key, *self._range(key))), False)
+        if len(results) < limit and len(key) >= FUZZY_MIN_LENGTH:
+            take(self._rank(chain.from_iterable(
+                self._candidates(variant, lo, hi)
+                for variant, (lo, hi) in self._one_edit(key).items()
+            )), True)
+        return [
+            self._suggestion(entry, fuzzy)
+            for entry, fuzzy in results[:limit]
+        ]
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class Destinations:
+    """The current ``DestinationIndex``, built from its file on ``load``."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.index = DestinationIndex()
+
+    def load(self) -> bool:
+        """(Re)build the index; a missing file keeps the current one."""
+        if not self.path:
+            return False
+        try:
+            index = DestinationIndex(self.path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                "Ignoring destinations file %s: %r", self.path, exc
+            )
+            return False
+        # The previous index's mapping closes once no request uses it
+        self.index = index
+        logger.info("Loaded %d destinations", index.size)
+        return True
+
+
+destinations = Destinations(settings.DESTINATIONS_FILE)
@@ -0,0 +1,30 @@
+from sqlalchemy import (Column, DateTime, ForeignKey, Integer, Numeric,
+                        String)
+from sqlalchemy.sql import func
+from database import Base
+
+
+class Expense(Base):
+    """Money spent (or planned) on a trip, optionally per activity"""
+
+    __tablename__ = "expenses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"),
+                     nullable=False, index=True)
+    activity_id = Column(Integer,
+                         ForeignKey("activities.id", ondelete="SET NULL"),
+                         nullable=True)
+    day_number = Column(Integer, nullable=True)
+
+    amount = Column(Numeric(12, 2), nullable=False)
+    currency = Column(String(3), nullable=False, default="USD")
+    category = Column(String(50), nullable=False, default="other")
+    description = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime(timezone=True),
+                        server_default=func.now())
+
+    def __repr__(self):
+        return (f"<Expense(id={self.id}, trip_id={self.trip_id}, "
+                f"amount={self.amount} {self.currency})>")
@@ -0,0 +1,50 @@
+"""Sparse fieldsets: ``?fields=`` on list and detail endpoints.
+
+``?fields=id,title,start_date`` narrows a response to those fields of
+its schema. The endpoint SELECTs only the matching columns
+(``load_only``, plus any it needs itself, such as a cursor's) and
+encodes only the requested fields with ``RowEncoder.only``. Without
+``fields`` the full schema is returned as before.
+"""
+from typing import Callable, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+Fields = Optional[Tuple[str, ...]]
+
+
+def field_selector(model: Type[BaseModel]) -> Callable[..., Fields]:
+    """Dependency parsing ``?fields=`` against ``model``'s fields."""
+    allowed = tuple(model.model_fields)
+    choices = ", ".join(allowed)
+
+    def selected_fields(
+        fields: Optional[str] = Query(
+            default=None,
+            description=f"Comma-separated subset of: {choices}",
+        ),
+    ) -> Fields:
+        if fields is None:
+            return None
+        names = tuple(dict.fromkeys(
+            name.strip() for name in fields.split(",") if name.strip()
+        ))
+        if not names or not set(names).issubset(allowed):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"fields must be a comma-separated subset of: "
+                       f"{choices}",
+            )
+        return names
+
+    return selected_fields
+
+
+def load_fields(entity, fields: Fields, *required: str) -> tuple:
+    """Loader options for the columns of ``fields`` and ``required``."""
+    if fields is None:
+        return ()
+    names = dict.fromkeys((*fields, *required))
+    return (load_only(*(getattr(entity, name) for name in names)),)
@@ -0,0 +1,208 @@
+"""Spatial keys and range covers for activity locations.
+
+Each located activity stores ``geo_key``: its longitude and latitude
+quantized to ``BITS`` bits each and interleaved (a Z-order / Morton
+code, the integer form of a geohash). Every geohash cell is then one
+contiguous range of keys, so "activities in these cells" is a handful
+of ``geo_key BETWEEN`` ranges that a plain B-tree index answers on any
+database, SQLite included.
+
+``circle_ranges`` and ``box_ranges`` cover a search area with a few
+cells of a suitable level; callers fetch the candidates in those ranges
+and keep the ones actually inside with ``haversine_m`` or a box test.
+``GeoIndex`` runs the same covers over sorted keys in memory, and
+``trip_geo_cache`` keeps one per recently queried trip.
+"""
+import math
+from bisect import bisect_left
+from typing import Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from config import settings
+from ttl_cache import TTLCache
+
+# Bits per axis: cells of about 0.6 m at the finest level
+BITS = 26
+_CELLS = 1 << BITS
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+Range = Tuple[int, int]
+T = TypeVar("T")
+
+
+def _spread(value: int) -> int:
+    """Insert a zero bit above each of ``value``'s low 32 bits."""
+    value &= 0xFFFFFFFF
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    return (value | (value << 1)) & 0x5555555555555555
+
+
+def _interleave(x: int, y: int) -> int:
+    # Longitude takes the higher bit of each pair, as in a geohash
+    return (_spread(x) << 1) | _spread(y)
+
+
+def _cell_x(lon: float) -> int:
+    return min(int((lon + 180.0) / 360.0 * _CELLS), _CELLS - 1)
+
+
+def _cell_y(lat: float) -> int:
+    return min(int((lat + 90.0) / 180.0 * _CELLS), _CELLS - 1)
+
+
+def geo_key(lat: Optional[float], lon: Optional[float]) -> Optional[int]:
+    """Z-order key of a point, or None without coordinates."""
+    if lat is None or lon is None:
+        return None
+    return _interleave(_cell_x(lon), _cell_y(lat))
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2)
+        * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _level_for(lat_span: float, lon_span: float) -> int:
+    """Finest level whose cells are at least the given spans (degrees)."""
+    level = BITS
+    if lat_span > 0:
+        level = min(level, int(math.log2(180.0 / lat_span)))
+    if lon_span > 0:
+        level = min(level, int(math.log2(360.0 / lon_span)))
+    return max(level, 0)
+
+
+def _ranges(cells, level: int) -> List[Range]:
+    """Sorted, merged key ranges ``[lo, hi)`` of cells at ``level``."""
+    shift = 2 * (BITS - level)
+    starts = sorted({_interleave(x, y) << shift for x, y in cells})
+    ranges: List[Range] = []
+    for start in starts:
+        end = start + (1 << shift)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def circle_ranges(lat: float, lon: float, radius_m: float) -> List[Range]:
+    """Key ranges covering every point within ``radius_m`` of a point.
+
+    Uses the 3x3 block of cells around the center at the finest level
+    whose cells are at least the radius across.
+    """
+    lat_span = radius_m / METERS_PER_DEGREE
+    # Longitude degrees shrink towards the poles: size for the worst
+    widest = min(abs(lat) + lat_span, 89.9)
+    lon_span = lat_span / math.cos(math.radians(widest))
+    if lon_span >= 180.0 or lat_span >= 90.0:
+        return [(0, 1 << (2 * BITS))]
+    level = _level_for(lat_span, lon_span)
+    shift = BITS - level
+    count = 1 << level
+    cx, cy = _cell_x(lon) >> shift, _cell_y(lat) >> shift
+    cells = [
+        ((cx + dx) % count, cy + dy)
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        if 0 <= cy + dy < count
+    ]
+    return _ranges(cells, level)
+
+
+def box_ranges(
+    south: float, west: float, north: float, east: float
+) -> List[Range]:
+    """Key ranges covering a box; ``west > east`` crosses 180 degrees."""
+    if west > east:
+        return sorted(
+            box_ranges(south, west, north, 180.0)
+            + box_ranges(south, -180.0, north, east)
+        )
+    # Cells at least half the box across: at most 3x3 of them
+    level = _level_for((north - south) / 2, (east - west) / 2)
+    shift = BITS - level
+    cells = [
+        (x, y)
+        for x in range(_cell_x(west) >> shift, (_cell_x(east) >> shift) + 1)
+        for y in range(
+            _cell_y(south) >> shift, (_cell_y(north) >> shift) + 1
+        )
+    ]
+    return _ranges(cells, level)
+
+
+def in_box(
+    lat: float, lon: float,
+    south: float, west: float, north: float, east: float,
+) -> bool:
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lon <= east
+    return lon >= west or lon <= east
+
+
+class GeoIndex(Generic[T]):
+    """Points sorted by ``geo_key`` and searched with range covers."""
+
+    def __init__(self, points: Sequence[Tuple[float, float, T]]):
+        entries = sorted(
+            ((geo_key(lat, lon), lat, lon, item) for lat, lon, item in points),
+            key=lambda entry: entry[0],
+        )
+        self._keys = [entry[0] for entry in entries]
+        self._points = [entry[1:] for entry in entries]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _candidates(self, ranges: List[Range]):
+        for lo, hi in ranges:
+            start = bisect_left(self._keys, lo)
+            end = bisect_left(self._keys, hi, start)
+            yield from self._points[start:end]
+
+    def nearby(
+        self, lat: float, lon: float, radius_m: float
+    ) -> List[Tuple[float, T]]:
+        """``(distance_m, item)`` within ``radius_m``, nearest first."""
+        found = []
+        for point_lat, point_lon, item in self._candidates(
+            circle_ranges(lat, lon, radius_m)
+        ):
+            distance = haversine_m(lat, lon, point_lat, point_lon)
+            if distance <= radius_m:
+                found.append((distance, item))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def within(
+        self, south: float, west: float, north: float, east: float
+    ) -> List[T]:
+        """Items inside a box, in key order."""
+        return [
+            item
+            for lat, lon, item in self._candidates(
+                box_ranges(south, west, north, east)
+            )
+            if in_box(lat, lon, south, west, north, east)
+        ]
+
+
+# Trip id -> index of its activities. Activity writes in this process
+# invalidate their trip; the TTL bounds staleness across workers
+trip_geo_cache: "TTLCache[int, GeoIndex]" = TTLCache(
+    max_size=settings.GEO_INDEX_CACHE_TRIPS,
+    ttl_seconds=settings.GEO_INDEX_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,137 @@
+"""Password hashing on a dedicated process pool.
+
+bcrypt is deliberately slow (~250ms per call), so running it inline in a
+request handler ties up a server thread and starves cheap endpoints such
+as ``/health`` during a burst of logins. ``PasswordHasher`` moves that
+work onto a ``ProcessPoolExecutor`` so it scales across cores, and sheds
+load with ``HasherBusyError`` once too many calls are waiting.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from config import settings
+from metrics import record_password_hash
+
+_pwd_context = None
+
+
+def _get_context():
+    """Build the passlib context on first use (once per process)."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto"
+        )
+    return _pwd_context
+
+
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt in the current process."""
+    return _get_context().hash(password)
+
+
+def verify_password(
+    plain_password: str, hashed_password: str
+) -> bool:
+    """Verify a password against a bcrypt hash in this process."""
+    return _get_context().verify(plain_password, hashed_password)
+
+
+def load_backend() -> str:
+    """Load the bcrypt backend in this process; returns its name."""
+    return _get_context().handler("bcrypt").get_backend()
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt hashing and verification."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of calls submitted and not yet finished."""
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the server process has threads running
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HasherBusyError(
+                f"{self._pending} password hashing calls pending"
+            )
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), fn, *args
+            )
+        finally:
+            self._pending -= 1
+            record_password_hash(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the pool."""
+        return await self._run(hash_password, password)
+
+    async def verify(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """Verify a password on the pool."""
+        return await self._run(
+            verify_password, plain_password, hashed_password
+        )
+
+    async def warm_up(self) -> None:
+        """Start the workers and load bcrypt in each, off the hot path."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, load_backend)
+            for _ in range(self.max_workers)
+        ))
+
+    def configure(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """Resize the pool; running workers are shut down first."""
+        self.shutdown()
+        if max_workers is not None:
+            self.max_workers = max_workers
+        if max_pending is not None:
+            self.max_pending = max_pending
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (restarted lazily on next use)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -1,12 +1,109 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from compression import CompressionMiddleware
 from config import settings
-from database import Base, engine
+from currency import currency_rates
+from database import dispose_engines, init_engines, warm_pool
+from destinations import destinations
+from hashing import password_hasher
+from metrics import MetricsMiddleware, metrics_registry
+from rate_limit import limit_writes
+from response_cache import (
+    GLOBAL_VERSION_KEY,
+    ResponseCacheMiddleware,
+    response_cache_backend,
+    response_cache_stats,
+)
+from revocation import purge_revoked_tokens_forever, revocation_store
+from router_activities import router as activities_router
 from router_auth import router as auth_router
+from router_destinations import router as destinations_router
+from router_expenses import router as expenses_router
+from router_realtime import router as realtime_router
+from router_trips import router as trips_router
+from serialization import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks.
+
+    The time spent in each startup step is logged and kept in
+    ``app.state.startup_timings`` (milliseconds).
+    """
+    # CPU used by the process before startup: interpreter and imports
+    timings = {"boot_cpu": time.process_time() * 1000}
+    step_started = time.perf_counter()
+
+    def step_done(name: str) -> None:
+        nonlocal step_started
+        now = time.perf_counter()
+        timings[name] = (now - step_started) * 1000
+        step_started = now
+
+    engines = init_engines()
+    step_done("engines")
+    if settings.STARTUP_WARM_DB_POOL:
+        await warm_pool()
+        step_done("db_pool")
+    if settings.STARTUP_WARM_PASSWORD_HASHER:
+        await password_hasher.warm_up()
+        step_done("password_hasher")
+    async with engines.AsyncSessionLocal() as db:
+        await revocation_store.load(db)
+    step_done("revocations")
+    if engines.replicas.replicas:
+        await engines.replicas.check_health(
+            settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS
+        )
+        step_done("replicas")
+    await asyncio.to_thread(currency_rates.load)
+    step_done("currency_rates")
+    await asyncio.to_thread(destinations.load)
+    step_done("destinations")
+
+    app.state.startup_timings = timings
+    logger.info(
+        "Startup timings (ms): %s",
+        ", ".join(f"{name}={ms:.1f}" for name, ms in timings.items()),
+    )
+    purge_task = asyncio.create_task(
+        purge_revoked_tokens_forever(
+            settings.REVOKED_TOKEN_PURGE_INTERVAL_SECONDS
+        )
+    )
+    tasks = [purge_task]
+    if engines.replicas.replicas:
+        tasks.append(asyncio.create_task(
+            engines.replicas.check_health_forever(
+                settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS,
+                settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS,
+            )
+        ))
+    # Converted budgets depend on the rates: revalidate every ETag
+    tasks.append(asyncio.create_task(
+        currency_rates.refresh_forever(
+            settings.CURRENCY_RATES_REFRESH_SECONDS,
+            on_change=lambda: response_cache_backend.bump_version(
+                GLOBAL_VERSION_KEY
+            ),
+        )
+    ))
+    yield
+    for task in tasks:
+        task.cancel()
+    password_hasher.shutdown()
+    await dispose_engines()
 
-# Create database tables on startup
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -14,25 +111,69 @@ app = FastAPI(
     description=(
         "Travel Planner API - Plan and organize your trips"
     ),
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Answer conditional GETs from per-user versions (inside CORS)
+if settings.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        backend=response_cache_backend,
+        stats=response_cache_stats,
+    )
+
+# Compress large bodies, including the cache's replays
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=[
-        "GET", "POST", "PUT", "DELETE", "OPTIONS",
+        "GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS",
     ],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
+# Time every request (outermost, so cached and CORS responses count too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
 # Include auth router
 app.include_router(
     auth_router,
     prefix="/api/v1/auth",
     tags=["authentication"],
 )
+# Writes to user data are rate limited per user
+app.include_router(
+    trips_router,
+    prefix="/api/v1/trips",
+    tags=["trips"],
+    dependencies=[Depends(limit_writes)],
+)
+app.include_router(
+    activities_router,
+    prefix="/api/v1/activities",
+    tags=["activities"],
+    dependencies=[Depends(limit_writes)],
+)
+app.include_router(
+    expenses_router,
+    prefix="/api/v1/expenses",
+    tags=["expenses"],
+    dependencies=[Depends(limit_writes)],
+)
+app.include_router(
+    destinations_router,
+    prefix="/api/v1/destinations",
+    tags=["destinations"],
+)
+app.include_router(realtime_router, tags=["realtime"])
 
 
 @app.get("/")
@@ -51,9 +192,11 @@ async def health_check():
     return {"status": "healthy"}
 
 
-# TODO: Import and include routers for trips and activities
-# app.include_router(trips.router, prefix="/api/v1/trips",
-#                    tags=["trips"])
-# app.include_router(activities.router,
-#                    prefix="/api/v1/activities",
-#                    tags=["activities"])
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Per-route request metrics in Prometheus text format"""
+        return PlainTextResponse(
+            metrics_registry.render(),
+            media_type="text/plain; version=0.0.4",
+        )
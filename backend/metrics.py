@@ -0,0 +1,417 @@
+"""Request timing and SQL instrumentation, exported for Prometheus.
+
+``MetricsMiddleware`` times every HTTP request and labels it with the
+route template (``/api/v1/trips/{trip_id}``) rather than the raw path,
+so the number of series stays bounded. While a request runs, a
+``RequestStats`` held in a contextvar collects the SQL statements it
+executes and their time (engine events) plus the time spent waiting for
+password hashing; they are folded into per-route series when the
+response completes. These engine hooks are the only statement counter:
+the response cache reads the same stats (``collecting_stats``).
+Connection pools registered with ``add_pool`` export their size,
+checked-out and overflow gauges and checkout times too.
+``MetricsRegistry.render`` produces the Prometheus text exposition
+format served at ``/metrics``.
+
+Recording is a few dict lookups and ``perf_counter`` calls per request
+and per statement; ``benchmarks/bench_metrics_overhead.py`` keeps it
+honest.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+
+# Prometheus client defaults, in seconds
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_CHECKOUT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0, 10.0, 30.0,
+)
+
+# Route label for requests the router never saw
+UNMATCHED_ROUTE = "<unmatched>"
+# Route label for responses answered by the response cache
+RESPONSE_CACHE_ROUTE = "<response-cache>"
+
+
+class RequestStats:
+    """Work done while serving one request."""
+
+    __slots__ = (
+        "statements", "db_seconds", "pool_wait_seconds", "hash_seconds",
+    )
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = (
+    contextvars.ContextVar("request_stats", default=None)
+)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being served, if any."""
+    return _current.get()
+
+
+@contextmanager
+def collecting_stats() -> Iterator[RequestStats]:
+    """The current request's stats, collecting them if nothing does.
+
+    With the metrics middleware disabled, the stats only live for the
+    ``with`` block.
+    """
+    stats = _current.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def record_password_hash(seconds: float) -> None:
+    """Add time spent waiting for bcrypt to the current request."""
+    stats = _current.get()
+    if stats is not None:
+        stats.hash_seconds += seconds
+
+
+# Registered on the Engine class: engines are created lazily
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    started = getattr(context, "_metrics_started", None)
+    if started is not None:
+        stats.db_seconds += time.perf_counter() - started
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus ``le`` semantics."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus +Inf; not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile like PromQL's ``histogram_quantile``."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class RouteMetrics:
+    """Series for one (method, route) pair."""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.responses: Dict[int, int] = {}
+
+
+def _labels(**labels: str) -> str:
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+         .replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
+
+
+class MetricsRegistry:
+    """Per-route request metrics plus connection pool series."""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._pools: List["PoolMetrics"] = []
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        stats: RequestStats,
+    ) -> None:
+        """Record one finished request."""
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._routes.setdefault(key, RouteMetrics())
+        metrics.latency.observe(seconds)
+        metrics.statements.observe(stats.statements)
+        metrics.db_seconds += stats.db_seconds
+        metrics.pool_wait_seconds += stats.pool_wait_seconds
+        metrics.hash_seconds += stats.hash_seconds
+        metrics.responses[status] = metrics.responses.get(status, 0) + 1
+
+    def route(self, method: str, route: str) -> Optional[RouteMetrics]:
+        return self._routes.get((method, route))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def add_pool(self, pool_metrics: "PoolMetrics") -> None:
+        """Export a connection pool's series as well."""
+        self._pools.append(pool_metrics)
+
+    def render(self) -> str:
+        """Render every series in the Prometheus text format."""
+        routes = [
+            (_labels(method=method, route=route), metrics)
+            for (method, route), metrics in sorted(self._routes.items())
+        ]
+        pools = [(_labels(pool=pool.name), pool) for pool in self._pools]
+        lines: List[str] = []
+
+        def histogram(name, help_text, series, attribute):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, source in series:
+                hist = getattr(source, attribute)
+                cumulative = 0
+                for bound, count in zip(
+                    hist.buckets + ("+Inf",), hist.counts
+                ):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{{{labels},le=\"{bound}\"}}"
+                        f" {cumulative}"
+                    )
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        def scalar(name, kind, help_text, series, attribute):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, source in series:
+                value = getattr(source, attribute)
+                if value is not None:
+                    lines.append(f"{name}{{{labels}}} {value}")
+
+        lines.append("# HELP http_requests_total Responses by status.")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), metrics in sorted(self._routes.items()):
+            for status, count in sorted(metrics.responses.items()):
+                labels = _labels(method=method, route=route, status=status)
+                lines.append(f"http_requests_total{{{labels}}} {count}")
+        histogram(
+            "http_request_duration_seconds",
+            "Request latency by route.",
+            routes, "latency",
+        )
+        histogram(
+            "http_request_db_statements",
+            "SQL statements executed per request.",
+            routes, "statements",
+        )
+        scalar(
+            "http_request_db_seconds_total", "counter",
+            "Time spent executing SQL.",
+            routes, "db_seconds",
+        )
+        scalar(
+            "http_request_db_pool_wait_seconds_total", "counter",
+            "Time spent obtaining a database connection.",
+            routes, "pool_wait_seconds",
+        )
+        scalar(
+            "http_request_password_hash_seconds_total", "counter",
+            "Time spent waiting for password hashing.",
+            routes, "hash_seconds",
+        )
+        if pools:
+            scalar(
+                "db_pool_size", "gauge",
+                "Connections the pool keeps open.",
+                pools, "size",
+            )
+            scalar(
+                "db_pool_checked_out", "gauge",
+                "Connections currently in use.",
+                pools, "checked_out",
+            )
+            scalar(
+                "db_pool_overflow", "gauge",
+                "Connections open beyond the pool size.",
+                pools, "overflow",
+            )
+            histogram(
+                "db_pool_checkout_seconds",
+                "Time to obtain a connection, including opening one.",
+                pools, "checkout",
+            )
+            scalar(
+                "db_pool_connections_total", "counter",
+                "Connections opened.",
+                pools, "connects",
+            )
+            scalar(
+                "db_pool_timeouts_total", "counter",
+                "Checkouts that gave up after DB_POOL_TIMEOUT.",
+                pools, "timeouts",
+            )
+            scalar(
+                "db_pool_invalidations_total", "counter",
+                "Connections discarded as broken or stale.",
+                pools, "invalidations",
+            )
+        return "\n".join(lines) + "\n"
+
+
+class PoolMetrics:
+    """Telemetry for one engine's connection pool.
+
+    Connection counts come from pool events; checkout time is reported
+    by the timed pool classes in ``database.py``. Size and overflow are
+    read from the pool when rendered (None for pools without them).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout = Histogram(POOL_CHECKOUT_BUCKETS)
+        self.checked_out = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self._engine = None
+
+    def attach(self, engine) -> "PoolMetrics":
+        """Listen to ``engine``'s pool (kept across ``dispose()``)."""
+        self._engine = engine
+        engine.pool.metrics = self
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        return self
+
+    @property
+    def size(self) -> Optional[int]:
+        pool = self._engine.pool if self._engine is not None else None
+        return pool.size() if hasattr(pool, "size") else None
+
+    @property
+    def overflow(self) -> Optional[int]:
+        pool = self._engine.pool if self._engine is not None else None
+        # QueuePool counts unopened slots as negative overflow
+        return max(pool.overflow(), 0) if hasattr(pool, "overflow") else None
+
+    def observe_checkout(self, seconds: float, timed_out: bool) -> None:
+        self.checkout.observe(seconds)
+        if timed_out:
+            self.timeouts += 1
+        stats = _current.get()
+        if stats is not None:
+            stats.pool_wait_seconds += seconds
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(
+        self, dbapi_connection, connection_record, connection_proxy
+    ):
+        self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checked_out -= 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exc):
+        self.invalidations += 1
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", route.path)
+    if "response_cache" in scope:
+        return RESPONSE_CACHE_ROUTE
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and SQL work."""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            self.registry.observe(
+                scope["method"], _route_label(scope), status, elapsed, stats
+            )
+
+
+metrics_registry = MetricsRegistry()
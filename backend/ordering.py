@@ -0,0 +1,91 @@
+"""Sparse ordering keys for itinerary activities.
+
+Activities within a day are ordered by an integer ``order_key`` spaced
+``GAP`` apart, so moving one activity only rewrites that activity's key
+(the midpoint of its new neighbours). Only when repeated inserts at the
+same spot exhaust a gap is the affected day renumbered.
+"""
+import bisect
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GAP = 1 << 16
+
+
+def key_between(
+    before: Optional[int], after: Optional[int]
+) -> Optional[int]:
+    """Return a key strictly between two neighbours, or None if full.
+
+    ``None`` neighbours stand for the start or end of the day.
+    """
+    if before is None and after is None:
+        return GAP
+    if after is None:
+        return before + GAP
+    if before is None:
+        return after - GAP
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+
+def spread_keys(count: int) -> List[int]:
+    """Evenly spaced keys for renumbering a day of ``count`` items."""
+    return [GAP * (i + 1) for i in range(count)]
+
+
+def plan_moves(
+    rows: Iterable[Tuple[int, int, int]],
+    moves: Iterable[Tuple[int, int, Optional[int]]],
+) -> Dict[int, Tuple[int, int]]:
+    """Apply moves in order and return the rows whose position changed.
+
+    ``rows`` are ``(id, day_number, order_key)`` for a whole trip and
+    ``moves`` are ``(id, day_number, after_id)``, where ``after_id`` is
+    the activity to place it behind (``None`` for first in the day).
+    Returns ``{id: (day_number, order_key)}``; raises ``KeyError`` for
+    unknown ids and ``ValueError`` if ``after_id`` is not on the day.
+    """
+    days: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    position: Dict[int, Tuple[int, int]] = {}
+    for activity_id, day, key in rows:
+        days[day].append((key, activity_id))
+        position[activity_id] = (day, key)
+    for day_items in days.values():
+        day_items.sort()
+
+    changed: Dict[int, Tuple[int, int]] = {}
+    for activity_id, day, after_id in moves:
+        old_day, old_key = position[activity_id]
+        days[old_day].remove((old_key, activity_id))
+
+        target = days[day]
+        if after_id is None:
+            index = 0
+        else:
+            if after_id == activity_id:
+                raise ValueError("An activity cannot follow itself")
+            after_day, after_key = position[after_id]
+            if after_day != day:
+                raise ValueError(
+                    f"Activity {after_id} is not on day {day}"
+                )
+            index = bisect.bisect_right(target, (after_key, after_id))
+
+        before = target[index - 1][0] if index > 0 else None
+        after = target[index][0] if index < len(target) else None
+        key = key_between(before, after)
+        if key is None:
+            ids = [item_id for _, item_id in target]
+            ids.insert(index, activity_id)
+            target[:] = list(zip(spread_keys(len(ids)), ids))
+            for new_key, item_id in target:
+                position[item_id] = (day, new_key)
+                changed[item_id] = (day, new_key)
+            continue
+
+        target.insert(index, (key, activity_id))
+        position[activity_id] = (day, key)
+        changed[activity_id] = (day, key)
+    return changed
@@ -0,0 +1,139 @@
+"""Trip authorization through cached per-user permission maps.
+
+Every trip, activity and expense request asks "may this user view (or
+edit) this trip". ``authorize_trip`` answers it from a map of trip id
+-> level covering everything the user can reach: their own trips
+(``owner``) and those shared with them (``viewer`` or ``editor``, see
+``TripShare``). The map is loaded with one query on a miss and kept in
+a bounded LRU, so a warm request costs a dict lookup instead of a join.
+
+Creating, importing or deleting trips and changing shares invalidate
+the affected users in this process; entries also expire after
+``PERMISSION_CACHE_TTL_SECONDS`` to bound staleness across workers.
+"""
+from typing import Dict, Iterable, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from response_cache import bump_also, collecting_bumps
+from token_cache import Principal
+from trip import Trip
+from trip_share import TripShare
+from ttl_cache import TTLCache
+
+VIEWER = "viewer"
+EDITOR = "editor"
+OWNER = "owner"
+
+# Each level includes those ranked below it
+_RANK = {VIEWER: 1, EDITOR: 2, OWNER: 3}
+
+
+class PermissionCache(TTLCache[int, Dict[int, str]]):
+    """User id -> {trip id: level}.
+
+    Each invalidation advances a generation; a map loaded before it is
+    not stored, so a share revoked mid-load cannot be cached back.
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: float):
+        super().__init__(max_users, ttl_seconds)
+        self.generation = 0
+
+    def put(
+        self, user_id: int, trips: Dict[int, str], generation: int
+    ) -> None:
+        """Cache a map loaded when ``generation`` was current."""
+        with self._lock:
+            if generation == self.generation:
+                super().put(user_id, trips)
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> None:
+        """Drop the maps of users whose trips or shares changed."""
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                self.invalidate(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            super().clear()
+
+
+trip_permissions = PermissionCache(
+    max_users=settings.PERMISSION_CACHE_USERS,
+    ttl_seconds=settings.PERMISSION_CACHE_TTL_SECONDS,
+)
+
+
+async def load_permissions(
+    db: AsyncSession, user_id: int
+) -> Dict[int, str]:
+    """Trip id -> level for every trip the user can reach (one query)."""
+    rows = await db.execute(union_all(
+        select(Trip.id, literal(OWNER)).where(Trip.user_id == user_id),
+        select(TripShare.trip_id, TripShare.permission_level).where(
+            TripShare.user_id == user_id
+        ),
+    ))
+    return dict(rows.all())
+
+
+async def user_permissions(
+    db: AsyncSession, user_id: int
+) -> Dict[int, str]:
+    """The user's permission map, from the cache when possible."""
+    trips = trip_permissions.get(user_id)
+    if trips is None:
+        generation = trip_permissions.generation
+        trips = await load_permissions(db, user_id)
+        trip_permissions.put(user_id, trips, generation)
+    return trips
+
+
+async def trip_members(db: AsyncSession, trip_id: int) -> List[int]:
+    """Ids of the trip's owner and of the users it is shared with."""
+    rows = await db.scalars(union_all(
+        select(Trip.user_id).where(Trip.id == trip_id),
+        select(TripShare.user_id).where(TripShare.trip_id == trip_id),
+    ))
+    return list(rows)
+
+
+def at_least(granted: str, level: str) -> bool:
+    """Whether ``granted`` includes ``level``."""
+    return _RANK[granted] >= _RANK[level]
+
+
+async def authorize_trip(
+    db: AsyncSession,
+    current_user: Principal,
+    trip_id: int,
+    level: str = VIEWER,
+    missing: str = "Trip not found",
+) -> str:
+    """Check the user's access to a trip; returns the granted level.
+
+    404 with ``missing`` if the user cannot see the trip at all, 403 if
+    they can but not at ``level``. Above ``viewer`` the request may
+    change what every member sees, so their cached responses are
+    invalidated with the writer's.
+    """
+    granted = (await user_permissions(db, current_user.id)).get(trip_id)
+    if granted is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=missing,
+        )
+    if not at_least(granted, level):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Requires {level} access to this trip",
+        )
+    if level != VIEWER and collecting_bumps():
+        bump_also(await trip_members(db, trip_id))
+    return granted
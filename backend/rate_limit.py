@@ -0,0 +1,202 @@
+"""Token-bucket rate limits for the auth and write endpoints.
+
+Each limit keeps a bucket per key (client IP, login name or user id)
+holding up to ``burst`` tokens, refilled at ``per_minute``. A request
+takes a token or gets a 429 with ``Retry-After``. The checks are
+dependencies that run before the endpoint's own, so a rejected login
+never reaches the users table or the password hashing pool.
+
+Buckets are ``(tokens, updated)`` tuples in a plain dict, refilled
+lazily when taken from, with no lock: the event loop runs one check at
+a time, and a thread racing it can at worst let one extra request
+through. They are per process, so N workers allow N times the limits;
+to enforce them across workers plug in a shared ``RateLimitBackend``.
+It is only consulted for requests the local bucket lets through, so a
+flood from one key is still turned away without a round-trip.
+"""
+import math
+import time
+from itertools import islice
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from auth import get_current_user
+from config import settings
+from token_cache import Principal
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class TokenBuckets:
+    """Token buckets by key, with a bounded number of keys."""
+
+    def __init__(self, per_minute: float, burst: int, max_keys: int):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> (tokens left, monotonic time they were counted)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token for ``key``: 0 if there was one, else the wait."""
+        if now is None:
+            now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            tokens = self.burst
+        else:
+            tokens = min(
+                self.burst, bucket[0] + (now - bucket[1]) * self.rate
+            )
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[key] = (tokens - 1, now)
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        """Drop refilled buckets, or failing that the oldest half."""
+        burst, rate = self.burst, self.rate
+        self._buckets = {
+            key: (tokens, updated)
+            for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * rate < burst
+        }
+        if len(self._buckets) >= self.max_keys:
+            # Many keys still limited (e.g. a spread of IPs): forget the
+            # ones seen first rather than grow without bound
+            for key in list(islice(self._buckets, len(self._buckets) // 2)):
+                del self._buckets[key]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class RateLimitBackend:
+    """Buckets shared by every worker (e.g. a Redis script)."""
+
+    async def take(self, key: str, per_minute: float, burst: int) -> float:
+        """Like ``TokenBuckets.take``, for the limit's own parameters."""
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local backend, standing in for a shared one in tests."""
+
+    def __init__(self, max_keys: int = settings.RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._limits: Dict[Tuple[float, int], TokenBuckets] = {}
+
+    async def take(self, key: str, per_minute: float, burst: int) -> float:
+        buckets = self._limits.get((per_minute, burst))
+        if buckets is None:
+            buckets = self._limits[(per_minute, burst)] = TokenBuckets(
+                per_minute, burst, self.max_keys
+            )
+        return buckets.take(key)
+
+    def clear(self) -> None:
+        self._limits.clear()
+
+
+class RateLimiter:
+    """One named limit, checked locally and then in the shared backend."""
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: float,
+        burst: int,
+        max_keys: int = settings.RATE_LIMIT_MAX_KEYS,
+    ):
+        self.name = name
+        self.per_minute = per_minute
+        self.burst = burst
+        self.buckets = TokenBuckets(per_minute, burst, max_keys)
+
+    async def check(
+        self, key: str, backend: Optional[RateLimitBackend] = None
+    ) -> None:
+        """Take a token for ``key`` or raise a 429."""
+        wait = self.buckets.take(key)
+        if not wait and backend is not None:
+            wait = await backend.take(
+                f"{self.name}:{key}", self.per_minute, self.burst
+            )
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+
+class RateLimits:
+    """The limits in force, and the optional shared backend."""
+
+    def __init__(self, enabled: bool = settings.RATE_LIMIT_ENABLED):
+        self.enabled = enabled
+        self.backend: Optional[RateLimitBackend] = None
+        self.auth_ip = RateLimiter(
+            "auth-ip",
+            settings.RATE_LIMIT_AUTH_IP_PER_MINUTE,
+            settings.RATE_LIMIT_AUTH_IP_BURST,
+        )
+        self.login_user = RateLimiter(
+            "login-user",
+            settings.RATE_LIMIT_LOGIN_USER_PER_MINUTE,
+            settings.RATE_LIMIT_LOGIN_USER_BURST,
+        )
+        self.write = RateLimiter(
+            "write",
+            settings.RATE_LIMIT_WRITE_PER_MINUTE,
+            settings.RATE_LIMIT_WRITE_BURST,
+        )
+
+    async def check(self, limiter: RateLimiter, key: str) -> None:
+        if self.enabled:
+            await limiter.check(key, self.backend)
+
+    def clear(self) -> None:
+        for limiter in (self.auth_ip, self.login_user, self.write):
+            limiter.buckets.clear()
+
+
+rate_limits = RateLimits()
+
+
+def client_ip(request: Request) -> str:
+    """The peer address; behind a proxy run uvicorn --proxy-headers."""
+    return request.client.host if request.client else "unknown"
+
+
+async def limit_login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> None:
+    """Per client IP, then per login name (as ``login_lookup`` sees it)."""
+    await rate_limits.check(rate_limits.auth_ip, client_ip(request))
+    await rate_limits.check(
+        rate_limits.login_user, form_data.username.strip().lower()
+    )
+
+
+async def limit_register(request: Request) -> None:
+    """Per client IP."""
+    await rate_limits.check(rate_limits.auth_ip, client_ip(request))
+
+
+async def limit_writes(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+) -> None:
+    """Per user, for POST/PUT/PATCH/DELETE requests only."""
+    if request.method in WRITE_METHODS:
+        await rate_limits.check(rate_limits.write, str(current_user.id))
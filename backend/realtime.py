@@ -0,0 +1,237 @@
+"""Live trip changes for WebSocket clients: a pub/sub hub per worker.
+
+Writes publish the changes they made to a trip (``change(...)``) through
+the ``Broker``, which hands them to the hub of every worker. A hub keeps
+the sockets connected to each trip in this process and, per trip,
+coalesces what arrives within ``REALTIME_BATCH_MS`` into one message:
+several edits of an activity become a single upsert with the last
+values, and a delete replaces earlier upserts. Each batch is encoded
+once and queued for every subscriber.
+
+Every subscriber has a bounded send queue (``REALTIME_SEND_QUEUE``). A
+client too slow to keep up does not hold messages in memory: its queue
+is emptied and replaced by one ``resync`` message, after which it should
+refetch the trip over HTTP.
+
+``InProcessBroker`` only reaches this process: run a single worker with
+it, or plug in a shared ``Broker`` (Redis pub/sub, Postgres NOTIFY, ...)
+when running several.
+"""
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from config import settings
+from serialization import dumps
+
+Change = Dict[str, Any]
+Deliver = Callable[[int, List[Change]], None]
+
+# Close codes sent with the last message of a trip's subscribers
+CLOSE_TRIP_DELETED = 4404
+CLOSE_ACCESS_REVOKED = 4403
+
+
+def change(
+    entity: str, entity_id: int, data: Optional[Dict[str, Any]] = None
+) -> Change:
+    """An upsert of ``data`` (fields that changed), or a delete."""
+    if data is None:
+        return {"entity": entity, "op": "delete", "id": entity_id}
+    return {"entity": entity, "op": "upsert", "id": entity_id, "data": data}
+
+
+class Broker:
+    """Carries published changes to the hub of every worker."""
+
+    def attach(self, deliver: Deliver) -> None:
+        """Have ``deliver(trip_id, changes)`` called for every publish."""
+        raise NotImplementedError
+
+    async def publish(self, trip_id: int, changes: List[Change]) -> None:
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    """Delivers straight to the hubs of this process."""
+
+    def __init__(self):
+        self._receivers: List[Deliver] = []
+
+    def attach(self, deliver: Deliver) -> None:
+        self._receivers.append(deliver)
+
+    async def publish(self, trip_id: int, changes: List[Change]) -> None:
+        for deliver in self._receivers:
+            deliver(trip_id, changes)
+
+
+class Subscriber:
+    """One socket's bounded queue of encoded messages.
+
+    Items are message texts, or an int close code as the last item.
+    """
+
+    def __init__(self, user_id: int, resync: str, queue_size: int):
+        self.user_id = user_id
+        self.resyncs = 0
+        self.queue: "asyncio.Queue[Union[str, int]]" = asyncio.Queue(
+            queue_size
+        )
+        self._resync = resync
+
+    def offer(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Backpressure: drop the backlog, the client refetches
+            self.resyncs += 1
+            self._replace(self._resync)
+
+    def close(self, code: int) -> None:
+        """Close the socket once the queued messages are sent."""
+        try:
+            self.queue.put_nowait(code)
+        except asyncio.QueueFull:
+            self._replace(code)
+
+    def _replace(self, item: Union[str, int]) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+
+class _Channel:
+    """A trip's local subscribers and its pending batch."""
+
+    def __init__(
+        self,
+        trip_id: int,
+        loop: asyncio.AbstractEventLoop,
+        batch_seconds: float,
+    ):
+        self.trip_id = trip_id
+        self.loop = loop
+        self.batch_seconds = batch_seconds
+        self.subscribers: Set[Subscriber] = set()
+        self.resync = dumps({"type": "resync", "trip_id": trip_id}).decode()
+        self._pending: Dict[Tuple[str, int], Change] = {}
+        self._flush: Optional[asyncio.TimerHandle] = None
+
+    def add(self, changes: List[Change]) -> None:
+        for item in changes:
+            key = (item["entity"], item["id"])
+            pending = self._pending.get(key)
+            if (
+                pending is not None
+                and pending["op"] == item["op"] == "upsert"
+            ):
+                pending["data"] = {**pending["data"], **item["data"]}
+            else:
+                self._pending[key] = dict(item)
+        if self._flush is None:
+            self._flush = self.loop.call_later(
+                self.batch_seconds, self.flush
+            )
+
+    def flush(self) -> None:
+        self._flush = None
+        changes = list(self._pending.values())
+        self._pending.clear()
+        if not changes:
+            return
+        message = dumps({
+            "type": "changes",
+            "trip_id": self.trip_id,
+            "changes": changes,
+        }).decode()
+        revoked = set()
+        deleted = False
+        for item in changes:
+            if item["op"] == "delete":
+                if item["entity"] == "trip":
+                    deleted = True
+                elif item["entity"] == "share":
+                    revoked.add(item["id"])
+        for subscriber in self.subscribers:
+            subscriber.offer(message)
+            if deleted:
+                subscriber.close(CLOSE_TRIP_DELETED)
+            elif subscriber.user_id in revoked:
+                subscriber.close(CLOSE_ACCESS_REVOKED)
+
+    def cancel(self) -> None:
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+
+
+class TripHub:
+    """Subscribers per trip in this worker, fed by the broker."""
+
+    def __init__(
+        self, broker: Broker, batch_seconds: float, queue_size: int
+    ):
+        self.broker = broker
+        self.batch_seconds = batch_seconds
+        self.queue_size = queue_size
+        self._channels: Dict[int, _Channel] = {}
+        broker.attach(self.receive)
+
+    def subscribe(self, trip_id: int, user_id: int) -> Subscriber:
+        """Register a socket of ``user_id``; call from its event loop."""
+        channel = self._channels.get(trip_id)
+        if channel is None:
+            channel = self._channels[trip_id] = _Channel(
+                trip_id, asyncio.get_running_loop(), self.batch_seconds
+            )
+        subscriber = Subscriber(user_id, channel.resync, self.queue_size)
+        channel.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, trip_id: int, subscriber: Subscriber) -> None:
+        channel = self._channels.get(trip_id)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            channel.cancel()
+            del self._channels[trip_id]
+
+    async def publish(self, trip_id: int, *changes: Change) -> None:
+        """Send changes made to a trip to its subscribers everywhere."""
+        if changes:
+            await self.broker.publish(trip_id, list(changes))
+
+    def receive(self, trip_id: int, changes: List[Change]) -> None:
+        """Broker callback: batch changes for the trip's subscribers.
+
+        Brokers may call this from another thread; the changes are then
+        handed to the loop the trip's sockets run on.
+        """
+        channel = self._channels.get(trip_id)
+        if channel is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is channel.loop:
+            channel.add(changes)
+        else:
+            channel.loop.call_soon_threadsafe(channel.add, changes)
+
+    def stats(self) -> Dict[str, int]:
+        """Trips with subscribers here and connected sockets."""
+        return {
+            "trips": len(self._channels),
+            "subscribers": sum(
+                len(c.subscribers) for c in self._channels.values()
+            ),
+        }
+
+
+trip_hub = TripHub(
+    InProcessBroker(),
+    batch_seconds=settings.REALTIME_BATCH_MS / 1000,
+    queue_size=settings.REALTIME_SEND_QUEUE,
+)
@@ -0,0 +1,128 @@
+"""Read-replica routing.
+
+Requests with a safe method (GET, HEAD, OPTIONS) are served from a
+replica picked round-robin among those that passed their last health
+check; everything else goes to the primary. After a user writes, their
+reads stay on the primary for ``sticky_seconds`` so they see their own
+changes despite replication lag. A replica that fails a health check,
+or a request with a connection error, is skipped until a later check
+succeeds; with none healthy (or none configured) every request uses the
+primary.
+
+The sticky window is tracked per process, like the response cache:
+behind several workers a user's next read may land on a worker that has
+not seen the write, so keep the window above the expected replica lag
+and below what users would notice.
+"""
+import asyncio
+import logging
+import time
+from itertools import count
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Expired sticky entries are pruned once this many are tracked
+_STICKY_PRUNE_SIZE = 10000
+
+
+class Replica:
+    """One read replica and its last known health."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False
+        )
+        self.healthy = True
+
+    def mark(self, healthy: bool, reason: str = "") -> None:
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("Replica %s is back", self.name)
+            else:
+                logger.warning("Replica %s is down: %s", self.name, reason)
+        self.healthy = healthy
+
+
+class ReplicaRouter:
+    """Chooses between the primary and the replicas for each request."""
+
+    def __init__(self, engines: List[AsyncEngine], sticky_seconds: float):
+        self.replicas = [
+            Replica(f"replica-{index}", engine)
+            for index, engine in enumerate(engines, start=1)
+        ]
+        self.sticky_seconds = sticky_seconds
+        self._turn = count()
+        # user id -> monotonic time their sticky window ends
+        self._sticky_until: Dict[int, float] = {}
+
+    def reader(self, user_id: Optional[int]) -> Optional[Replica]:
+        """Replica to serve a read by ``user_id``, or None for the primary.
+
+        Pass None for anonymous reads.
+        """
+        if not self.replicas:
+            return None
+        if user_id is not None and self.is_sticky(user_id):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def record_write(self, user_id: int) -> None:
+        """Keep ``user_id``'s reads on the primary for a while."""
+        if not self.replicas or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        if len(self._sticky_until) >= _STICKY_PRUNE_SIZE:
+            self._sticky_until = {
+                user: until
+                for user, until in self._sticky_until.items()
+                if until > now
+            }
+        self._sticky_until[user_id] = now + self.sticky_seconds
+
+    def is_sticky(self, user_id: int) -> bool:
+        until = self._sticky_until.get(user_id)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        self._sticky_until.pop(user_id, None)
+        return False
+
+    async def check_health(self, timeout: float) -> int:
+        """Ping every replica; returns how many are healthy."""
+        async def ping(replica: Replica) -> None:
+            try:
+                async with asyncio.timeout(timeout):
+                    async with replica.engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+            except Exception as exc:
+                replica.mark(False, repr(exc))
+            else:
+                replica.mark(True)
+
+        await asyncio.gather(*(ping(replica) for replica in self.replicas))
+        return sum(replica.healthy for replica in self.replicas)
+
+    async def check_health_forever(
+        self, interval: float, timeout: float
+    ) -> None:
+        """Re-check the replicas every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health(timeout)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
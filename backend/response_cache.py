@@ -0,0 +1,351 @@
+"""Conditional GET support with per-user version counters.
+
+Every authenticated user has a version counter that is bumped after any
+successful write they make, and after writes by other members of a
+trip shared with them (see ``bump_also``). GET responses under the API
+prefix carry a weak ETag derived from that counter, so a client
+revalidating with ``If-None-Match`` gets a 304 straight from the
+middleware -- no endpoint, no database. Serialized bodies can also be
+held in a bounded LRU and replayed while the version is unchanged.
+Responses that set a ``public`` Cache-Control themselves do not depend
+on the user: they are passed through untouched and never stored.
+
+The principal is taken from ``token_cache`` only, so the middleware
+itself never decodes a JWT or queries the users table; a token it has
+not seen yet simply passes through (and is cached by the endpoint).
+
+The in-memory backend is per process: run a single worker with it, or
+plug in a shared ``CacheBackend`` when running several.
+"""
+import contextvars
+import secrets
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config import settings
+from metrics import collecting_stats
+from token_cache import token_cache
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Version slot shared by every user (user ids start at 1); bump it when
+# data that is not owned by a single user changes
+GLOBAL_VERSION_KEY = 0
+
+
+class CachedBody(NamedTuple):
+    """A replayable 200 response."""
+
+    etag: str
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class CacheBackend:
+    """Storage for version counters and cached bodies.
+
+    ``epoch`` names the lifetime of the counters and goes into every
+    ETag: a backend whose counters can restart from zero must change it
+    then, or ETags handed out before would validate again.
+    """
+
+    epoch: str = ""
+
+    async def get_version(self, user_id: int) -> int:
+        raise NotImplementedError
+
+    async def bump_version(self, user_id: int) -> int:
+        raise NotImplementedError
+
+    async def get_body(self, key: str) -> Optional[CachedBody]:
+        raise NotImplementedError
+
+    async def set_body(self, key: str, cached: CachedBody) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local backend with a bounded LRU of bodies."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.epoch = _new_epoch()
+        self._versions: Dict[int, int] = {}
+        self._bodies: "OrderedDict[str, CachedBody]" = OrderedDict()
+
+    async def get_version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    async def bump_version(self, user_id: int) -> int:
+        version = self._versions.get(user_id, 0) + 1
+        self._versions[user_id] = version
+        return version
+
+    async def get_body(self, key: str) -> Optional[CachedBody]:
+        cached = self._bodies.get(key)
+        if cached is not None:
+            self._bodies.move_to_end(key)
+        return cached
+
+    async def set_body(self, key: str, cached: CachedBody) -> None:
+        if self.max_entries <= 0:
+            return
+        self._bodies[key] = cached
+        self._bodies.move_to_end(key)
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
+
+    def clear(self) -> None:
+        self.epoch = _new_epoch()
+        self._versions.clear()
+        self._bodies.clear()
+
+
+def _new_epoch() -> str:
+    # Counters live in this process: a restart or another worker
+    # starts over, under a different epoch
+    return secrets.token_hex(4)
+
+
+class CacheStats:
+    """Counters for sizing the cache and reporting what it saved."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.not_modified = 0
+        self.body_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.queries_saved = 0.0
+        # path -> (requests executed, statements they ran)
+        self._route_queries: Dict[str, Tuple[int, int]] = {}
+
+    def record_queries(self, path: str, statements: int) -> None:
+        count, total = self._route_queries.get(path, (0, 0))
+        self._route_queries[path] = (count + 1, total + statements)
+
+    def estimated_queries(self, path: str) -> float:
+        count, total = self._route_queries.get(path, (0, 0))
+        return total / count if count else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "not_modified": self.not_modified,
+            "body_hits": self.body_hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+            "queries_saved": round(self.queries_saved, 1),
+        }
+
+
+_also_bump: contextvars.ContextVar[Optional[List[int]]] = (
+    contextvars.ContextVar("response_cache_also_bump", default=None)
+)
+
+
+def collecting_bumps() -> bool:
+    """Whether ``bump_also`` would apply (a write is being handled)."""
+    return _also_bump.get() is not None
+
+
+def bump_also(user_ids) -> None:
+    """Bump these users' versions too if the current write succeeds.
+
+    For writes that change what other users see, such as a shared trip.
+    Outside a write handled by the middleware this does nothing.
+    """
+    pending = _also_bump.get()
+    if pending is not None:
+        pending.extend(user_ids)
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token
+    return None
+
+
+def _header(scope, wanted: bytes) -> Optional[bytes]:
+    for name, value in scope["headers"]:
+        if name == wanted:
+            return value
+    return None
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware answering conditional GETs from version counters."""
+
+    def __init__(
+        self,
+        app,
+        backend: CacheBackend,
+        stats: CacheStats,
+        prefix: str = settings.API_V1_PREFIX,
+        max_body_bytes: int = settings.RESPONSE_CACHE_MAX_BODY_BYTES,
+    ):
+        self.app = app
+        self.backend = backend
+        self.stats = stats
+        self.prefix = prefix
+        self.max_body_bytes = max_body_bytes
+
+    async def _etag(self, user_id: int) -> str:
+        shared = await self.backend.get_version(GLOBAL_VERSION_KEY)
+        version = await self.backend.get_version(user_id)
+        return f'W/"{self.backend.epoch}.{shared}.{user_id}.{version}"'
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "GET":
+            await self._handle_read(scope, receive, send)
+        elif scope["method"] in WRITE_METHODS:
+            await self._handle_write(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _handle_write(self, scope, receive, send):
+        token = _bearer_token(scope)
+        also: List[int] = []
+
+        async def send_and_bump(message):
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and token is not None
+            ):
+                # The endpoint has authenticated, so the token is cached
+                principal = token_cache.peek(token)
+                if principal is not None:
+                    for user_id in {principal.id, *also}:
+                        await self.backend.bump_version(user_id)
+            await send(message)
+
+        reset = _also_bump.set(also)
+        try:
+            await self.app(scope, receive, send_and_bump)
+        finally:
+            _also_bump.reset(reset)
+
+    async def _handle_read(self, scope, receive, send):
+        token = _bearer_token(scope)
+        principal = token_cache.peek(token) if token else None
+        if principal is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = await self._etag(principal.id)
+        key = f"{principal.id}:{scope['path']}?" + scope[
+            "query_string"
+        ].decode("latin-1")
+        cached = await self.backend.get_body(key)
+        if cached is not None and cached.etag != etag:
+            cached = None
+
+        if_none_match = _header(scope, b"if-none-match")
+        if if_none_match is not None and etag in (
+            tag.strip() for tag in if_none_match.decode().split(",")
+        ):
+            self.stats.not_modified += 1
+            scope["response_cache"] = "not_modified"
+            self.stats.queries_saved += self.stats.estimated_queries(
+                scope["path"]
+            )
+            if cached is not None:
+                self.stats.bytes_saved += len(cached.body)
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": _cache_headers(etag),
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if cached is not None:
+            self.stats.body_hits += 1
+            scope["response_cache"] = "hit"
+            self.stats.queries_saved += self.stats.estimated_queries(
+                scope["path"]
+            )
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": cached.headers,
+            })
+            await send({"type": "http.response.body", "body": cached.body})
+            return
+
+        self.stats.misses += 1
+        await self._run_and_store(scope, receive, send, etag, key)
+
+    async def _run_and_store(self, scope, receive, send, etag, key):
+        state = {"status": None, "headers": None, "chunks": [], "size": 0}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if message["status"] == 200 and not _public(message):
+                    headers = [
+                        (name, value)
+                        for name, value in message.get("headers", [])
+                        if name not in (b"etag", b"cache-control")
+                    ] + _cache_headers(etag)
+                    message = {**message, "headers": headers}
+                    state["headers"] = headers
+            elif (
+                message["type"] == "http.response.body"
+                and state["headers"] is not None
+                and state["size"] <= self.max_body_bytes
+            ):
+                body = message.get("body", b"")
+                state["chunks"].append(body)
+                state["size"] += len(body)
+            await send(message)
+
+        # Statements are counted by the metrics engine hooks
+        with collecting_stats() as request_stats:
+            before = request_stats.statements
+            await self.app(scope, receive, capture)
+        self.stats.record_queries(
+            scope["path"], request_stats.statements - before
+        )
+
+        if (
+            state["headers"] is not None
+            and state["size"] <= self.max_body_bytes
+        ):
+            await self.backend.set_body(key, CachedBody(
+                etag=etag,
+                headers=state["headers"],
+                body=b"".join(state["chunks"]),
+            ))
+
+
+def _public(message) -> bool:
+    for name, value in message.get("headers", []):
+        if name == b"cache-control":
+            return b"public" in value.lower()
+    return False
+
+
+def _cache_headers(etag: str) -> List[Tuple[bytes, bytes]]:
+    return [
+        (b"etag", etag.encode()),
+        # Let browsers keep the body but always revalidate
+        (b"cache-control", b"private, no-cache"),
+    ]
+
+
+response_cache_backend = InMemoryCacheBackend(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES
+)
+response_cache_stats = CacheStats()
@@ -0,0 +1,133 @@
+"""Revocation store for rotating refresh tokens.
+
+The ``revoked_tokens`` table is the source of truth: rotating a refresh
+token inserts its JTI, and the primary key turns a second use of the same
+token (even from another worker) into an IntegrityError. A bounded map
+of recently revoked JTIs (``REVOKED_TOKEN_CACHE_SIZE``) fronts the table
+so rejecting a replay of a recent rotation never touches the database;
+older replays fall through to the primary key. Expired rows are purged
+in bulk periodically.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import init_engines
+from revoked_token import RevokedToken
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+    """Recently revoked refresh-token JTIs, cached in memory."""
+
+    def __init__(self, max_size: int):
+        # Each JTI is kept until its token expires, at most
+        self._revoked: "TTLCache[str, bool]" = TTLCache(
+            max_size,
+            settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+            clock=time.time,
+        )
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check the in-memory map only (no database access).
+
+        False for JTIs evicted from it: ``revoke`` still rejects them.
+        """
+        return self._revoked.get(jti) is not None
+
+    def _remember(self, jti: str, expires_at: datetime) -> None:
+        self._revoked.put(jti, True, expires_at.timestamp())
+
+    async def revoke(
+        self,
+        db: AsyncSession,
+        jti: str,
+        expires_at: datetime,
+        user_id: Optional[int] = None,
+    ) -> bool:
+        """Record ``jti`` as used and commit; False if it already was.
+
+        Commits the session's transaction, so call this before any other
+        writes. The JTI is only remembered once the row is committed (or
+        found to exist): after any other failure the session is rolled
+        back and a retry of the same token can still succeed.
+        """
+        try:
+            await db.execute(
+                insert(RevokedToken).values(
+                    jti=jti, user_id=user_id, expires_at=expires_at
+                )
+            )
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            self._remember(jti, expires_at)
+            return False
+        except BaseException:
+            await db.rollback()
+            raise
+        self._remember(jti, expires_at)
+        return True
+
+    async def load(self, db: AsyncSession) -> int:
+        """Warm the cache with the most recently revoked JTIs.
+
+        Refresh tokens share one lifetime, so the latest expiries are
+        the latest rotations; only as many as the cache holds are read.
+        """
+        if self._revoked.max_size <= 0:
+            return 0
+        rows = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.expires_at > datetime.now(timezone.utc))
+            .order_by(RevokedToken.expires_at.desc())
+            .limit(self._revoked.max_size)
+        )
+        # Oldest first, so the most recent end up least likely evicted
+        for jti, expires_at in reversed(rows.all()):
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            self._remember(jti, expires_at)
+        return len(self._revoked)
+
+    async def purge(self, db: AsyncSession) -> int:
+        """Bulk-delete expired rows and forget expired JTIs."""
+        self._revoked.prune()
+        result = await db.execute(
+            delete(RevokedToken).where(
+                RevokedToken.expires_at <= datetime.now(timezone.utc)
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+    def clear(self) -> None:
+        """Forget every cached JTI (the table is untouched)."""
+        self._revoked.clear()
+
+
+revocation_store = RevocationStore(settings.REVOKED_TOKEN_CACHE_SIZE)
+
+
+async def purge_revoked_tokens_forever(interval_seconds: float) -> None:
+    """Background task: purge expired revocations every interval."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with init_engines().AsyncSessionLocal() as db:
+                purged = await revocation_store.purge(db)
+            logger.info("Purged %d expired refresh tokens", purged)
+        except Exception:
+            logger.exception("Revoked token purge failed")
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from database import Base
+
+
+class RevokedToken(Base):
+    """Refresh token JTIs that have been rotated or revoked"""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    # Rows are useless once the token itself has expired
+    expires_at = Column(DateTime(timezone=True), nullable=False,
+                        index=True)
+
+    def __repr__(self):
+        return (f"<RevokedToken(jti={self.jti}, "
+                f"expires_at={self.expires_at})>")
@@ -0,0 +1,371 @@
+from typing import List, Optional, Tuple
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from activity import Activity
+from auth import get_current_user
+from config import settings
+from database import get_async_db
+from fieldsets import Fields, field_selector, load_fields
+from geo import (
+    GeoIndex,
+    Range,
+    box_ranges,
+    circle_ranges,
+    geo_key,
+    trip_geo_cache,
+)
+from ordering import GAP, plan_moves
+from permissions import EDITOR, VIEWER, authorize_trip, user_permissions
+from realtime import change, trip_hub
+from router_trips import check_day, load_trip
+from schemas import (
+    ActivityCreate,
+    ActivityPosition,
+    ActivityReorder,
+    ActivityResponse,
+    ActivityUpdate,
+    NearbyActivity,
+)
+from serialization import ORJSONResponse, activity_row
+from token_cache import Principal
+from trip import Trip
+
+router = APIRouter()
+
+activity_fields = field_selector(ActivityResponse)
+
+
+async def _end_of_day_key(
+    db: AsyncSession, trip_id: int, day_number: int
+) -> int:
+    """Order key that appends after the last activity of a day."""
+    last = await db.scalar(
+        select(func.max(Activity.order_key)).where(
+            Activity.trip_id == trip_id,
+            Activity.day_number == day_number,
+        )
+    )
+    return GAP if last is None else last + GAP
+
+
+async def load_activity(
+    activity_id: int,
+    db: AsyncSession,
+    current_user: Principal,
+    options: tuple = (),
+    level: str = VIEWER,
+) -> Activity:
+    """Load an activity on a trip the user has ``level`` access to.
+
+    ``options`` must load ``trip_id``; 404 unless the user can see the
+    trip.
+    """
+    activity = await db.scalar(
+        select(Activity)
+        .where(Activity.id == activity_id)
+        .options(*options)
+    )
+    if activity is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found",
+        )
+    await authorize_trip(
+        db, current_user, activity.trip_id, level, "Activity not found"
+    )
+    return activity
+
+
+async def _located(
+    db: AsyncSession, *criteria
+) -> List[Tuple[float, float, ActivityResponse]]:
+    """``(latitude, longitude, activity)`` of located activities."""
+    activities = await db.scalars(
+        select(Activity).where(Activity.geo_key.is_not(None), *criteria)
+    )
+    return [
+        (a.latitude, a.longitude, ActivityResponse.model_validate(a))
+        for a in activities
+    ]
+
+
+async def _geo_index(
+    db: AsyncSession,
+    current_user: Principal,
+    trip_id: Optional[int],
+    ranges: List[Range],
+) -> GeoIndex:
+    """Index to search: a trip's (cached), or all the user can view.
+
+    Without ``trip_id`` only activities in ``ranges`` are loaded, from
+    the trips the user owns or that are shared with them.
+    """
+    if trip_id is not None:
+        await authorize_trip(db, current_user, trip_id)
+        index = trip_geo_cache.get(trip_id)
+        if index is None:
+            index = GeoIndex(await _located(db, Activity.trip_id == trip_id))
+            trip_geo_cache.put(trip_id, index)
+        return index
+    # Owned and shared trips, from the cached permission map; geo_key
+    # ranges hit ix_activities_trip_geo per trip
+    trip_ids = list(await user_permissions(db, current_user.id))
+    if not trip_ids:
+        return GeoIndex([])
+    return GeoIndex(await _located(
+        db,
+        Activity.trip_id.in_(trip_ids),
+        or_(*(
+            Activity.geo_key.between(lo, hi - 1) for lo, hi in ranges
+        )),
+    ))
+
+
+@router.post(
+    "",
+    response_model=ActivityResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_activity(
+    activity_data: ActivityCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Add an activity to the end of a day of the user's trip."""
+    trip = await load_trip(
+        activity_data.trip_id, db, current_user, level=EDITOR
+    )
+    check_day(trip, activity_data.day_number)
+    activity = Activity(
+        **activity_data.model_dump(),
+        order_key=await _end_of_day_key(
+            db, trip.id, activity_data.day_number
+        ),
+        geo_key=geo_key(activity_data.latitude, activity_data.longitude),
+    )
+    db.add(activity)
+    await db.commit()
+    trip_geo_cache.invalidate(trip.id)
+    await trip_hub.publish(
+        trip.id, change("activity", activity.id, activity_row(activity))
+    )
+    return activity
+
+
+@router.get("", response_model=List[ActivityResponse])
+async def list_activities(
+    trip_id: int = Query(...),
+    fields: Fields = Depends(activity_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """A trip's itinerary ordered by day and position."""
+    await authorize_trip(db, current_user, trip_id)
+    activities = await db.scalars(
+        select(Activity)
+        .where(Activity.trip_id == trip_id)
+        .order_by(Activity.day_number, Activity.order_key)
+        .options(*load_fields(Activity, fields))
+    )
+    encode = activity_row.only(fields)
+    return ORJSONResponse([encode(a) for a in activities])
+
+
+@router.get("/nearby", response_model=List[NearbyActivity])
+async def nearby_activities(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(
+        default=1000, gt=0, le=settings.NEARBY_MAX_RADIUS_M,
+        description="Meters",
+    ),
+    trip_id: Optional[int] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Located activities within ``radius`` meters, nearest first.
+
+    Searches one trip with ``trip_id``, else every trip the user can
+    view (owned or shared).
+    """
+    index = await _geo_index(
+        db, current_user, trip_id, circle_ranges(lat, lon, radius)
+    )
+    return [
+        NearbyActivity.model_construct(**dict(activity), distance_m=distance)
+        for distance, activity in index.nearby(lat, lon, radius)[:limit]
+    ]
+
+
+@router.get("/within", response_model=List[ActivityResponse])
+async def activities_within(
+    south: float = Query(..., ge=-90, le=90),
+    west: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    trip_id: Optional[int] = None,
+    limit: int = Query(default=500, ge=1, le=2000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Located activities inside a map viewport.
+
+    ``west > east`` is a box crossing the 180th meridian.
+    """
+    if south > north:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="south must not be greater than north",
+        )
+    index = await _geo_index(
+        db, current_user, trip_id, box_ranges(south, west, north, east)
+    )
+    return index.within(south, west, north, east)[:limit]
+
+
+@router.patch("/reorder", response_model=List[ActivityPosition])
+async def reorder_activities(
+    reorder: ActivityReorder,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Apply a batch of moves in one transaction.
+
+    Moves are applied in order. Each one normally rewrites only the
+    moved activity's key; all changed rows are written with a single
+    executemany UPDATE. Returns the new positions of changed rows.
+    """
+    trip = await load_trip(
+        reorder.trip_id, db, current_user, level=EDITOR
+    )
+    for move in reorder.moves:
+        check_day(trip, move.day_number)
+    rows = await db.execute(
+        select(
+            Activity.id, Activity.day_number, Activity.order_key
+        ).where(Activity.trip_id == trip.id)
+    )
+    try:
+        changed = plan_moves(
+            rows.all(),
+            [(m.id, m.day_number, m.after_id) for m in reorder.moves],
+        )
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Activity {exc.args[0]} not found on this trip",
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        )
+
+    positions = [
+        {"id": activity_id, "day_number": day, "order_key": key}
+        for activity_id, (day, key) in changed.items()
+    ]
+    if positions:
+        await db.execute(update(Activity), positions)
+    await db.commit()
+    # Cached search results carry each activity's day and position
+    trip_geo_cache.invalidate(trip.id)
+    await trip_hub.publish(trip.id, *(
+        change("activity", position["id"], {
+            "day_number": position["day_number"],
+            "order_key": position["order_key"],
+        })
+        for position in positions
+    ))
+    return positions
+
+
+@router.get("/{activity_id}", response_model=ActivityResponse)
+async def get_activity(
+    activity_id: int,
+    fields: Fields = Depends(activity_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Get one activity."""
+    activity = await load_activity(
+        activity_id, db, current_user,
+        # trip_id is needed to authorize
+        load_fields(Activity, fields, "trip_id"),
+    )
+    return ORJSONResponse(activity_row.only(fields)(activity))
+
+
+@router.put("/{activity_id}", response_model=ActivityResponse)
+async def update_activity(
+    activity_id: int,
+    activity_data: ActivityUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Update an activity; moving it to another day appends it there."""
+    activity = await load_activity(
+        activity_id, db, current_user, level=EDITOR
+    )
+    changes = activity_data.model_dump(exclude_unset=True)
+    for field in ("day_number", "name"):
+        if field in changes and changes[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{field} may not be null",
+            )
+    new_day = changes.get("day_number")
+    if new_day is not None and new_day != activity.day_number:
+        trip = await db.get(Trip, activity.trip_id)
+        check_day(trip, new_day)
+        activity.order_key = await _end_of_day_key(
+            db, activity.trip_id, new_day
+        )
+    for field, value in changes.items():
+        setattr(activity, field, value)
+    if (activity.latitude is None) != (activity.longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="latitude and longitude must be given together",
+        )
+    activity.geo_key = geo_key(activity.latitude, activity.longitude)
+    await db.commit()
+    await db.refresh(activity)
+    trip_geo_cache.invalidate(activity.trip_id)
+    await trip_hub.publish(
+        activity.trip_id,
+        change("activity", activity.id, activity_row(activity)),
+    )
+    return activity
+
+
+@router.delete(
+    "/{activity_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_activity(
+    activity_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Delete an activity (its neighbours keep their keys)."""
+    activity = await load_activity(
+        activity_id, db, current_user, level=EDITOR
+    )
+    await db.delete(activity)
+    await db.commit()
+    trip_geo_cache.invalidate(activity.trip_id)
+    await trip_hub.publish(
+        activity.trip_id, change("activity", activity_id)
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,17 +1,29 @@
+import logging
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth import (
     create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
     get_current_user,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
 )
-from database import get_db
-from schemas import Token, UserCreate, UserResponse
+from database import get_async_db
+from rate_limit import limit_login, limit_register
+from revocation import revocation_store
+from schemas import RefreshRequest, Token, UserCreate, UserResponse
+from token_cache import Principal
 from user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -19,65 +31,65 @@ router = APIRouter()
     "/register",
     response_model=UserResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_register)],
 )
-def register(
+async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Register a new user."""
-    # Check for duplicate email
-    existing_email = (
-        db.query(User)
-        .filter(User.email == user_data.email)
-        .first()
-    )
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
+    """Register a new user.
 
-    # Check for duplicate username
-    existing_username = (
-        db.query(User)
-        .filter(User.username == user_data.username)
-        .first()
+    Uniqueness is enforced by the ``users`` unique indexes: a single
+    INSERT ... RETURNING either creates the row or fails with an
+    IntegrityError that is mapped back to the matching 400 message,
+    or to a generic one for a violation it does not recognise.
+    """
+    hashed_password = await get_password_hash_async(
+        user_data.password
     )
-    if existing_username:
+    try:
+        db_user = await db.scalar(
+            insert(User)
+            .values(
+                email=user_data.email,
+                username=user_data.username,
+                hashed_password=hashed_password,
+                full_name=user_data.full_name,
+            )
+            .returning(User)
+        )
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken",
+            detail=_duplicate_user_detail(exc),
         )
-
-    # Create user
-    hashed_password = get_password_hash(user_data.password)
-    db_user = User(
-        email=user_data.email,
-        username=user_data.username,
-        hashed_password=hashed_password,
-        full_name=user_data.full_name,
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
     return db_user
 
 
-@router.post("/login", response_model=Token)
-def login(
+def _duplicate_user_detail(exc: IntegrityError) -> str:
+    """Map a users unique-constraint violation to an error message."""
+    message = str(exc.orig)
+    if "users.email" in message or "ix_users_email" in message:
+        return "Email already registered"
+    if "users.username" in message or "ix_users_username" in message:
+        return "Username already taken"
+    logger.warning("Unrecognised integrity error on register: %s", message)
+    return "User already exists"
+
+
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[Depends(limit_login)],
+)
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Login with username or email and password."""
-    # Try to find user by username or email
-    user = (
-        db.query(User)
-        .filter(
-            (User.username == form_data.username)
-            | (User.email == form_data.username)
-        )
-        .first()
-    )
+    user = await db.scalar(login_lookup(form_data.username))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,7 +97,7 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(
+    if not await verify_password_async(
         form_data.password, user.hashed_password
     ):
         raise HTTPException(
@@ -94,15 +106,67 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(
-        data={"sub": user.username}
+    return _issue_tokens(user.username)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Exchange a refresh token for new access and refresh tokens.
+
+    Each refresh token works once: it is revoked as it is rotated, and a
+    replayed token is rejected from memory without a database query.
+    """
+    payload = decode_refresh_token(body.refresh_token)
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
+    if revocation_store.is_revoked(payload["jti"]):
+        raise invalid_exception
+
+    user = await db.scalar(
+        select(User).where(User.username == payload["sub"])
+    )
+    if user is None or not user.is_active:
+        raise invalid_exception
+
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+    if not await revocation_store.revoke(
+        db, payload["jti"], expires_at, user_id=user.id
+    ):
+        raise invalid_exception
+    return _issue_tokens(user.username)
+
+
+def _issue_tokens(username: str) -> Token:
+    access_token = create_access_token(data={"sub": username})
+    refresh_token, _, _ = create_refresh_token(username)
     return Token(
-        access_token=access_token, token_type="bearer"
+        access_token=access_token,
+        token_type="bearer",
+        refresh_token=refresh_token,
     )
 
 
+def login_lookup(identifier: str) -> Select:
+    """Case-insensitive user lookup for a login identifier.
+
+    Identifiers containing ``@`` are emails (usernames may not contain
+    one), so each shape gets a single-column predicate that can use its
+    lower() index instead of an OR across both columns.
+    """
+    identifier = identifier.strip().lower()
+    column = User.email if "@" in identifier else User.username
+    return select(User).where(func.lower(column) == identifier)
+
+
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(
+    current_user: Principal = Depends(get_current_user),
+):
     """Get current authenticated user."""
     return current_user
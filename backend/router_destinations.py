@@ -0,0 +1,30 @@
+from typing import List
+
+from fastapi import APIRouter, Query, Response
+
+from config import settings
+from destinations import MAX_SUGGESTIONS, destinations
+from schemas import DestinationSuggestion
+
+router = APIRouter()
+
+
+@router.get("/suggest", response_model=List[DestinationSuggestion])
+async def suggest_destinations(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=MAX_SUGGESTIONS),
+):
+    """Destinations for what the user has typed, most popular first.
+
+    Answered from the in-memory index (see destinations.py) without a
+    database or auth lookup, so it can run on every keystroke; the
+    results only change on deploy and may be cached by clients.
+    """
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.DESTINATIONS_CACHE_SECONDS}"
+    )
+    return [
+        suggestion._asdict()
+        for suggestion in destinations.index.suggest(q, limit)
+    ]
@@ -0,0 +1,202 @@
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from activity import Activity
+from auth import get_current_user
+from budget import apply_to_rollup, bucket_key, move_in_rollup
+from database import get_async_db
+from expense import Expense
+from fieldsets import Fields, field_selector, load_fields
+from permissions import EDITOR, VIEWER, authorize_trip
+from realtime import change, trip_hub
+from router_trips import check_day, load_trip
+from schemas import ExpenseCreate, ExpenseResponse, ExpenseUpdate
+from serialization import ORJSONResponse, expense_row
+from token_cache import Principal
+from trip import Trip
+
+router = APIRouter()
+
+expense_fields = field_selector(ExpenseResponse)
+
+
+async def _check_activity(
+    db: AsyncSession, trip_id: int, activity_id: Optional[int]
+) -> None:
+    """422 unless the activity (if any) belongs to the trip."""
+    if activity_id is None:
+        return
+    found = await db.scalar(
+        select(Activity.id).where(
+            Activity.id == activity_id, Activity.trip_id == trip_id
+        )
+    )
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="activity_id must be an activity of this trip",
+        )
+
+
+async def load_expense(
+    expense_id: int,
+    db: AsyncSession,
+    current_user: Principal,
+    for_update: bool = False,
+    options: tuple = (),
+    level: str = VIEWER,
+) -> Expense:
+    """Load an expense on a trip the user has ``level`` access to.
+
+    ``options`` must load ``trip_id``; 404 unless the user can see the
+    trip. ``for_update`` locks the row, so concurrent edits apply their
+    rollup changes one after the other.
+    """
+    query = (
+        select(Expense)
+        .where(Expense.id == expense_id)
+        .options(*options)
+    )
+    if for_update:
+        query = query.with_for_update(of=Expense)
+    expense = await db.scalar(query)
+    if expense is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Expense not found",
+        )
+    await authorize_trip(
+        db, current_user, expense.trip_id, level, "Expense not found"
+    )
+    return expense
+
+
+@router.post(
+    "",
+    response_model=ExpenseResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_expense(
+    expense_data: ExpenseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Record an expense on the user's trip."""
+    trip = await load_trip(
+        expense_data.trip_id, db, current_user, level=EDITOR
+    )
+    if expense_data.day_number is not None:
+        check_day(trip, expense_data.day_number)
+    await _check_activity(db, trip.id, expense_data.activity_id)
+    expense = Expense(**expense_data.model_dump())
+    db.add(expense)
+    await db.flush()
+    await apply_to_rollup(db, bucket_key(expense), expense.amount, 1)
+    await db.commit()
+    await trip_hub.publish(
+        trip.id, change("expense", expense.id, expense_row(expense))
+    )
+    return expense
+
+
+@router.get("", response_model=List[ExpenseResponse])
+async def list_expenses(
+    trip_id: int = Query(...),
+    fields: Fields = Depends(expense_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """A trip's expenses in the order they were recorded."""
+    await authorize_trip(db, current_user, trip_id)
+    expenses = await db.scalars(
+        select(Expense)
+        .where(Expense.trip_id == trip_id)
+        .order_by(Expense.id)
+        .options(*load_fields(Expense, fields))
+    )
+    encode = expense_row.only(fields)
+    return ORJSONResponse([encode(e) for e in expenses])
+
+
+@router.get("/{expense_id}", response_model=ExpenseResponse)
+async def get_expense(
+    expense_id: int,
+    fields: Fields = Depends(expense_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Get one expense."""
+    expense = await load_expense(
+        expense_id, db, current_user,
+        # trip_id is needed to authorize
+        options=load_fields(Expense, fields, "trip_id"),
+    )
+    return ORJSONResponse(expense_row.only(fields)(expense))
+
+
+@router.put("/{expense_id}", response_model=ExpenseResponse)
+async def update_expense(
+    expense_id: int,
+    expense_data: ExpenseUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Update an expense and move its amount between budget buckets."""
+    expense = await load_expense(
+        expense_id, db, current_user, for_update=True, level=EDITOR
+    )
+    changes = expense_data.model_dump(exclude_unset=True)
+    for field in ("amount", "currency", "category"):
+        if field in changes and changes[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{field} may not be null",
+            )
+    if changes.get("day_number") is not None:
+        check_day(await db.get(Trip, expense.trip_id), changes["day_number"])
+    if "activity_id" in changes:
+        await _check_activity(db, expense.trip_id, changes["activity_id"])
+
+    old_key, old_amount = bucket_key(expense), expense.amount
+    for field, value in changes.items():
+        setattr(expense, field, value)
+    await db.flush()
+    await move_in_rollup(
+        db, old_key, old_amount, bucket_key(expense), expense.amount
+    )
+    await db.commit()
+    await db.refresh(expense)
+    await trip_hub.publish(
+        expense.trip_id,
+        change("expense", expense.id, expense_row(expense)),
+    )
+    return expense
+
+
+@router.delete(
+    "/{expense_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_expense(
+    expense_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Delete an expense and take it out of the budget."""
+    expense = await load_expense(
+        expense_id, db, current_user, for_update=True, level=EDITOR
+    )
+    await apply_to_rollup(db, bucket_key(expense), -expense.amount, -1)
+    await db.delete(expense)
+    await db.commit()
+    await trip_hub.publish(expense.trip_id, change("expense", expense_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
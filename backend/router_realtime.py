@@ -0,0 +1,91 @@
+import asyncio
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+
+from auth import get_current_user
+from database import init_engines
+from permissions import authorize_trip
+from realtime import Subscriber, trip_hub
+
+router = APIRouter()
+
+
+def _token(websocket: WebSocket) -> Optional[str]:
+    """Bearer token from the Authorization header or ``?token=``.
+
+    Browsers cannot set headers on a WebSocket, hence the query string.
+    """
+    scheme, _, token = websocket.headers.get(
+        "authorization", ""
+    ).partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    return websocket.query_params.get("token")
+
+
+async def _send(websocket: WebSocket, subscriber: Subscriber) -> None:
+    while True:
+        item = await subscriber.queue.get()
+        if isinstance(item, int):
+            await websocket.close(code=item)
+            return
+        await websocket.send_text(item)
+
+
+async def _receive(websocket: WebSocket) -> None:
+    # Clients only listen; this waits for them to disconnect
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/ws/trips/{trip_id}")
+async def trip_updates(websocket: WebSocket, trip_id: int):
+    """Live changes to a trip the user can view (see realtime.py).
+
+    Authenticated once, with the same JWT access token as the API. The
+    database is only used during the handshake. Sockets close with 4403
+    when the trip stops being shared with the user and 4404 when it is
+    deleted.
+    """
+    token = _token(websocket)
+    try:
+        if token is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        async with init_engines().AsyncSessionLocal() as db:
+            user = await get_current_user(token, db)
+            await authorize_trip(db, user, trip_id)
+    except HTTPException:
+        # Before accept: the handshake is refused with a 403
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = trip_hub.subscribe(trip_id, user.id)
+    tasks = {
+        asyncio.create_task(_send(websocket, subscriber)),
+        asyncio.create_task(_receive(websocket)),
+    }
+    try:
+        done, _ = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        trip_hub.unsubscribe(trip_id, subscriber)
+        for task in tasks:
+            task.cancel()
+    for task in done:
+        error = task.exception()
+        # A client gone mid-send ends the socket like a disconnect
+        if error is not None and not isinstance(
+            error, (WebSocketDisconnect, OSError)
+        ):
+            raise error
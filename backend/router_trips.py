@@ -0,0 +1,574 @@
+import asyncio
+import base64
+import binascii
+from datetime import date, time
+from itertools import groupby
+from typing import List, Optional, Tuple
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from activity import Activity
+from auth import get_current_user
+from budget import rollup_buckets, summarize
+from config import settings
+from currency import UnknownCurrencyError, currency_rates
+from database import get_async_db, init_engines, read_replica
+from fieldsets import Fields, field_selector, load_fields
+from geo import trip_geo_cache
+from ordering import spread_keys
+from permissions import (
+    EDITOR,
+    OWNER,
+    VIEWER,
+    authorize_trip,
+    trip_members,
+    trip_permissions,
+    user_permissions,
+)
+from realtime import change, trip_hub
+from response_cache import bump_also
+from routing import Stop, optimize_route
+from schemas import (
+    ImportSummary,
+    RouteOptions,
+    RoutePlan,
+    RouteStop,
+    SharedTrip,
+    TripBudget,
+    TripCreate,
+    TripFullResponse,
+    TripPage,
+    TripResponse,
+    TripShareCreate,
+    TripShareResponse,
+    TripUpdate,
+)
+from serialization import (
+    ORJSONResponse,
+    activity_row,
+    expense_row,
+    trip_row,
+)
+from token_cache import Principal
+from trip import Trip
+from trip_share import TripShare
+from trip_transfer import (
+    ImportLineError,
+    export_trips,
+    import_trips,
+    iter_lines,
+)
+from user import User
+
+router = APIRouter()
+
+trip_fields = field_selector(TripResponse)
+
+
+def encode_cursor(trip: Trip) -> str:
+    """Opaque cursor pointing just past ``trip`` in list order."""
+    raw = f"{trip.start_date.isoformat()}:{trip.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Inverse of ``encode_cursor``; 400 on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start, _, trip_id = (
+            base64.urlsafe_b64decode(padded).decode().partition(":")
+        )
+        return date.fromisoformat(start), int(trip_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_page(
+    user_id: int, after: Optional[Tuple[date, int]], limit: int
+) -> Select:
+    """Select one page of a user's trips ordered by (start_date, id).
+
+    Seeks on the ``ix_trips_user_start_id`` index from the cursor
+    position, so each page costs O(limit) however deep it is.
+    """
+    query = select(Trip).where(Trip.user_id == user_id)
+    if after is not None:
+        query = query.where(tuple_(Trip.start_date, Trip.id) > after)
+    return query.order_by(Trip.start_date, Trip.id).limit(limit)
+
+
+def check_day(trip: Trip, day_number: int) -> None:
+    """422 unless ``day_number`` falls within the trip's dates."""
+    days = (trip.end_date - trip.start_date).days + 1
+    if not 1 <= day_number <= days:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"day_number must be between 1 and {days}",
+        )
+
+
+async def load_trip(
+    trip_id: int,
+    db: AsyncSession,
+    current_user: Principal,
+    options: tuple = (),
+    level: str = VIEWER,
+) -> Trip:
+    """Load a trip the current user has ``level`` access to.
+
+    404 if they cannot see it, 403 if they can but not at ``level``
+    (see ``authorize_trip``).
+    """
+    await authorize_trip(db, current_user, trip_id, level)
+    trip = await db.scalar(
+        select(Trip).where(Trip.id == trip_id).options(*options)
+    )
+    if trip is None:
+        # Deleted since the permission map was cached
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found",
+        )
+    return trip
+
+
+@router.post(
+    "",
+    response_model=TripResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_trip(
+    trip_data: TripCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Create a trip for the current user."""
+    trip = Trip(**trip_data.model_dump(), user_id=current_user.id)
+    db.add(trip)
+    await db.commit()
+    trip_permissions.invalidate_users([current_user.id])
+    await db.refresh(trip)
+    return trip
+
+
+@router.get("", response_model=TripPage)
+async def list_trips(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    fields: Fields = Depends(trip_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """List the current user's trips by start date (cursor paginated)."""
+    after = decode_cursor(cursor) if cursor else None
+    trips = list(await db.scalars(
+        keyset_page(current_user.id, after, limit + 1).options(
+            # The cursor is built from the last trip's start_date and id
+            *load_fields(Trip, fields, "start_date")
+        )
+    ))
+    next_cursor = None
+    if len(trips) > limit:
+        trips = trips[:limit]
+        next_cursor = encode_cursor(trips[-1])
+    encode = trip_row.only(fields)
+    return ORJSONResponse({
+        "items": [encode(trip) for trip in trips],
+        "next_cursor": next_cursor,
+    })
+
+
+@router.post(
+    "/import",
+    response_model=ImportSummary,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_trips_ndjson(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Create trips from an NDJSON body, one trip per line.
+
+    The body is streamed and inserted in batches within one transaction:
+    an invalid line rejects the whole import with a 422 naming the line.
+    """
+    try:
+        summary = await import_trips(
+            db,
+            current_user.id,
+            iter_lines(request.stream()),
+            settings.BULK_BATCH_ROWS,
+        )
+    except ImportLineError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        )
+    await db.commit()
+    trip_permissions.invalidate_users([current_user.id])
+    return summary
+
+
+@router.get("/export")
+async def export_trips_ndjson(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+):
+    """Stream all of the current user's trips as NDJSON.
+
+    Each line is a trip with its activities, in the format accepted by
+    ``POST /import``.
+    """
+    replica = read_replica(request)
+    session_factory = (
+        replica.sessionmaker if replica is not None
+        else init_engines().AsyncSessionLocal
+    )
+
+    async def body():
+        # Dependency sessions close before a streamed body is sent
+        async with session_factory() as db:
+            async for chunk in export_trips(
+                db, current_user.id, settings.BULK_BATCH_ROWS
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": 'attachment; filename="trips.ndjson"'
+        },
+    )
+
+
+@router.get("/shared", response_model=List[SharedTrip])
+async def list_shared_trips(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Trips other users share with the current user, by start date."""
+    permissions = await user_permissions(db, current_user.id)
+    shared = [
+        trip_id for trip_id, level in permissions.items()
+        if level != OWNER
+    ]
+    if not shared:
+        return ORJSONResponse([])
+    trips = await db.scalars(
+        select(Trip)
+        .where(Trip.id.in_(shared))
+        .order_by(Trip.start_date, Trip.id)
+    )
+    return ORJSONResponse([
+        {**trip_row(trip), "permission": permissions[trip.id]}
+        for trip in trips
+    ])
+
+
+@router.get("/{trip_id}", response_model=TripResponse)
+async def get_trip(
+    trip_id: int,
+    fields: Fields = Depends(trip_fields),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Get a trip the current user owns or is shared."""
+    trip = await load_trip(
+        trip_id, db, current_user, load_fields(Trip, fields)
+    )
+    return ORJSONResponse(trip_row.only(fields)(trip))
+
+
+@router.get("/{trip_id}/full", response_model=TripFullResponse)
+async def get_trip_full(
+    trip_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Trip with its itinerary grouped by day and its expenses.
+
+    Loads in three queries (trip, activities, expenses) regardless of
+    itinerary size, and encodes the rows without response models.
+    """
+    trip = await load_trip(trip_id, db, current_user, (
+        selectinload(Trip.activities),
+        selectinload(Trip.expenses),
+    ))
+    full = trip_row(trip)
+    full["days"] = [
+        {
+            "day_number": day_number,
+            "activities": [activity_row(a) for a in activities],
+        }
+        for day_number, activities in groupby(
+            trip.activities, key=lambda a: a.day_number
+        )
+    ]
+    full["expenses"] = [expense_row(e) for e in trip.expenses]
+    return ORJSONResponse(full)
+
+
+@router.get("/{trip_id}/budget", response_model=TripBudget)
+async def get_trip_budget(
+    trip_id: int,
+    currency: Optional[str] = Query(default=None, pattern="^[A-Z]{3}$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Planned budget against expenses by currency, category and day.
+
+    Reads the precomputed rollups (see budget.py), never the expenses.
+    With ``currency``, totals are also converted into it using the
+    current rates snapshot.
+    """
+    trip = await load_trip(trip_id, db, current_user)
+    buckets = await rollup_buckets(db, trip.id)
+    try:
+        return summarize(trip, buckets, currency_rates.table, currency)
+    except UnknownCurrencyError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No exchange rate for {currency}",
+        )
+
+
+def _minute(value: Optional[time]) -> Optional[int]:
+    return None if value is None else value.hour * 60 + value.minute
+
+
+@router.post(
+    "/{trip_id}/days/{day_number}/optimize", response_model=RoutePlan
+)
+async def optimize_day(
+    trip_id: int,
+    day_number: int,
+    options: RouteOptions = RouteOptions(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Order a day's located activities to keep travel short.
+
+    Activities with a ``start_time`` are not reached after it where
+    possible. Returns the order with estimated legs and arrivals; with
+    ``apply`` it also becomes the day's order (see routing.py).
+    """
+    # Only applying the order needs edit access
+    trip = await load_trip(
+        trip_id, db, current_user,
+        level=EDITOR if options.apply else VIEWER,
+    )
+    check_day(trip, day_number)
+    activities = list(await db.scalars(
+        select(Activity)
+        .where(Activity.trip_id == trip.id, Activity.day_number == day_number)
+        .order_by(Activity.order_key)
+    ))
+    located = [a for a in activities if a.latitude is not None]
+    unrouted = [a for a in activities if a.latitude is None]
+    if len(located) > settings.ROUTE_MAX_STOPS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.ROUTE_MAX_STOPS} located "
+                   f"activities can be optimized",
+        )
+    start = None
+    if options.start_latitude is not None:
+        start = (options.start_latitude, options.start_longitude)
+    # CPU-bound (about 50 ms at 200 stops): keep it off the event loop
+    route = await asyncio.to_thread(
+        optimize_route,
+        [Stop(a.latitude, a.longitude, _minute(a.start_time))
+         for a in located],
+        start,
+        _minute(options.day_start),
+        options.speed_kmh,
+        options.stay_minutes,
+    )
+    ordered = [located[i] for i in route.order]
+    if options.apply and activities:
+        keys = [
+            {"id": activity.id, "order_key": key}
+            for activity, key in zip(
+                ordered + unrouted, spread_keys(len(activities))
+            )
+        ]
+        await db.execute(update(Activity), keys)
+        await db.commit()
+        trip_geo_cache.invalidate(trip.id)
+        await trip_hub.publish(trip.id, *(
+            change("activity", row["id"], {"order_key": row["order_key"]})
+            for row in keys
+        ))
+    return RoutePlan(
+        trip_id=trip.id,
+        day_number=day_number,
+        distance_m=route.distance_m,
+        stops=[
+            RouteStop(
+                activity_id=activity.id,
+                name=activity.name,
+                distance_m=leg,
+                arrival_minute=round(arrival),
+                late_minutes=round(late),
+            )
+            for activity, leg, arrival, late in zip(
+                ordered, route.legs_m, route.arrivals, route.late
+            )
+        ],
+        unrouted=[activity.id for activity in unrouted],
+        applied=options.apply,
+    )
+
+
+@router.put("/{trip_id}", response_model=TripResponse)
+async def update_trip(
+    trip_id: int,
+    trip_data: TripUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Update fields of a trip (owner or editor)."""
+    trip = await load_trip(trip_id, db, current_user, level=EDITOR)
+    changes = trip_data.model_dump(exclude_unset=True)
+    for field in ("title", "destination", "start_date", "end_date"):
+        if field in changes and changes[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{field} may not be null",
+            )
+    for field, value in changes.items():
+        setattr(trip, field, value)
+    if trip.end_date < trip.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="end_date must not be before start_date",
+        )
+    await db.commit()
+    await db.refresh(trip)
+    await trip_hub.publish(trip.id, change("trip", trip.id, trip_row(trip)))
+    return trip
+
+
+@router.delete("/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_trip(
+    trip_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Delete one of the current user's trips (owner only)."""
+    trip = await load_trip(trip_id, db, current_user, level=OWNER)
+    members = await trip_members(db, trip_id)
+    await db.delete(trip)
+    await db.commit()
+    trip_geo_cache.invalidate(trip_id)
+    trip_permissions.invalidate_users(members)
+    await trip_hub.publish(trip_id, change("trip", trip_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/{trip_id}/shares", response_model=List[TripShareResponse])
+async def list_trip_shares(
+    trip_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Users the trip is shared with (owner only)."""
+    await authorize_trip(db, current_user, trip_id, OWNER)
+    rows = await db.execute(
+        select(
+            TripShare.user_id,
+            User.username,
+            TripShare.permission_level.label("permission"),
+        )
+        .join(User, User.id == TripShare.user_id)
+        .where(TripShare.trip_id == trip_id)
+        .order_by(User.username)
+    )
+    return [TripShareResponse.model_validate(row) for row in rows]
+
+
+@router.put("/{trip_id}/shares", response_model=TripShareResponse)
+async def share_trip(
+    trip_id: int,
+    share: TripShareCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Share a trip with a user, or change their permission."""
+    await authorize_trip(db, current_user, trip_id, OWNER)
+    user_id = await db.scalar(
+        select(User.id).where(User.username == share.username)
+    )
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    if user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="A trip cannot be shared with its owner",
+        )
+    await db.merge(TripShare(
+        trip_id=trip_id,
+        user_id=user_id,
+        permission_level=share.permission,
+    ))
+    await db.commit()
+    trip_permissions.invalidate_users([user_id])
+    bump_also([user_id])
+    await trip_hub.publish(trip_id, change("share", user_id, {
+        "username": share.username,
+        "permission": share.permission,
+    }))
+    return TripShareResponse(
+        user_id=user_id,
+        username=share.username,
+        permission=share.permission,
+    )
+
+
+@router.delete(
+    "/{trip_id}/shares/{user_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def unshare_trip(
+    trip_id: int,
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Stop sharing a trip with a user (owner only)."""
+    await authorize_trip(db, current_user, trip_id, OWNER)
+    result = await db.execute(
+        delete(TripShare).where(
+            TripShare.trip_id == trip_id, TripShare.user_id == user_id
+        )
+    )
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Share not found",
+        )
+    await db.commit()
+    trip_permissions.invalidate_users([user_id])
+    # Also closes the user's sockets on the trip
+    await trip_hub.publish(trip_id, change("share", user_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,304 @@
+"""Visiting order for a day's activities ("optimize my day").
+
+``optimize_route`` takes the located stops of a day and returns an
+open path (no return to the start) that keeps the total great-circle
+distance low:
+
+1. ``distance_matrix`` computes every pairwise distance up front, one
+   list comprehension per row over unit vectors (a chord length and an
+   ``asin`` per pair, each pair once);
+2. a nearest-neighbour tour gives the first order, never detouring in
+   a way that would make the next timed stop late;
+3. 2-opt then reverses segments while that shortens the path. Each
+   position takes its best improving reversal, found with one
+   comprehension over the rest of the path against cached edge lengths.
+
+Stops with an ``opens`` time (an activity's ``start_time``) are time
+windows: the visitor waits if early, and a reversal is only kept if it
+does not add lateness. Travel time is distance over a fixed speed, plus
+a fixed stay at every stop -- an estimate, not a routing engine.
+"""
+import math
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from geo import EARTH_RADIUS_M
+
+# Improvements smaller than this (meters) do not count
+_EPSILON = 1e-6
+MAX_PASSES = 50
+# Improving reversals tried per position when time windows apply
+MAX_WINDOW_TRIES = 8
+
+
+class Stop(NamedTuple):
+    """A place to visit; ``opens`` is in minutes after midnight."""
+
+    lat: float
+    lon: float
+    opens: Optional[float] = None
+
+
+@dataclass
+class Route:
+    """Stops in visiting order, with the schedule along the path."""
+
+    # Indexes into the stops passed to optimize_route
+    order: List[int]
+    # Meters from the previous stop (or the start) to each stop
+    legs_m: List[float]
+    # Arrival at each stop, minutes after midnight
+    arrivals: List[float]
+    # Minutes after ``opens`` each stop is reached (0 if on time)
+    late: List[float]
+
+    @property
+    def distance_m(self) -> float:
+        return sum(self.legs_m)
+
+
+def _unit_vectors(points: Sequence[Tuple[float, float]]):
+    vectors = []
+    for lat, lon in points:
+        phi, lam = math.radians(lat), math.radians(lon)
+        cos_phi = math.cos(phi)
+        vectors.append(
+            (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+        )
+    return vectors
+
+
+def distance_matrix(
+    points: Sequence[Tuple[float, float]]
+) -> List[List[float]]:
+    """Great-circle meters between every pair of ``(lat, lon)``.
+
+    Computes the upper triangle, a row at a time, and mirrors it.
+    """
+    vectors = _unit_vectors(points)
+    diameter = 2 * EARTH_RADIUS_M
+    asin, sqrt = math.asin, math.sqrt
+    rows = [[0.0] * len(vectors) for _ in vectors]
+    for i, (x, y, z) in enumerate(vectors):
+        distances = [
+            diameter * asin(min(1.0, 0.5 * sqrt(
+                (x - x2) * (x - x2) + (y - y2) * (y - y2)
+                + (z - z2) * (z - z2)
+            )))
+            for x2, y2, z2 in vectors[i + 1:]
+        ]
+        rows[i][i + 1:] = distances
+        for j, distance in enumerate(distances, start=i + 1):
+            rows[j][i] = distance
+    return rows
+
+
+class _Planner:
+    """Path search over nodes 0 (start), 1..n (stops), n + 1 (end).
+
+    The start node has zero distance to everything when no start point
+    is given, and the end node always does: both make the path open.
+    """
+
+    def __init__(self, stops, start, day_start, speed_m_per_min, stay):
+        n = len(stops)
+        points = [(s.lat, s.lon) for s in stops]
+        matrix = distance_matrix(
+            points if start is None else [start, *points]
+        )
+        zeros = [0.0] * (n + 2)
+        if start is None:
+            self.dist = [zeros] + [[0.0, *row, 0.0] for row in matrix]
+        else:
+            self.dist = [[*row, 0.0] for row in matrix]
+        self.dist.append(zeros)
+        self.end = n + 1
+        self.opens = [None, *(s.opens for s in stops), None]
+        self.timed = sorted(
+            (node for node in range(1, n + 1)
+             if self.opens[node] is not None),
+            key=self.opens.__getitem__,
+        )
+        self.day_start = day_start
+        self.speed = speed_m_per_min
+        self.stay = stay
+
+    def schedule(self, path: List[int]):
+        """Arrival and lateness at each node of ``path``."""
+        arrivals, late = [], []
+        clock, previous = self.day_start, 0
+        for node in path:
+            clock += self.dist[previous][node] / self.speed
+            arrivals.append(clock)
+            opens = self.opens[node]
+            if opens is None:
+                late.append(0.0)
+            else:
+                late.append(max(0.0, clock - opens))
+                clock = max(clock, opens)
+            clock += self.stay
+            previous = node
+        return arrivals, late
+
+    def _walk(self, nodes, clock: float, previous: int, late=0.0):
+        """``(clock, lateness so far)`` after each of ``nodes``."""
+        dist, opens, speed, stay = (
+            self.dist, self.opens, self.speed, self.stay
+        )
+        states = []
+        for node in nodes:
+            clock += dist[previous][node] / speed
+            if opens[node] is not None:
+                if clock > opens[node]:
+                    late += clock - opens[node]
+                else:
+                    clock = opens[node]
+            clock += stay
+            states.append((clock, late))
+            previous = node
+        return states
+
+    def _adds_lateness(self, tail, clock, late, previous, states, i, j):
+        """Whether ``path[:i] + tail`` is later overall than the path.
+
+        ``tail`` is the path from position ``i`` with ``i..j`` reversed,
+        and ``states`` the current path's ``_walk``. Stops as soon as the
+        lateness exceeds the current total, or once past ``j`` (where the
+        stops are the same) it is no later at a position than now.
+        """
+        dist, opens, speed, stay = (
+            self.dist, self.opens, self.speed, self.stay
+        )
+        limit = states[-1][1] + _EPSILON
+        for position, node in enumerate(tail, start=i):
+            clock += dist[previous][node] / speed
+            if opens[node] is not None:
+                if clock > opens[node]:
+                    late += clock - opens[node]
+                    if late > limit:
+                        return True
+                else:
+                    clock = opens[node]
+            clock += stay
+            if position > j:
+                old_clock, old_late = states[position]
+                if clock <= old_clock and late <= old_late:
+                    return False
+            previous = node
+        return False
+
+    def nearest_neighbour(self) -> List[int]:
+        dist, opens = self.dist, self.opens
+        left = set(range(1, self.end))
+        timed = list(self.timed)
+        path = []
+        clock, current = self.day_start, 0
+        while left:
+            while timed and timed[0] not in left:
+                timed.pop(0)
+            urgent = timed[0] if timed else None
+            row = dist[current]
+            chosen = urgent
+            for node in sorted(left, key=row.__getitem__):
+                if urgent is None or node == urgent:
+                    chosen = node
+                    break
+                # Would visiting ``node`` first make ``urgent`` late?
+                done = clock + row[node] / self.speed
+                if opens[node] is not None:
+                    done = max(done, opens[node])
+                done += self.stay
+                if done + dist[node][urgent] / self.speed <= opens[urgent]:
+                    chosen = node
+                    break
+            clock += row[chosen] / self.speed
+            if opens[chosen] is not None:
+                clock = max(clock, opens[chosen])
+            clock += self.stay
+            path.append(chosen)
+            left.discard(chosen)
+            current = chosen
+        return path
+
+    def two_opt(self, path: List[int]) -> List[int]:
+        dist, timed, end = self.dist, set(self.timed), self.end
+        n = len(path)
+        # Length of the edge leaving each position
+        edges = [dist[c][e] for c, e in zip(path, path[1:] + [end])]
+        # With windows: (clock, lateness) after each position
+        states = self._walk(path, self.day_start, 0) if timed else None
+        for _ in range(MAX_PASSES):
+            improved = False
+            for i in range(n - 1):
+                # Reversing path[i..j] swaps edges (a, b) and (c, e) for
+                # (a, c) and (b, e): it pays if a-c + b-e < a-b + c-e
+                a = path[i - 1] if i else 0
+                b = path[i]
+                from_a, from_b = dist[a], dist[b]
+                cs = path[i + 1:]
+                costs = [
+                    from_a[c] + from_b[e] - w
+                    for c, e, w in zip(cs, cs[1:] + [end], edges[i + 1:])
+                ]
+                threshold = from_a[b] - _EPSILON
+                if min(costs) >= threshold:
+                    continue
+                improving = sorted(
+                    (k for k, cost in enumerate(costs) if cost < threshold),
+                    key=costs.__getitem__,
+                )
+                # Lateness can only change if a timed stop is reordered
+                check = bool(timed) and not timed.isdisjoint(path[i:])
+                if check:
+                    improving = improving[:MAX_WINDOW_TRIES]
+                if timed:
+                    clock, late = states[i - 1] if i else (self.day_start, 0)
+                for k in improving:
+                    j = i + 1 + k
+                    tail = path[i:j + 1][::-1] + path[j + 1:]
+                    if check and self._adds_lateness(
+                        tail, clock, late, a, states, i, j
+                    ):
+                        continue
+                    if timed:
+                        states[i:] = self._walk(tail, clock, a, late)
+                    path = path[:i] + tail
+                    edges[i:] = [
+                        dist[c][e] for c, e in zip(tail, tail[1:] + [end])
+                    ]
+                    improved = True
+                    break
+            if not improved:
+                break
+        return path
+
+
+def optimize_route(
+    stops: Sequence[Stop],
+    start: Optional[Tuple[float, float]] = None,
+    day_start: float = 9 * 60,
+    speed_kmh: float = 4.5,
+    stay_minutes: float = 60,
+) -> Route:
+    """A short open path through ``stops``, respecting their windows.
+
+    ``start`` is an optional ``(lat, lon)`` the day begins from (the
+    hotel); without it the path may begin at any stop. ``day_start`` is
+    when the first leg starts, in minutes after midnight.
+    """
+    if not stops:
+        return Route(order=[], legs_m=[], arrivals=[], late=[])
+    planner = _Planner(
+        stops, start, day_start, speed_kmh * 1000 / 60, stay_minutes
+    )
+    path = planner.two_opt(planner.nearest_neighbour())
+    arrivals, late = planner.schedule(path)
+    return Route(
+        order=[node - 1 for node in path],
+        legs_m=[
+            planner.dist[previous][node]
+            for previous, node in zip([0, *path], path)
+        ],
+        arrivals=arrivals,
+        late=late,
+    )
@@ -1,7 +1,15 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Annotated, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 
 class UserCreate(BaseModel):
@@ -12,6 +20,23 @@ class UserCreate(BaseModel):
     password: str
     full_name: Optional[str] = None
 
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        """Store emails lower-cased so lookups hit one index."""
+        return value.strip().lower()
+
+    @field_validator("username")
+    @classmethod
+    def validate_username(cls, value: str) -> str:
+        """Usernames keep their case but may not look like emails."""
+        value = value.strip()
+        if not value:
+            raise ValueError("Username must not be empty")
+        if "@" in value:
+            raise ValueError("Username must not contain '@'")
+        return value
+
 
 class UserResponse(BaseModel):
     """Schema for user response (no password)."""
@@ -38,9 +63,370 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token."""
+
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     """Schema for JWT token payload data."""
 
     username: Optional[str] = None
+
+
+class TripBase(BaseModel):
+    """Fields shared by trip create and response schemas."""
+
+    title: str = Field(min_length=1, max_length=255)
+    destination: str = Field(min_length=1, max_length=255)
+    description: Optional[str] = None
+    start_date: date
+    end_date: date
+    budget: Optional[Decimal] = Field(default=None, ge=0)
+
+
+class TripCreate(TripBase):
+    """Schema for creating a trip."""
+
+    @model_validator(mode="after")
+    def check_dates(self) -> "TripCreate":
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+
+class TripUpdate(BaseModel):
+    """Schema for updating a trip (all fields optional)."""
+
+    title: Optional[str] = Field(
+        default=None, min_length=1, max_length=255
+    )
+    destination: Optional[str] = Field(
+        default=None, min_length=1, max_length=255
+    )
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    budget: Optional[Decimal] = Field(default=None, ge=0)
+
+
+class TripResponse(TripBase):
+    """Schema for trip response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    budget: Optional[float] = None
+    created_at: datetime
+
+
+class SharedTrip(TripResponse):
+    """A trip shared with the current user, with their permission."""
+
+    permission: str
+
+
+class TripShareCreate(BaseModel):
+    """Schema for sharing a trip with a user (or changing their level)."""
+
+    username: str = Field(min_length=1)
+    permission: Literal["viewer", "editor"]
+
+
+class TripShareResponse(BaseModel):
+    """A user a trip is shared with."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    username: str
+    permission: str
+
+
+class TripPage(BaseModel):
+    """One page of trips plus the cursor for the next page."""
+
+    items: List[TripResponse]
+    next_cursor: Optional[str] = None
+
+
+class ActivityBase(BaseModel):
+    """Fields shared by activity create and response schemas."""
+
+    day_number: int = Field(ge=1)
+    name: str = Field(min_length=1, max_length=255)
+    start_time: Optional[time] = None
+    location: Optional[str] = Field(default=None, max_length=255)
+    activity_type: Optional[str] = Field(default=None, max_length=50)
+    cost: Optional[Decimal] = Field(default=None, ge=0)
+    notes: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_coordinates(self) -> "ActivityBase":
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError(
+                "latitude and longitude must be given together"
+            )
+        return self
+
+
+class ActivityCreate(ActivityBase):
+    """Schema for adding an activity (appended to the end of its day)."""
+
+    trip_id: int
+
+
+class ActivityUpdate(BaseModel):
+    """Schema for updating an activity (all fields optional)."""
+
+    day_number: Optional[int] = Field(default=None, ge=1)
+    name: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    start_time: Optional[time] = None
+    location: Optional[str] = Field(default=None, max_length=255)
+    activity_type: Optional[str] = Field(default=None, max_length=50)
+    cost: Optional[Decimal] = Field(default=None, ge=0)
+    notes: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+
+class ActivityResponse(ActivityBase):
+    """Schema for activity response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    trip_id: int
+    order_key: int
+    cost: Optional[float] = None
+
+
+class NearbyActivity(ActivityResponse):
+    """An activity found by a nearby search, with its distance."""
+
+    distance_m: float
+
+
+class RouteOptions(BaseModel):
+    """How to estimate a day's schedule when ordering it by distance."""
+
+    # Where the day begins (the hotel); otherwise at any activity
+    start_latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    start_longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    day_start: time = time(9, 0)
+    speed_kmh: float = Field(default=4.5, gt=0, le=200)
+    stay_minutes: int = Field(default=60, ge=0, le=24 * 60)
+    # Save the order, or just preview it
+    apply: bool = False
+
+    @model_validator(mode="after")
+    def check_start(self) -> "RouteOptions":
+        if (self.start_latitude is None) != (self.start_longitude is None):
+            raise ValueError(
+                "start_latitude and start_longitude must be given together"
+            )
+        return self
+
+
+class RouteStop(BaseModel):
+    """One activity of an optimized day, in visiting order."""
+
+    activity_id: int
+    name: str
+    # From the previous stop (or the start)
+    distance_m: float
+    # Estimated arrival, minutes after midnight
+    arrival_minute: int
+    # Minutes after the activity's start_time it is reached
+    late_minutes: int
+
+
+class RoutePlan(BaseModel):
+    """Visiting order for a day's located activities."""
+
+    trip_id: int
+    day_number: int
+    distance_m: float
+    stops: List[RouteStop]
+    # Activities without coordinates, kept after the routed ones
+    unrouted: List[int]
+    applied: bool
+
+
+class DestinationSuggestion(BaseModel):
+    """An autocomplete match; ``fuzzy`` if it needed a one-letter fix."""
+
+    name: str
+    country: str
+    popularity: int
+    fuzzy: bool
+
+
+class TripTransfer(TripCreate):
+    """One NDJSON line of a trip import or export.
+
+    A trip with its activities in itinerary order; ids are not carried,
+    so an export re-imports as new trips.
+    """
+
+    activities: List[ActivityBase] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_activity_days(self) -> "TripTransfer":
+        days = (self.end_date - self.start_date).days + 1
+        for activity in self.activities:
+            if activity.day_number > days:
+                raise ValueError(
+                    f"activity day_number must be between 1 and {days}"
+                )
+        return self
+
+
+class ImportSummary(BaseModel):
+    """Rows created by a bulk import."""
+
+    trips: int
+    activities: int
+
+
+class ActivityMove(BaseModel):
+    """Move one activity behind another (or to the top of a day)."""
+
+    id: int
+    day_number: int = Field(ge=1)
+    after_id: Optional[int] = None
+
+
+class ActivityReorder(BaseModel):
+    """Schema for a batch of moves applied in one transaction."""
+
+    trip_id: int
+    moves: List[ActivityMove] = Field(min_length=1, max_length=1000)
+
+
+class ActivityPosition(BaseModel):
+    """New position of an activity after a reorder."""
+
+    id: int
+    day_number: int
+    order_key: int
+
+
+# Expense amounts fit Numeric(12, 2)
+Amount = Annotated[Decimal, Field(ge=0, max_digits=12, decimal_places=2)]
+
+
+class ExpenseCreate(BaseModel):
+    """Schema for recording an expense on a trip."""
+
+    trip_id: int
+    activity_id: Optional[int] = None
+    day_number: Optional[int] = Field(default=None, ge=1)
+    amount: Amount
+    currency: str = Field(default="USD", pattern="^[A-Z]{3}$")
+    category: str = Field(default="other", min_length=1, max_length=50)
+    description: Optional[str] = Field(default=None, max_length=255)
+
+    @field_validator("category")
+    @classmethod
+    def normalize_category(cls, value: str) -> str:
+        """One spelling per category, so budget rollups add up."""
+        return value.strip().lower()
+
+
+class ExpenseUpdate(BaseModel):
+    """Schema for updating an expense (all fields optional)."""
+
+    activity_id: Optional[int] = None
+    day_number: Optional[int] = Field(default=None, ge=1)
+    amount: Optional[Amount] = None
+    currency: Optional[str] = Field(default=None, pattern="^[A-Z]{3}$")
+    category: Optional[str] = Field(
+        default=None, min_length=1, max_length=50
+    )
+    description: Optional[str] = Field(default=None, max_length=255)
+
+    @field_validator("category")
+    @classmethod
+    def normalize_category(cls, value: Optional[str]) -> Optional[str]:
+        return value.strip().lower() if value is not None else None
+
+
+class ExpenseResponse(BaseModel):
+    """Schema for expense response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    trip_id: int
+    activity_id: Optional[int] = None
+    day_number: Optional[int] = None
+    amount: float
+    currency: str
+    category: str
+    description: Optional[str] = None
+
+
+class ItineraryDay(BaseModel):
+    """Activities of one trip day, in order."""
+
+    day_number: int
+    activities: List[ActivityResponse]
+
+
+class TripFullResponse(TripResponse):
+    """Trip with its itinerary grouped by day and its expenses."""
+
+    days: List[ItineraryDay]
+    expenses: List[ExpenseResponse]
+
+
+class BudgetTotal(BaseModel):
+    """Spending in one currency."""
+
+    currency: str
+    total: float
+    count: int
+
+
+class BudgetCategory(BudgetTotal):
+    """Spending in one category and currency."""
+
+    category: str
+
+
+class BudgetDay(BudgetTotal):
+    """Spending on one trip day (None: not tied to a day)."""
+
+    day_number: Optional[int] = None
+
+
+class ConvertedBudget(BaseModel):
+    """Spending converted into one currency with a rates snapshot.
+
+    Expenses in currencies the snapshot lacks are left out and listed.
+    """
+
+    rates_as_of: Optional[str] = None
+    spent: BudgetTotal
+    by_category: List[BudgetCategory]
+    by_day: List[BudgetDay]
+    unconverted: List[str]
+
+
+class TripBudget(BaseModel):
+    """Planned budget against expenses, overall, by category and day."""
+
+    trip_id: int
+    planned: Optional[float] = None
+    spent: List[BudgetTotal]
+    by_category: List[BudgetCategory]
+    by_day: List[BudgetDay]
+    converted: Optional[ConvertedBudget] = None
@@ -1,4 +1,5 @@
 import os
+from contextlib import contextmanager
 
 os.environ.setdefault(
     "DATABASE_URL", "sqlite:///test.db"
@@ -9,8 +10,36 @@ os.environ.setdefault(
 
 from fastapi.testclient import TestClient  # noqa: E402
 from main import app  # noqa: E402
-from database import Base, engine  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import (  # noqa: E402
+    Base,
+    SessionLocal,
+    async_engine,
+    engine,
+)
+from geo import trip_geo_cache  # noqa: E402
+from metrics import metrics_registry  # noqa: E402
+from permissions import trip_permissions  # noqa: E402
+from rate_limit import rate_limits  # noqa: E402
+from response_cache import (  # noqa: E402
+    response_cache_backend,
+    response_cache_stats,
+)
+from revocation import revocation_store  # noqa: E402
+from token_cache import token_cache  # noqa: E402
+from user import User  # noqa: E402
 import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+# Defaults for trips made by ``create_trip``: four days in May 2026
+TRIP = {
+    "title": "Lisbon weekend",
+    "destination": "Lisbon, Portugal",
+    "description": "Pasteis de nata",
+    "start_date": "2026-05-01",
+    "end_date": "2026-05-04",
+    "budget": 850.5,
+}
 
 
 @pytest.fixture(autouse=True)
@@ -19,9 +48,82 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    token_cache.clear()
+    revocation_store.clear()
+    response_cache_backend.clear()
+    response_cache_stats.reset()
+    metrics_registry.reset()
+    trip_geo_cache.clear()
+    rate_limits.clear()
+    trip_permissions.clear()
 
 
 @pytest.fixture
 def client():
     """Return a TestClient for the FastAPI app."""
     return TestClient(app)
+
+
+@pytest.fixture
+def make_auth_headers():
+    """Return a factory creating a user and its Bearer auth headers.
+
+    Users are inserted directly with a placeholder hash, so no bcrypt
+    work is done.
+    """
+    def factory(username="tripuser"):
+        db = SessionLocal()
+        db.add(User(
+            email=f"{username}@example.com",
+            username=username,
+            hashed_password="not-a-bcrypt-hash",
+        ))
+        db.commit()
+        db.close()
+        token = create_access_token(data={"sub": username})
+        return {"Authorization": f"Bearer {token}"}
+
+    return factory
+
+
+@pytest.fixture
+def auth_headers(make_auth_headers):
+    """Bearer auth headers for a freshly created user."""
+    return make_auth_headers()
+
+
+@pytest.fixture
+def create_trip(client):
+    """Return a factory creating a trip through the API.
+
+    Fields default to ``TRIP``; keyword arguments override them. The
+    factory returns the response.
+    """
+    def factory(headers, **fields):
+        return client.post(
+            "/api/v1/trips", json={**TRIP, **fields}, headers=headers
+        )
+
+    return factory
+
+
+@pytest.fixture
+def count_statements():
+    """Return a context manager collecting the SQL run inside it."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        target = async_engine.sync_engine
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(
+                target, "before_cursor_execute", before_cursor_execute
+            )
+
+    return counter
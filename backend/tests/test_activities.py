@@ -0,0 +1,171 @@
+"""Tests for activity endpoints."""
+import pytest
+
+ACTIVITIES = "/api/v1/activities"
+
+
+@pytest.fixture
+def trip_id(create_trip, auth_headers):
+    """A three-day trip of the ``auth_headers`` user."""
+    return create_trip(auth_headers, end_date="2026-05-03").json()["id"]
+
+
+def _create_activity(client, headers, trip_id, name, day_number=1):
+    return client.post(ACTIVITIES, json={
+        "trip_id": trip_id,
+        "day_number": day_number,
+        "name": name,
+    }, headers=headers)
+
+
+def _itinerary(client, headers, trip_id):
+    activities = client.get(
+        ACTIVITIES, params={"trip_id": trip_id}, headers=headers
+    ).json()
+    return [(a["day_number"], a["name"]) for a in activities]
+
+
+def _reorder(client, headers, trip_id, moves):
+    return client.patch(
+        f"{ACTIVITIES}/reorder",
+        json={"trip_id": trip_id, "moves": moves},
+        headers=headers,
+    )
+
+
+class TestCreateActivity:
+    """Tests for POST /api/v1/activities."""
+
+    def test_create_appends_to_day(self, client, auth_headers, trip_id):
+        """New activities go to the end of their day."""
+        for name in ("Temple", "Lunch", "Market"):
+            response = _create_activity(
+                client, auth_headers, trip_id, name
+            )
+            assert response.status_code == 201
+        _create_activity(client, auth_headers, trip_id, "Train", 2)
+        assert _itinerary(client, auth_headers, trip_id) == [
+            (1, "Temple"), (1, "Lunch"), (1, "Market"), (2, "Train"),
+        ]
+
+    def test_create_day_outside_trip(self, client, auth_headers, trip_id):
+        """A day past the trip's end date is rejected."""
+        response = _create_activity(
+            client, auth_headers, trip_id, "Late", day_number=4
+        )
+        assert response.status_code == 422
+
+    def test_create_on_other_users_trip(
+        self, client, auth_headers, make_auth_headers, trip_id
+    ):
+        """Activities cannot be added to another user's trip."""
+        other = make_auth_headers("otheruser")
+        response = _create_activity(client, other, trip_id, "Sneaky")
+        assert response.status_code == 404
+
+
+class TestReorder:
+    """Tests for PATCH /api/v1/activities/reorder."""
+
+    def test_single_move_touches_one_row(self, client, auth_headers, trip_id):
+        """Moving one activity rewrites only its own key."""
+        ids = [
+            _create_activity(client, auth_headers, trip_id, name).json()[
+                "id"
+            ]
+            for name in ("A", "B", "C", "D")
+        ]
+        response = _reorder(client, auth_headers, trip_id, [
+            {"id": ids[3], "day_number": 1, "after_id": ids[0]},
+        ])
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()] == [ids[3]]
+        assert _itinerary(client, auth_headers, trip_id) == [
+            (1, "A"), (1, "D"), (1, "B"), (1, "C"),
+        ]
+
+    def test_bulk_moves_across_days(self, client, auth_headers, trip_id):
+        """Several moves apply in order within one request."""
+        ids = [
+            _create_activity(client, auth_headers, trip_id, name).json()[
+                "id"
+            ]
+            for name in ("A", "B", "C")
+        ]
+        response = _reorder(client, auth_headers, trip_id, [
+            {"id": ids[0], "day_number": 2, "after_id": None},
+            {"id": ids[2], "day_number": 1, "after_id": None},
+            {"id": ids[1], "day_number": 2, "after_id": ids[0]},
+        ])
+        assert response.status_code == 200
+        assert _itinerary(client, auth_headers, trip_id) == [
+            (1, "C"), (2, "A"), (2, "B"),
+        ]
+
+    def test_after_id_on_other_day(self, client, auth_headers, trip_id):
+        """after_id must be on the target day."""
+        first = _create_activity(
+            client, auth_headers, trip_id, "A"
+        ).json()["id"]
+        second = _create_activity(
+            client, auth_headers, trip_id, "B", 2
+        ).json()["id"]
+        response = _reorder(client, auth_headers, trip_id, [
+            {"id": first, "day_number": 3, "after_id": second},
+        ])
+        assert response.status_code == 422
+
+    def test_unknown_activity(self, client, auth_headers, trip_id):
+        """Moving an activity that is not on the trip returns 404."""
+        response = _reorder(client, auth_headers, trip_id, [
+            {"id": 999, "day_number": 1, "after_id": None},
+        ])
+        assert response.status_code == 404
+
+
+class TestActivityDetail:
+    """Tests for GET/PUT/DELETE /api/v1/activities/{id}."""
+
+    def test_update_day_appends(self, client, auth_headers, trip_id):
+        """Changing day_number appends the activity to the new day."""
+        moved = _create_activity(
+            client, auth_headers, trip_id, "A"
+        ).json()["id"]
+        _create_activity(client, auth_headers, trip_id, "B", 2)
+        response = client.put(
+            f"{ACTIVITIES}/{moved}",
+            json={"day_number": 2, "notes": "moved"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["notes"] == "moved"
+        assert _itinerary(client, auth_headers, trip_id) == [
+            (2, "B"), (2, "A"),
+        ]
+
+    @pytest.mark.parametrize("field", ["day_number", "name"])
+    def test_update_rejects_null(self, client, auth_headers, field, trip_id):
+        """A required field cannot be cleared with an explicit null."""
+        activity_id = _create_activity(
+            client, auth_headers, trip_id, "A"
+        ).json()["id"]
+        response = client.put(
+            f"{ACTIVITIES}/{activity_id}", json={field: None},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == f"{field} may not be null"
+        assert _itinerary(client, auth_headers, trip_id) == [(1, "A")]
+
+    def test_delete_and_ownership(
+        self, client, auth_headers, make_auth_headers, trip_id
+    ):
+        """Only the trip owner can read or delete an activity."""
+        activity_id = _create_activity(
+            client, auth_headers, trip_id, "A"
+        ).json()["id"]
+        url = f"{ACTIVITIES}/{activity_id}"
+        other = make_auth_headers("otheruser")
+        assert client.get(url, headers=other).status_code == 404
+        assert client.delete(url, headers=auth_headers).status_code == 204
+        assert client.get(url, headers=auth_headers).status_code == 404
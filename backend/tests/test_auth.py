@@ -1,4 +1,21 @@
 """Tests for authentication endpoints."""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, SessionLocal, engine
+from hashing import password_hasher
+from main import app
+from revocation import RevocationStore, revocation_store
+from router_auth import login_lookup
+from token_cache import token_cache
+from user import User
 
 
 def _register_user(client, **overrides):
@@ -65,6 +82,64 @@ class TestRegister:
             response.json()["detail"]
         )
 
+    def test_register_normalizes_email(self, client):
+        """Emails are stored lower-cased and trimmed."""
+        response = _register_user(client, email=" Test@Example.COM")
+        assert response.status_code == 201
+        assert response.json()["email"] == "test@example.com"
+
+    def test_register_duplicate_username_other_case(self, client):
+        """Usernames are unique regardless of case."""
+        _register_user(client)
+        response = _register_user(
+            client, email="other@example.com", username="TestUser"
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Username already taken"
+
+    def test_register_unrecognised_integrity_error(
+        self, client, monkeypatch, caplog
+    ):
+        """Other constraint violations give a generic 400, logged."""
+        async def scalar(self, statement, *args, **kwargs):
+            raise IntegrityError(
+                str(statement), {}, Exception("CHECK constraint failed")
+            )
+
+        monkeypatch.setattr(AsyncSession, "scalar", scalar)
+        response = _register_user(client)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "User already exists"
+        assert "CHECK constraint failed" in caplog.text
+
+    def test_register_username_with_at_sign(self, client):
+        """Usernames may not contain '@'."""
+        response = _register_user(client, username="a@b")
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_register_concurrent_duplicates(self):
+        """Parallel registrations of one email: exactly one wins."""
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/v1/auth/register", json={
+                    "email": "race@example.com",
+                    "username": f"racer{i}",
+                    "password": "securepassword123",
+                })
+                for i in range(5)
+            ))
+        statuses = sorted(r.status_code for r in responses)
+        assert statuses == [201, 400, 400, 400, 400]
+        assert all(
+            r.json()["detail"] == "Email already registered"
+            for r in responses
+            if r.status_code == 400
+        )
+
 
 class TestLogin:
     """Tests for POST /api/v1/auth/login."""
@@ -110,6 +185,192 @@ class TestLogin:
         assert "access_token" in data
         assert data["token_type"] == "bearer"
 
+    def test_login_case_insensitive(self, client):
+        """Username and email match regardless of case."""
+        _register_user(client)
+        assert _login_user(
+            client, username="TESTUSER"
+        ).status_code == 200
+        assert _login_user(
+            client, username="Test@Example.com"
+        ).status_code == 200
+
+    def test_login_hasher_saturated(self, client, monkeypatch):
+        """Login returns 503 when the hashing queue is full."""
+        _register_user(client)
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+        response = _login_user(client)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+
+def _refresh(client, refresh_token):
+    return client.post(
+        "/api/v1/auth/refresh",
+        json={"refresh_token": refresh_token},
+    )
+
+
+class TestRefresh:
+    """Tests for POST /api/v1/auth/refresh."""
+
+    def test_login_returns_refresh_token(self, client):
+        """Login issues a refresh token alongside the access token."""
+        _register_user(client)
+        data = _login_user(client).json()
+        assert data["refresh_token"]
+
+    def test_refresh_rotates_tokens(self, client):
+        """A refresh token yields a working access token and a new one."""
+        _register_user(client)
+        old_refresh = _login_user(client).json()["refresh_token"]
+
+        response = _refresh(client, old_refresh)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["refresh_token"] != old_refresh
+        me = client.get(
+            "/api/v1/auth/me",
+            headers={"Authorization": f"Bearer {data['access_token']}"},
+        )
+        assert me.status_code == 200
+
+    def test_refresh_token_single_use(self, client):
+        """Replaying a rotated refresh token is rejected."""
+        _register_user(client)
+        refresh_token = _login_user(client).json()["refresh_token"]
+        assert _refresh(client, refresh_token).status_code == 200
+        assert _refresh(client, refresh_token).status_code == 401
+
+    def test_refresh_reuse_detected_by_database(self, client):
+        """Another worker's rotation is caught by the revoked table."""
+        _register_user(client)
+        refresh_token = _login_user(client).json()["refresh_token"]
+        assert _refresh(client, refresh_token).status_code == 200
+        revocation_store.clear()  # simulate a worker that never saw it
+        assert _refresh(client, refresh_token).status_code == 401
+
+    def test_access_token_rejected_for_refresh(self, client):
+        """An access token cannot be used as a refresh token."""
+        _register_user(client)
+        access_token = _login_user(client).json()["access_token"]
+        assert _refresh(client, access_token).status_code == 401
+
+    def test_refresh_token_rejected_as_bearer(self, client):
+        """A refresh token cannot authenticate API requests."""
+        _register_user(client)
+        refresh_token = _login_user(client).json()["refresh_token"]
+        response = client.get(
+            "/api/v1/auth/me",
+            headers={"Authorization": f"Bearer {refresh_token}"},
+        )
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_purge_removes_expired(self):
+        """Purge drops expired revocations from memory and the table."""
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            await revocation_store.revoke(
+                db, "expired", now - timedelta(minutes=1)
+            )
+            await revocation_store.revoke(
+                db, "live", now + timedelta(minutes=1)
+            )
+            assert await revocation_store.purge(db) == 1
+        assert not revocation_store.is_revoked("expired")
+        assert revocation_store.is_revoked("live")
+
+    @pytest.mark.asyncio
+    async def test_load_keeps_only_recent_revocations(self):
+        """Startup loads as many recent JTIs as the cache holds."""
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            for minutes, jti in enumerate(("old", "newer", "newest")):
+                await revocation_store.revoke(
+                    db, jti, now + timedelta(minutes=minutes + 1)
+                )
+            store = RevocationStore(max_size=2)
+            assert await store.load(db) == 2
+            assert not store.is_revoked("old")
+            assert store.is_revoked("newer")
+            assert store.is_revoked("newest")
+            # Past the cache, the table still rejects the replay
+            assert await store.revoke(
+                db, "old", now + timedelta(minutes=1)
+            ) is False
+        assert store.is_revoked("old")
+
+    @pytest.mark.asyncio
+    async def test_failed_revoke_is_not_remembered(self, monkeypatch):
+        """A rotation whose commit fails can be retried."""
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+        async with AsyncSessionLocal() as db:
+            async def failing_commit():
+                raise OperationalError("COMMIT", {}, Exception("I/O"))
+
+            monkeypatch.setattr(db, "commit", failing_commit)
+            with pytest.raises(OperationalError):
+                await revocation_store.revoke(db, "retried", expires_at)
+            assert not revocation_store.is_revoked("retried")
+
+            monkeypatch.undo()
+            assert await revocation_store.revoke(
+                db, "retried", expires_at
+            ) is True
+            assert await revocation_store.revoke(
+                db, "retried", expires_at
+            ) is False
+        assert revocation_store.is_revoked("retried")
+
+
+def _compiled(statement):
+    return str(statement.compile(
+        engine, compile_kwargs={"literal_binds": True}
+    ))
+
+
+class TestLoginLookup:
+    """Login lookups are served by the lower() indexes."""
+
+    @pytest.mark.skipif(
+        engine.dialect.name != "sqlite", reason="SQLite query plan"
+    )
+    @pytest.mark.parametrize("identifier, index", [
+        ("Test@Example.com", "ix_users_email_lower"),
+        ("TestUser", "ix_users_username_lower"),
+    ])
+    def test_sqlite_plan_uses_index(self, identifier, index):
+        """EXPLAIN QUERY PLAN searches the matching lower() index."""
+        sql = _compiled(login_lookup(identifier))
+        with engine.connect() as conn:
+            plan = " ".join(
+                row[-1] for row in conn.execute(
+                    text("EXPLAIN QUERY PLAN " + sql)
+                )
+            )
+        assert f"USING INDEX {index}" in plan
+
+    @pytest.mark.skipif(
+        not os.environ["DATABASE_URL"].startswith("postgres"),
+        reason="requires a PostgreSQL DATABASE_URL",
+    )
+    @pytest.mark.parametrize("identifier, index", [
+        ("Test@Example.com", "ix_users_email_lower"),
+        ("TestUser", "ix_users_username_lower"),
+    ])
+    def test_postgres_plan_uses_index(self, identifier, index):
+        """EXPLAIN on PostgreSQL scans the matching lower() index."""
+        sql = _compiled(login_lookup(identifier))
+        with engine.connect() as conn:
+            # Tiny test tables would otherwise always be seq-scanned
+            conn.execute(text("SET enable_seqscan = off"))
+            plan = "\n".join(
+                row[0] for row in conn.execute(text("EXPLAIN " + sql))
+            )
+        assert index in plan
+        assert "BitmapOr" not in plan
+
 
 class TestGetMe:
     """Tests for GET /api/v1/auth/me."""
@@ -135,3 +396,33 @@ class TestGetMe:
         """Get current user without token returns 401."""
         response = client.get("/api/v1/auth/me")
         assert response.status_code == 401
+
+    def test_get_me_served_from_token_cache(self, client):
+        """Repeated requests with one token hit the token cache."""
+        _register_user(client)
+        token = _login_user(client).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        client.get("/api/v1/auth/me", headers=headers)
+        client.get("/api/v1/auth/me", headers=headers)
+        stats = token_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_get_me_deactivated_user(self, client):
+        """Deactivating a user invalidates their cached tokens."""
+        _register_user(client)
+        token = _login_user(client).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get(
+            "/api/v1/auth/me", headers=headers
+        ).status_code == 200
+
+        db = SessionLocal()
+        user = db.query(User).filter(User.username == "testuser").one()
+        user.is_active = False
+        db.commit()
+        db.close()
+
+        response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 401
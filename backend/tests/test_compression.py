@@ -0,0 +1,101 @@
+"""Tests for response compression."""
+import gzip
+
+import pytest
+
+from compression import accepted_encoding
+
+TRIPS = "/api/v1/trips"
+
+
+def _add_trips(create_trip, headers, count):
+    for i in range(count):
+        create_trip(headers, title=f"Trip {i}")
+
+
+class TestAcceptedEncoding:
+    """Tests for compression.accepted_encoding."""
+
+    def test_gzip(self):
+        assert accepted_encoding("gzip, deflate") == "gzip"
+        assert accepted_encoding("deflate;q=1.0, GZIP;q=0.5") == "gzip"
+
+    def test_refused_or_missing(self):
+        assert accepted_encoding("gzip;q=0") is None
+        assert accepted_encoding("gzip; q=0.000, identity") is None
+        assert accepted_encoding("") is None
+
+
+class TestCompressionMiddleware:
+    """Large JSON responses are compressed, small ones are not."""
+
+    def test_large_json_is_gzipped(self, client, auth_headers, create_trip):
+        _add_trips(create_trip, auth_headers, 20)
+        response = client.get(
+            TRIPS, params={"limit": 20},
+            headers={**auth_headers, "Accept-Encoding": "gzip"},
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert len(response.json()["items"]) == 20
+        # httpx decoded it; the wire size is the Content-Length
+        assert int(response.headers["content-length"]) < len(
+            response.content
+        ) / 3
+
+    def test_small_or_unaccepted_left_alone(
+        self, client, auth_headers, create_trip
+    ):
+        response = client.get(
+            "/health", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "content-encoding" not in response.headers
+        _add_trips(create_trip, auth_headers, 20)
+        response = client.get(
+            TRIPS, params={"limit": 20},
+            headers={**auth_headers, "Accept-Encoding": "identity"},
+        )
+        assert "content-encoding" not in response.headers
+
+    def test_cached_replays_compressed_each_time(
+        self, client, auth_headers, create_trip
+    ):
+        _add_trips(create_trip, auth_headers, 20)
+        headers = {**auth_headers, "Accept-Encoding": "gzip"}
+        first = client.get(TRIPS, params={"limit": 20}, headers=headers)
+        second = client.get(TRIPS, params={"limit": 20}, headers=headers)
+        assert second.headers["content-encoding"] == "gzip"
+        assert second.json() == first.json()
+        plain = client.get(
+            TRIPS, params={"limit": 20},
+            headers={**auth_headers, "Accept-Encoding": "identity"},
+        )
+        assert "content-encoding" not in plain.headers
+        assert plain.json() == first.json()
+
+    def test_stream_compressed_in_chunks(
+        self, client, auth_headers, create_trip
+    ):
+        _add_trips(create_trip, auth_headers, 3)
+        with client.stream(
+            "GET", f"{TRIPS}/export",
+            headers={**auth_headers, "Accept-Encoding": "gzip"},
+        ) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join(response.iter_raw())
+        lines = gzip.decompress(raw).splitlines()
+        assert len(lines) == 3
+
+    def test_brotli_preferred_when_installed(
+        self, client, auth_headers, create_trip
+    ):
+        brotli = pytest.importorskip("brotli")
+        _add_trips(create_trip, auth_headers, 20)
+        with client.stream(
+            "GET", TRIPS, params={"limit": 20},
+            headers={**auth_headers, "Accept-Encoding": "gzip, br"},
+        ) as response:
+            assert response.headers["content-encoding"] == "br"
+            raw = b"".join(response.iter_raw())
+        assert b'"Trip 19"' in brotli.decompress(raw)
@@ -0,0 +1,173 @@
+"""Tests for currency conversion and converted budgets."""
+import json
+import os
+import random
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+
+import pytest
+
+from config import settings
+from currency import (
+    CurrencyRates,
+    RateTable,
+    UnknownCurrencyError,
+    currency_rates,
+)
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RATES = {"EUR": Decimal("0.9215"), "JPY": Decimal("149.32"),
+         "KWD": Decimal("0.3071")}
+
+
+def _reference(amount, source, target, table_rates, places):
+    """Exact conversion with Decimal at high precision."""
+    rates = {**table_rates, "USD": Decimal(1)}
+    with localcontext() as ctx:
+        ctx.prec = 60
+        value = amount / rates[source] * rates[target]
+        return value.quantize(Decimal(1).scaleb(-places), ROUND_HALF_UP)
+
+
+class TestRateTable:
+    """Tests for RateTable."""
+
+    def test_batch_matches_exact_decimal(self):
+        table = RateTable.from_rates("USD", RATES)
+        rng = random.Random(7)
+        currencies = [rng.choice(table.codes) for _ in range(2000)]
+        amounts = [
+            Decimal(rng.randint(-10 ** 7, 10 ** 7)).scaleb(
+                -{"JPY": 0, "KWD": 3}.get(code, 2)
+            )
+            for code in currencies
+        ]
+        for target, places in (("EUR", 2), ("JPY", 0), ("KWD", 3)):
+            converted = table.convert(amounts, currencies, target)
+            assert converted == [
+                _reference(amount, code, target, RATES, places)
+                for amount, code in zip(amounts, currencies)
+            ]
+
+    def test_half_rounds_away_from_zero(self):
+        table = RateTable.from_rates("USD", {"XXH": Decimal("0.5")})
+        assert table.convert(
+            [Decimal("0.01"), Decimal("-0.01"), Decimal("0.03")],
+            ["USD"] * 3,
+            "XXH",
+        ) == [Decimal("0.01"), Decimal("-0.01"), Decimal("0.02")]
+
+    def test_unknown_currency(self):
+        table = RateTable.from_rates("USD", RATES)
+        with pytest.raises(UnknownCurrencyError):
+            table.convert([Decimal(1)], ["GBP"], "EUR")
+        with pytest.raises(ValueError):
+            RateTable.from_rates("USD", {"EUR": Decimal(0)})
+
+
+class TestCurrencyRates:
+    """Tests for loading and refreshing the snapshot file."""
+
+    def test_load_swaps_table_when_file_changes(self, tmp_path):
+        path = tmp_path / "rates.json"
+        rates = CurrencyRates(str(path))
+        assert rates.load() is False
+        assert rates.table.codes == ("USD",)
+
+        path.write_text(json.dumps({
+            "base": "USD", "as_of": "2026-10-01", "rates": {"EUR": "0.9"},
+        }))
+        assert rates.load() is True
+        first = rates.table
+        assert first.codes == ("EUR", "USD")
+        assert rates.load() is False
+
+        path.write_text("{not json")
+        os.utime(path, (0, 12345))
+        assert rates.load() is False
+        assert rates.table is first
+
+    def test_bundled_snapshot_is_the_default(self, monkeypatch):
+        monkeypatch.chdir(BACKEND)
+        assert currency_rates.path == settings.CURRENCY_RATES_FILE
+        rates = CurrencyRates(settings.CURRENCY_RATES_FILE)
+        assert rates.load() is True
+        assert rates.table.base == "USD"
+        assert {"EUR", "GBP", "JPY", "CHF"} <= set(rates.table.codes)
+
+
+class TestConvertedBudget:
+    """Tests for GET /api/v1/trips/{id}/budget?currency=..."""
+
+    def _trip_with_expenses(self, client, create_trip, headers):
+        trip_id = create_trip(headers).json()["id"]
+        for amount, currency, day in (
+            ("1000", "JPY", 1), ("10", "USD", 1), ("3", "GBP", 2),
+        ):
+            client.post("/api/v1/expenses", json={
+                "trip_id": trip_id, "amount": amount,
+                "currency": currency, "day_number": day,
+                "category": "food",
+            }, headers=headers)
+        return trip_id
+
+    def test_budget_converted_into_currency(
+        self, client, auth_headers, monkeypatch, create_trip
+    ):
+        monkeypatch.setattr(
+            currency_rates, "table",
+            RateTable.from_rates("USD", RATES, as_of="2026-10-01"),
+        )
+        trip_id = self._trip_with_expenses(client, create_trip, auth_headers)
+        response = client.get(
+            f"/api/v1/trips/{trip_id}/budget",
+            params={"currency": "EUR"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        converted = response.json()["converted"]
+        # 1000 JPY = 6.17 EUR, 10 USD = 9.22 EUR; GBP has no rate
+        assert converted["spent"] == {
+            "currency": "EUR", "total": 15.39, "count": 2,
+        }
+        assert converted["unconverted"] == ["GBP"]
+        assert converted["rates_as_of"] == "2026-10-01"
+        assert [
+            (day["day_number"], day["total"]) for day in converted["by_day"]
+        ] == [(1, 15.39)]
+
+    def test_budget_with_bundled_rates(
+        self, client, auth_headers, monkeypatch, create_trip
+    ):
+        monkeypatch.chdir(BACKEND)
+        rates = CurrencyRates(settings.CURRENCY_RATES_FILE)
+        rates.load()
+        monkeypatch.setattr(currency_rates, "table", rates.table)
+        trip_id = self._trip_with_expenses(client, create_trip, auth_headers)
+        for currency in ("USD", "EUR"):
+            converted = client.get(
+                f"/api/v1/trips/{trip_id}/budget",
+                params={"currency": currency},
+                headers=auth_headers,
+            ).json()["converted"]
+            assert converted["unconverted"] == []
+            assert converted["spent"]["count"] == 3
+
+    def test_budget_unknown_currency(
+        self, client, auth_headers, monkeypatch, create_trip
+    ):
+        monkeypatch.setattr(
+            currency_rates, "table", RateTable.from_rates("USD", RATES)
+        )
+        trip_id = self._trip_with_expenses(client, create_trip, auth_headers)
+        response = client.get(
+            f"/api/v1/trips/{trip_id}/budget",
+            params={"currency": "CHF"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == "No exchange rate for CHF"
+        plain = client.get(
+            f"/api/v1/trips/{trip_id}/budget", headers=auth_headers
+        ).json()
+        assert plain["converted"] is None
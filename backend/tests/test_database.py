@@ -0,0 +1,105 @@
+"""Tests for database engine configuration."""
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import NullPool
+
+from config import settings
+from database import (
+    TimedAsyncQueuePool,
+    TimedQueuePool,
+    async_database_url,
+    engine_options,
+)
+from metrics import MetricsRegistry, PoolMetrics
+
+PG_URL = "postgresql://user:pw@db/app"
+
+
+def test_async_database_url_postgres():
+    """PostgreSQL URLs are mapped onto asyncpg."""
+    assert async_database_url(
+        "postgresql://user:pw@db:5432/app"
+    ) == "postgresql+asyncpg://user:pw@db:5432/app"
+    assert async_database_url(
+        "postgres://user:pw@db/app"
+    ) == "postgresql+asyncpg://user:pw@db/app"
+
+
+def test_async_database_url_sqlite():
+    """SQLite URLs are mapped onto aiosqlite."""
+    assert async_database_url(
+        "sqlite:///test.db"
+    ) == "sqlite+aiosqlite:///test.db"
+
+
+def test_async_database_url_already_async():
+    """URLs that already name an async driver are left alone."""
+    url = "postgresql+asyncpg://user:pw@db/app"
+    assert async_database_url(url) == url
+
+
+def test_engine_options_sqlite():
+    """SQLite files get the timed pool without size settings."""
+    options = engine_options("sqlite:///test.db")
+    assert options["poolclass"] is TimedQueuePool
+    assert "pool_size" not in options
+    assert "poolclass" not in engine_options("sqlite://")
+
+
+def test_engine_options_queue(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 300)
+    monkeypatch.setattr(settings, "DB_POOL_USE_LIFO", True)
+    options = engine_options(PG_URL, asynchronous=True)
+    assert options["poolclass"] is TimedAsyncQueuePool
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is False
+    assert options["pool_recycle"] == 300
+    assert options["pool_use_lifo"] is True
+
+
+def test_engine_options_null(monkeypatch):
+    """NullPool mode for PgBouncer drops sizes and statement caches."""
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "null")
+    options = engine_options(PG_URL, asynchronous=True)
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert "connect_args" not in engine_options(PG_URL)
+
+
+def test_engine_options_bad_mode(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "bogus")
+    with pytest.raises(ValueError):
+        engine_options(PG_URL)
+
+
+def test_pool_metrics(tmp_path):
+    """Checkouts, waits and timeouts are reported."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    pool_metrics = PoolMetrics("test").attach(engine)
+    registry = MetricsRegistry()
+    registry.add_pool(pool_metrics)
+
+    with engine.connect():
+        assert pool_metrics.checked_out == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert pool_metrics.checked_out == 0
+    assert pool_metrics.connects == 1
+    assert pool_metrics.timeouts == 1
+    assert pool_metrics.checkout.count == 2
+    assert pool_metrics.checkout.sum >= 0.05
+
+    text = registry.render()
+    assert 'db_pool_size{pool="test"} 1' in text
+    assert 'db_pool_timeouts_total{pool="test"} 1' in text
+    engine.dispose()
+    assert pool_metrics.size == 1
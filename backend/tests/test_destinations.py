@@ -0,0 +1,110 @@
+"""Tests for destination autocomplete."""
+import os
+
+import pytest
+
+from destinations import DestinationIndex, destinations, normalize
+from response_cache import response_cache_stats
+
+BUNDLED = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "destinations.tsv",
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "destinations.tsv"
+    path.write_text(
+        "# name\tcountry\tpopularity\n"
+        "Paris\tFrance\t190\n"
+        "Parma\tItaly\t5\n"
+        "São Paulo\tBrazil\t35\n"
+        "Santiago\tChile\t25\n"
+        "San Sebastián\tSpain\t12\n"
+        "Barcelona\tSpain\t96\n",
+        encoding="utf-8",
+    )
+    index = DestinationIndex(str(path))
+    yield index
+    index.close()
+
+
+def _names(suggestions):
+    return [s.name for s in suggestions]
+
+
+class TestDestinationIndex:
+    """Tests for DestinationIndex.suggest."""
+
+    def test_normalize(self):
+        assert normalize("  São-Paulo ") == "sao paulo"
+        assert normalize("ZÜRICH") == "zurich"
+
+    def test_prefix_ranked_by_popularity(self, index):
+        assert [(s.name, s.fuzzy) for s in index.suggest("Par")] == [
+            ("Paris", False), ("Parma", False),
+            # "pau..." is one edit away ("bar..." would edit the first
+            # letter): it comes after the exact matches
+            ("São Paulo", True),
+        ]
+        assert _names(index.suggest("sa")) == [
+            "São Paulo", "Santiago", "San Sebastián",
+        ]
+        assert _names(index.suggest("sa", limit=1)) == ["São Paulo"]
+
+    def test_matches_any_word_once(self, index):
+        assert _names(index.suggest("paulo")) == ["São Paulo"]
+        # "san sebastian" and "sebastian" both match "s": listed once
+        names = _names(index.suggest("s", limit=20))
+        assert names.count("San Sebastián") == 1
+
+    def test_one_edit_fills_remaining_slots(self, index):
+        suggestions = index.suggest("barcleona")
+        assert [(s.name, s.fuzzy) for s in suggestions] == [
+            ("Barcelona", True),
+        ]
+        assert _names(index.suggest("sntiago")) == ["Santiago"]
+        assert _names(index.suggest("parus")) == ["Paris"]
+        assert index.suggest("xq") == []
+        assert index.suggest("madrid") == []
+
+    def test_empty_index(self):
+        assert DestinationIndex().suggest("paris") == []
+
+
+class TestSuggestEndpoint:
+    """Tests for GET /api/v1/destinations/suggest."""
+
+    def test_suggest(self, client, monkeypatch):
+        monkeypatch.setattr(destinations, "index", DestinationIndex(BUNDLED))
+        response = client.get(
+            "/api/v1/destinations/suggest", params={"q": "kyto", "limit": 3}
+        )
+        assert response.status_code == 200
+        assert response.json()[0] == {
+            "name": "Kyoto", "country": "Japan",
+            "popularity": 80, "fuzzy": True,
+        }
+        assert "max-age" in response.headers["cache-control"]
+        assert client.get(
+            "/api/v1/destinations/suggest", params={"q": ""}
+        ).status_code == 422
+
+    def test_shared_cache_headers_when_authenticated(
+        self, client, auth_headers, monkeypatch
+    ):
+        monkeypatch.setattr(destinations, "index", DestinationIndex(BUNDLED))
+        # Lets the response cache see the principal
+        client.get("/api/v1/trips", headers=auth_headers)
+        for _ in range(2):
+            response = client.get(
+                "/api/v1/destinations/suggest", params={"q": "kyo"},
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            assert response.headers["cache-control"].startswith(
+                "public, max-age="
+            )
+            assert "etag" not in response.headers
+        assert response_cache_stats.body_hits == 0
@@ -0,0 +1,183 @@
+"""Tests for expense endpoints and the budget rollups."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from budget import find_drift, rebuild_rollups
+from budget_rollup import BudgetRollup
+from database import init_engines
+
+EXPENSES = "/api/v1/expenses"
+
+
+def _create_expense(client, headers, trip_id, amount, **fields):
+    return client.post(EXPENSES, json={
+        "trip_id": trip_id, "amount": amount, **fields,
+    }, headers=headers)
+
+
+def _budget(client, headers, trip_id):
+    response = client.get(
+        f"/api/v1/trips/{trip_id}/budget", headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestExpenses:
+    """Tests for /api/v1/expenses."""
+
+    def test_create_and_list(self, client, auth_headers, create_trip):
+        trip_id = create_trip(auth_headers).json()["id"]
+        response = _create_expense(
+            client, auth_headers, trip_id, "12.50",
+            category=" Food ", day_number=1, currency="EUR",
+        )
+        assert response.status_code == 201
+        assert response.json()["category"] == "food"
+        listed = client.get(
+            EXPENSES, params={"trip_id": trip_id}, headers=auth_headers
+        ).json()
+        assert [e["amount"] for e in listed] == [12.5]
+
+    def test_create_validates_day_and_activity(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id = create_trip(auth_headers).json()["id"]
+        other_trip = create_trip(auth_headers).json()["id"]
+        activity_id = client.post("/api/v1/activities", json={
+            "trip_id": other_trip, "day_number": 1, "name": "Tram",
+        }, headers=auth_headers).json()["id"]
+        assert _create_expense(
+            client, auth_headers, trip_id, "5", day_number=5
+        ).status_code == 422
+        assert _create_expense(
+            client, auth_headers, trip_id, "5", activity_id=activity_id
+        ).status_code == 422
+        assert _create_expense(
+            client, auth_headers, trip_id, "5", currency="eur"
+        ).status_code == 422
+
+    def test_other_users_expense_not_found(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner = make_auth_headers("owner")
+        other = make_auth_headers("other")
+        trip_id = create_trip(owner).json()["id"]
+        expense_id = _create_expense(
+            client, owner, trip_id, "5"
+        ).json()["id"]
+        assert client.get(
+            f"{EXPENSES}/{expense_id}", headers=other
+        ).status_code == 404
+        assert client.delete(
+            f"{EXPENSES}/{expense_id}", headers=other
+        ).status_code == 404
+
+
+class TestBudget:
+    """Tests for GET /api/v1/trips/{id}/budget."""
+
+    def test_budget_by_currency_category_and_day(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id = create_trip(auth_headers, budget="500").json()["id"]
+        for amount, fields in (
+            ("10.10", {"category": "food", "day_number": 1}),
+            ("20.20", {"category": "food", "day_number": 1}),
+            ("100", {"category": "lodging", "day_number": 2}),
+            ("7", {"category": "food", "currency": "EUR"}),
+        ):
+            _create_expense(client, auth_headers, trip_id, amount, **fields)
+
+        budget = _budget(client, auth_headers, trip_id)
+        assert budget["planned"] == 500
+        assert budget["spent"] == [
+            {"currency": "EUR", "total": 7.0, "count": 1},
+            {"currency": "USD", "total": 130.3, "count": 3},
+        ]
+        assert [
+            (c["category"], c["currency"], c["total"])
+            for c in budget["by_category"]
+        ] == [
+            ("food", "EUR", 7.0),
+            ("food", "USD", 30.3),
+            ("lodging", "USD", 100.0),
+        ]
+        assert [
+            (d["day_number"], d["currency"], d["total"])
+            for d in budget["by_day"]
+        ] == [(None, "EUR", 7.0), (1, "USD", 30.3), (2, "USD", 100.0)]
+
+    def test_update_and_delete_keep_rollups_in_step(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id = create_trip(auth_headers).json()["id"]
+        first = _create_expense(
+            client, auth_headers, trip_id, "10", category="food"
+        ).json()["id"]
+        second = _create_expense(
+            client, auth_headers, trip_id, "15", category="food"
+        ).json()["id"]
+
+        response = client.put(f"{EXPENSES}/{first}", json={
+            "amount": "12", "category": "transport",
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        client.put(
+            f"{EXPENSES}/{second}", json={"amount": "20"},
+            headers=auth_headers,
+        )
+        budget = _budget(client, auth_headers, trip_id)
+        assert [
+            (c["category"], c["total"], c["count"])
+            for c in budget["by_category"]
+        ] == [("food", 20.0, 1), ("transport", 12.0, 1)]
+
+        assert client.delete(
+            f"{EXPENSES}/{second}", headers=auth_headers
+        ).status_code == 204
+        budget = _budget(client, auth_headers, trip_id)
+        assert [c["category"] for c in budget["by_category"]] == [
+            "transport"
+        ]
+        assert budget["spent"] == [
+            {"currency": "USD", "total": 12.0, "count": 1}
+        ]
+
+    def test_update_rejects_null_amount(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id = create_trip(auth_headers).json()["id"]
+        expense_id = _create_expense(
+            client, auth_headers, trip_id, "10"
+        ).json()["id"]
+        response = client.put(
+            f"{EXPENSES}/{expense_id}", json={"amount": None},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_drift_is_found_and_repaired(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id = create_trip(auth_headers).json()["id"]
+        for amount in ("4", "6"):
+            _create_expense(client, auth_headers, trip_id, amount)
+
+        async with init_engines().AsyncSessionLocal() as db:
+            assert await find_drift(db) == []
+            await db.execute(
+                update(BudgetRollup).values(total=Decimal("1"))
+            )
+            await db.commit()
+
+            (drift,) = await find_drift(db, trip_id)
+            assert drift.expected.total == Decimal("10.00")
+            assert drift.stored.total == Decimal("1.00")
+
+            await rebuild_rollups(db, trip_id)
+            await db.commit()
+            assert await find_drift(db) == []
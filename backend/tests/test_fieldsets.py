@@ -0,0 +1,53 @@
+"""Tests for ?fields= sparse fieldsets."""
+TRIPS = "/api/v1/trips"
+
+
+class TestSparseFieldsets:
+    """Tests for ?fields= on list and detail endpoints."""
+
+    def test_list_selects_and_returns_only_fields(
+        self, client, auth_headers, create_trip, count_statements
+    ):
+        create_trip(auth_headers, title="First")
+        create_trip(auth_headers, title="Second", start_date="2026-05-02")
+        with count_statements() as statements:
+            page = client.get(TRIPS, params={
+                "fields": "title, budget", "limit": 1,
+            }, headers=auth_headers).json()
+        assert page["items"] == [{"title": "First", "budget": 850.5}]
+        select = next(s for s in statements if "FROM trips" in s)
+        assert "trips.description" not in select
+        assert "trips.title" in select
+        # The cursor still works from the narrowed rows
+        page = client.get(TRIPS, params={
+            "fields": "title", "cursor": page["next_cursor"],
+        }, headers=auth_headers).json()
+        assert page["items"] == [{"title": "Second"}]
+
+    def test_detail_endpoints(self, client, auth_headers, create_trip):
+        trip = create_trip(auth_headers).json()
+        assert client.get(
+            f"{TRIPS}/{trip['id']}", params={"fields": "id,end_date"},
+            headers=auth_headers,
+        ).json() == {"id": trip["id"], "end_date": "2026-05-04"}
+        activity = client.post("/api/v1/activities", json={
+            "trip_id": trip["id"], "day_number": 1, "name": "Tram 28",
+            "cost": 3,
+        }, headers=auth_headers).json()
+        assert client.get(
+            f"/api/v1/activities/{activity['id']}",
+            params={"fields": "name,cost"}, headers=auth_headers,
+        ).json() == {"name": "Tram 28", "cost": 3.0}
+        assert client.get(
+            "/api/v1/activities",
+            params={"trip_id": trip["id"], "fields": "order_key"},
+            headers=auth_headers,
+        ).json() == [{"order_key": activity["order_key"]}]
+
+    def test_unknown_or_empty_fields(self, client, auth_headers):
+        for fields in ("title,password", " , "):
+            response = client.get(
+                TRIPS, params={"fields": fields}, headers=auth_headers
+            )
+            assert response.status_code == 422
+            assert "subset of: title" in response.json()["detail"]
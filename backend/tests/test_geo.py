@@ -0,0 +1,205 @@
+"""Tests for activity locations and spatial search."""
+import random
+
+from geo import (
+    GeoIndex,
+    box_ranges,
+    circle_ranges,
+    geo_key,
+    haversine_m,
+    in_box,
+)
+
+ACTIVITIES = "/api/v1/activities"
+
+# (name, latitude, longitude) around Kyoto station
+PLACES = [
+    ("Station", 34.9858, 135.7588),
+    ("Tower", 34.9875, 135.7594),
+    ("Higashi Honganji", 34.9913, 135.7584),
+    ("Kiyomizu-dera", 34.9949, 135.7850),
+    ("Kinkaku-ji", 35.0394, 135.7292),
+]
+
+
+def _in_ranges(key, ranges):
+    return any(lo <= key < hi for lo, hi in ranges)
+
+
+class TestCovers:
+    """Tests for geo keys and range covers."""
+
+    def test_circle_cover_contains_points_in_radius(self):
+        rng = random.Random(5)
+        for _ in range(300):
+            lat = rng.uniform(-85, 85)
+            lon = rng.uniform(-180, 180)
+            radius = rng.choice((50, 1000, 20000))
+            ranges = circle_ranges(lat, lon, radius)
+            for _ in range(20):
+                # A point up to ~radius away in a random direction
+                dlat = rng.uniform(-1, 1) * radius / 111_000
+                dlon = rng.uniform(-1, 1) * radius / 111_000
+                plat = max(-90.0, min(90.0, lat + dlat))
+                plon = (lon + dlon + 180) % 360 - 180
+                if haversine_m(lat, lon, plat, plon) <= radius:
+                    assert _in_ranges(geo_key(plat, plon), ranges)
+
+    def test_box_cover_crosses_antimeridian(self):
+        ranges = box_ranges(-20, 170, -10, -170)
+        for lat, lon in ((-15, 175), (-15, -175), (-10, 180), (-20, -180)):
+            assert in_box(lat, lon, -20, 170, -10, -170)
+            assert _in_ranges(geo_key(lat, lon), ranges)
+        assert not in_box(-15, 0, -20, 170, -10, -170)
+
+    def test_index_matches_brute_force(self):
+        rng = random.Random(11)
+        points = [
+            (rng.uniform(34.9, 35.1), rng.uniform(135.6, 135.9), i)
+            for i in range(2000)
+        ]
+        index = GeoIndex(points)
+        for _ in range(20):
+            lat, lon = rng.uniform(34.9, 35.1), rng.uniform(135.6, 135.9)
+            expected = sorted(
+                (haversine_m(lat, lon, plat, plon), i)
+                for plat, plon, i in points
+                if haversine_m(lat, lon, plat, plon) <= 2000
+            )
+            assert sorted(index.nearby(lat, lon, 2000)) == expected
+        assert sorted(index.within(35.0, 135.7, 35.05, 135.8)) == sorted(
+            i for plat, plon, i in points
+            if 35.0 <= plat <= 35.05 and 135.7 <= plon <= 135.8
+        )
+
+
+class TestLocationSearch:
+    """Tests for GET /api/v1/activities/nearby and /within."""
+
+    def _trip_with_places(
+        self, client, create_trip, headers, places=PLACES
+    ):
+        trip_id = create_trip(headers).json()["id"]
+        ids = {}
+        for name, lat, lon in places:
+            ids[name] = client.post(ACTIVITIES, json={
+                "trip_id": trip_id, "day_number": 1, "name": name,
+                "latitude": lat, "longitude": lon,
+            }, headers=headers).json()["id"]
+        client.post(ACTIVITIES, json={
+            "trip_id": trip_id, "day_number": 1, "name": "Unplaced",
+        }, headers=headers)
+        return trip_id, ids
+
+    def _nearby(self, client, headers, **params):
+        params = {"lat": 34.9858, "lon": 135.7588, **params}
+        return client.get(
+            f"{ACTIVITIES}/nearby", params=params, headers=headers
+        )
+
+    def test_nearby_nearest_first(self, client, auth_headers, create_trip):
+        trip_id, _ = self._trip_with_places(client, create_trip, auth_headers)
+        for params in ({}, {"trip_id": trip_id}):
+            response = self._nearby(client, auth_headers, **params)
+            assert response.status_code == 200
+            found = response.json()
+            assert [a["name"] for a in found] == [
+                "Station", "Tower", "Higashi Honganji",
+            ]
+            assert found[0]["distance_m"] == 0
+            assert 190 < found[1]["distance_m"] < 200
+        wide = self._nearby(client, auth_headers, radius=10000, limit=4)
+        assert [a["name"] for a in wide.json()][-1] == "Kiyomizu-dera"
+
+    def test_trip_index_follows_writes(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id, ids = self._trip_with_places(
+            client, create_trip, auth_headers
+        )
+        assert len(self._nearby(
+            client, auth_headers, trip_id=trip_id
+        ).json()) == 3
+        client.put(f"{ACTIVITIES}/{ids['Tower']}", json={
+            "latitude": 35.0394, "longitude": 135.7292,
+        }, headers=auth_headers)
+        client.delete(
+            f"{ACTIVITIES}/{ids['Station']}", headers=auth_headers
+        )
+        assert [a["name"] for a in self._nearby(
+            client, auth_headers, trip_id=trip_id
+        ).json()] == ["Higashi Honganji"]
+
+    def test_trip_index_follows_reorder(
+        self, client, auth_headers, create_trip
+    ):
+        trip_id, ids = self._trip_with_places(
+            client, create_trip, auth_headers
+        )
+        assert {a["day_number"] for a in self._nearby(
+            client, auth_headers, trip_id=trip_id
+        ).json()} == {1}
+        response = client.patch(f"{ACTIVITIES}/reorder", json={
+            "trip_id": trip_id,
+            "moves": [{"id": ids["Tower"], "day_number": 2}],
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        found = {
+            a["name"]: a["day_number"] for a in self._nearby(
+                client, auth_headers, trip_id=trip_id
+            ).json()
+        }
+        assert found["Tower"] == 2
+        assert found["Station"] == 1
+
+    def test_within_box(self, client, auth_headers, create_trip):
+        trip_id, _ = self._trip_with_places(client, create_trip, auth_headers)
+        response = client.get(f"{ACTIVITIES}/within", params={
+            "south": 34.98, "west": 135.75,
+            "north": 35.0, "east": 135.79,
+            "trip_id": trip_id,
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        assert sorted(a["name"] for a in response.json()) == [
+            "Higashi Honganji", "Kiyomizu-dera", "Station", "Tower",
+        ]
+
+    def test_only_own_activities(
+        self, client, auth_headers, make_auth_headers, create_trip
+    ):
+        trip_id, _ = self._trip_with_places(client, create_trip, auth_headers)
+        other = make_auth_headers("other")
+        assert self._nearby(client, other).json() == []
+        assert self._nearby(
+            client, other, trip_id=trip_id
+        ).status_code == 404
+
+    def test_shared_trips_searched(
+        self, client, auth_headers, make_auth_headers, create_trip
+    ):
+        trip_id, _ = self._trip_with_places(client, create_trip, auth_headers)
+        guest = make_auth_headers("guest")
+        assert self._nearby(client, guest).json() == []
+        client.put(f"/api/v1/trips/{trip_id}/shares", json={
+            "username": "guest", "permission": "viewer",
+        }, headers=auth_headers)
+        assert [a["name"] for a in self._nearby(client, guest).json()] == [
+            "Station", "Tower", "Higashi Honganji",
+        ]
+
+    def test_coordinates_validated(self, client, auth_headers, create_trip):
+        trip_id, ids = self._trip_with_places(
+            client, create_trip, auth_headers
+        )
+        response = client.post(ACTIVITIES, json={
+            "trip_id": trip_id, "day_number": 1, "name": "Half",
+            "latitude": 35.0,
+        }, headers=auth_headers)
+        assert response.status_code == 422
+        response = client.put(f"{ACTIVITIES}/{ids['Tower']}", json={
+            "latitude": None,
+        }, headers=auth_headers)
+        assert response.status_code == 422
+        assert self._nearby(
+            client, auth_headers, radius=10 ** 9
+        ).status_code == 422
@@ -0,0 +1,91 @@
+"""Tests for request metrics and the /metrics endpoint."""
+import pytest
+from sqlalchemy import text
+
+from database import SessionLocal
+from metrics import (
+    UNMATCHED_ROUTE,
+    Histogram,
+    collecting_stats,
+    current_stats,
+    metrics_registry,
+)
+from response_cache import response_cache_stats
+
+TRIPS = "/api/v1/trips"
+
+
+def test_metrics_endpoint(client):
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/health",status="200"} 1'
+        in response.text
+    )
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'db_pool_checked_out{pool="async"} 0' in response.text
+
+
+def test_routes_labelled_by_template(client, auth_headers, create_trip):
+    trip_id = create_trip(auth_headers).json()["id"]
+    client.get(f"{TRIPS}/{trip_id}", headers=auth_headers)
+    client.get("/no-such-page")
+
+    text = client.get("/metrics").text
+    assert 'route="/api/v1/trips/{trip_id}"' in text
+    assert f'route="{TRIPS}/{trip_id}"' not in text
+    assert metrics_registry.route("GET", UNMATCHED_ROUTE) is not None
+
+
+def test_sql_statements_counted(client, auth_headers, create_trip):
+    trip_id = create_trip(auth_headers).json()["id"]
+    client.get(f"{TRIPS}/{trip_id}", headers=auth_headers)
+
+    route = metrics_registry.route("GET", "/api/v1/trips/{trip_id}")
+    assert route.latency.count == 1
+    # The user comes from the token cache, leaving the load of their
+    # trip permissions (cached from then on) and the trip lookup
+    assert route.statements.sum == 2
+    assert route.db_seconds > 0
+    assert route.hash_seconds == 0
+
+
+def test_response_cache_shares_the_count(client, auth_headers, create_trip):
+    trip_id = create_trip(auth_headers).json()["id"]
+    path = f"{TRIPS}/{trip_id}"
+    client.get(path, headers=auth_headers)
+
+    route = metrics_registry.route("GET", "/api/v1/trips/{trip_id}")
+    assert response_cache_stats.estimated_queries(path) == (
+        route.statements.sum
+    )
+
+
+def test_statements_collected_without_middleware():
+    with collecting_stats() as stats:
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
+    assert stats.statements == 1
+    assert current_stats() is None
+
+
+def test_password_hash_time_recorded(client):
+    client.post("/api/v1/auth/register", json={
+        "email": "metrics@example.com",
+        "username": "metrics",
+        "password": "securepassword123",
+    })
+    route = metrics_registry.route("POST", "/api/v1/auth/register")
+    assert route.hash_seconds > 0
+
+
+def test_histogram_quantile():
+    hist = Histogram((0.1, 0.2, 0.4))
+    for value in (0.05, 0.15, 0.15, 0.3):
+        hist.observe(value)
+    assert hist.counts == [1, 2, 1, 0]
+    assert hist.quantile(0.5) == pytest.approx(0.15)
+    assert hist.quantile(1.0) == pytest.approx(0.4)
+    assert Histogram((1,)).quantile(0.9) == 0.0
@@ -0,0 +1,49 @@
+"""Tests for sparse activity ordering keys."""
+import random
+
+import pytest
+
+from ordering import GAP, key_between, plan_moves
+
+
+def test_key_between():
+    """Keys fall strictly between neighbours until the gap is used up."""
+    assert key_between(None, None) == GAP
+    assert key_between(GAP, None) == 2 * GAP
+    assert key_between(None, GAP) == 0
+    assert GAP < key_between(GAP, 2 * GAP) < 2 * GAP
+    assert key_between(5, 6) is None
+
+
+def test_plan_moves_matches_list_model():
+    """Random moves (many at one spot) keep the same order as a list."""
+    rng = random.Random(7)
+    rows = [(i, 1 + i % 3, (i // 3 + 1) * GAP) for i in range(30)]
+    model = {day: [i for i, d, _ in rows if d == day] for day in (1, 2, 3)}
+    moves = []
+    for _ in range(500):
+        activity_id = rng.randrange(30)
+        day = rng.choice((1, 2, 3))
+        for items in model.values():
+            if activity_id in items:
+                items.remove(activity_id)
+        after_id = model[day][0] if model[day] else None
+        model[day].insert(1 if after_id is not None else 0, activity_id)
+        moves.append((activity_id, day, after_id))
+
+    positions = {i: (d, k) for i, d, k in rows}
+    positions.update(plan_moves(rows, moves))
+    for day, expected in model.items():
+        ordered = sorted(
+            (key, i) for i, (d, key) in positions.items() if d == day
+        )
+        assert [i for _, i in ordered] == expected
+
+
+def test_plan_moves_errors():
+    """Unknown ids and cross-day anchors are rejected."""
+    rows = [(1, 1, GAP), (2, 2, GAP)]
+    with pytest.raises(KeyError):
+        plan_moves(rows, [(3, 1, None)])
+    with pytest.raises(ValueError):
+        plan_moves(rows, [(1, 1, 2)])
@@ -0,0 +1,119 @@
+"""Tests for the auth and write rate limits."""
+import pytest
+
+import router_auth
+from rate_limit import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    TokenBuckets,
+    rate_limits,
+)
+
+LOGIN = "/api/v1/auth/login"
+
+
+class TestTokenBuckets:
+    """Tests for rate_limit.TokenBuckets."""
+
+    def test_burst_then_refill(self):
+        buckets = TokenBuckets(per_minute=60, burst=3, max_keys=10)
+        assert [buckets.take("a", now=0) for _ in range(3)] == [0, 0, 0]
+        assert buckets.take("a", now=0) == pytest.approx(1)
+        assert buckets.take("b", now=0) == 0
+        # One token per second, never more than the burst
+        assert buckets.take("a", now=1.5) == 0
+        assert buckets.take("a", now=1.5) == pytest.approx(0.5)
+        for _ in range(3):
+            assert buckets.take("a", now=100) == 0
+        assert buckets.take("a", now=100) > 0
+
+    def test_keys_are_bounded(self):
+        buckets = TokenBuckets(per_minute=60, burst=1, max_keys=4)
+        for i in range(4):
+            buckets.take(str(i), now=0)
+        assert buckets.take("3", now=1) == 0
+        # Full again, so dropped: "0"-"2" behave as new keys anyway
+        buckets.take("new", now=1)
+        assert len(buckets) == 2
+        for i in range(100):
+            buckets.take(f"flood{i}", now=1)
+        assert len(buckets) <= 4
+
+
+class TestAuthRateLimits:
+    """Tests for the login and register limits."""
+
+    @pytest.fixture
+    def verify_calls(self, monkeypatch):
+        calls = []
+
+        async def verify(plain_password, hashed_password):
+            calls.append(plain_password)
+            return False
+
+        monkeypatch.setattr(router_auth, "verify_password_async", verify)
+        return calls
+
+    def _login(self, client, username):
+        return client.post(
+            LOGIN, data={"username": username, "password": "wrong"}
+        )
+
+    def test_login_rejected_before_hashing(
+        self, client, make_auth_headers, verify_calls
+    ):
+        make_auth_headers("victim")
+        statuses = [
+            self._login(client, "Victim").status_code for _ in range(5)
+        ]
+        assert statuses == [401] * 5
+        response = self._login(client, "victim ")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert len(verify_calls) == 5
+        # Other accounts can still be tried until the IP runs out
+        assert self._login(client, "someone").status_code == 401
+
+    def test_ip_limit_spans_usernames_and_register(
+        self, client, verify_calls
+    ):
+        for i in range(10):
+            assert self._login(client, f"user{i}").status_code == 401
+        assert self._login(client, "user10").status_code == 429
+        assert client.post("/api/v1/auth/register", json={
+            "email": "new@example.com",
+            "username": "new",
+            "password": "securepassword123",
+        }).status_code == 429
+
+    def test_shared_backend(self, client, monkeypatch, verify_calls):
+        monkeypatch.setattr(rate_limits, "backend", InMemoryRateLimitBackend())
+        for _ in range(5):
+            self._login(client, "victim")
+        # Another worker: fresh local buckets, same shared ones
+        rate_limits.clear()
+        assert self._login(client, "victim").status_code == 429
+
+    def test_disabled(self, client, monkeypatch, verify_calls):
+        monkeypatch.setattr(rate_limits, "enabled", False)
+        for _ in range(12):
+            assert self._login(client, "victim").status_code == 401
+
+
+class TestWriteRateLimit:
+    """Tests for the per-user limit on writes."""
+
+    def test_writes_limited_per_user(
+        self, client, auth_headers, make_auth_headers, monkeypatch, create_trip
+    ):
+        monkeypatch.setattr(
+            rate_limits, "write", RateLimiter("write", 60, 2)
+        )
+        statuses = [
+            create_trip(auth_headers).status_code for _ in range(3)
+        ]
+        assert statuses == [201, 201, 429]
+        assert client.get(
+            "/api/v1/trips", headers=auth_headers
+        ).status_code == 200
+        assert create_trip(make_auth_headers("other")).status_code == 201
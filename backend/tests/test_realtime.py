@@ -0,0 +1,138 @@
+"""Tests for live trip updates over WebSockets."""
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from realtime import (
+    CLOSE_ACCESS_REVOKED,
+    InProcessBroker,
+    TripHub,
+    change,
+)
+
+TRIPS = "/api/v1/trips"
+ACTIVITIES = "/api/v1/activities"
+
+
+def _hub(queue_size=8):
+    return TripHub(InProcessBroker(), batch_seconds=0.01,
+                   queue_size=queue_size)
+
+
+async def _drain(subscriber):
+    await asyncio.sleep(0.05)
+    items = []
+    while not subscriber.queue.empty():
+        items.append(subscriber.queue.get_nowait())
+    return items
+
+
+class TestTripHub:
+    """Batching, backpressure and closing in the hub."""
+
+    @pytest.mark.asyncio
+    async def test_bursts_are_coalesced(self):
+        hub = _hub()
+        subscriber = hub.subscribe(1, user_id=5)
+        await hub.publish(1, change("activity", 7, {"name": "Park"}))
+        await hub.publish(1, change("activity", 7, {"order_key": 2048}))
+        await hub.publish(1, change("activity", 8, {"name": "Cafe"}))
+        await hub.publish(1, change("activity", 8))
+        await hub.publish(2, change("activity", 9, {"name": "Elsewhere"}))
+
+        (message,) = await _drain(subscriber)
+        assert message == (
+            '{"type":"changes","trip_id":1,"changes":['
+            '{"entity":"activity","op":"upsert","id":7,'
+            '"data":{"name":"Park","order_key":2048}},'
+            '{"entity":"activity","op":"delete","id":8}]}'
+        )
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_gets_one_resync(self):
+        hub = _hub(queue_size=2)
+        subscriber = hub.subscribe(1, user_id=5)
+        for name in ("a", "b", "c"):
+            await hub.publish(1, change("trip", 1, {"title": name}))
+            await asyncio.sleep(0.03)
+
+        assert await _drain(subscriber) == [
+            '{"type":"resync","trip_id":1}'
+        ]
+        assert subscriber.resyncs == 1
+
+    @pytest.mark.asyncio
+    async def test_revoked_user_is_closed(self):
+        hub = _hub()
+        guest = hub.subscribe(1, user_id=5)
+        owner = hub.subscribe(1, user_id=4)
+        await hub.publish(1, change("share", 5))
+
+        assert (await _drain(guest))[-1] == CLOSE_ACCESS_REVOKED
+        assert len(await _drain(owner)) == 1
+        hub.unsubscribe(1, guest)
+        hub.unsubscribe(1, owner)
+        assert hub.stats() == {"trips": 0, "subscribers": 0}
+
+
+def _shared_trip(client, create_trip, make_auth_headers):
+    owner = make_auth_headers("owner")
+    guest = make_auth_headers("guest")
+    trip_id = create_trip(owner).json()["id"]
+    client.put(
+        f"{TRIPS}/{trip_id}/shares",
+        json={"username": "guest", "permission": "viewer"},
+        headers=owner,
+    )
+    return owner, guest, trip_id
+
+
+class TestTripSocket:
+    """The /ws/trips/{id} endpoint."""
+
+    def test_requires_token_and_access(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, _, trip_id = _shared_trip(
+            client, create_trip, make_auth_headers
+        )
+        stranger = make_auth_headers("stranger")
+        for headers in ({}, stranger):
+            with pytest.raises(WebSocketDisconnect) as refused:
+                with client.websocket_connect(
+                    f"/ws/trips/{trip_id}", headers=headers
+                ):
+                    pass
+            assert refused.value.code == 1008
+
+    def test_member_sees_edits_until_revoked(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, guest, trip_id = _shared_trip(
+            client, create_trip, make_auth_headers
+        )
+        token = guest["Authorization"].split()[1]
+        with client.websocket_connect(
+            f"/ws/trips/{trip_id}?token={token}"
+        ) as socket:
+            activity = client.post(ACTIVITIES, json={
+                "trip_id": trip_id, "day_number": 1, "name": "Alcazar",
+            }, headers=owner).json()
+            message = socket.receive_json()
+            assert message["type"] == "changes"
+            assert message["changes"] == [{
+                "entity": "activity", "op": "upsert",
+                "id": activity["id"], "data": activity,
+            }]
+
+            user_id = client.get(
+                f"{TRIPS}/{trip_id}/shares", headers=owner
+            ).json()[0]["user_id"]
+            client.delete(
+                f"{TRIPS}/{trip_id}/shares/{user_id}", headers=owner
+            )
+            assert socket.receive_json()["changes"][0]["op"] == "delete"
+            with pytest.raises(WebSocketDisconnect) as closed:
+                socket.receive_json()
+            assert closed.value.code == CLOSE_ACCESS_REVOKED
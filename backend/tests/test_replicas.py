@@ -0,0 +1,139 @@
+"""Tests for read-replica routing.
+
+The primary is the usual test database; "replicas" are separate SQLite
+files holding the same user but different trips, so each response shows
+which database served it.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+import database
+from database import Base, init_engines
+from replicas import ReplicaRouter
+from trip import Trip
+from user import User
+
+
+def _replica_file(path, trip_title):
+    """Create a replica database with tripuser and one trip."""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user = User(
+            email="tripuser@example.com",
+            username="tripuser",
+            hashed_password="not-a-bcrypt-hash",
+        )
+        db.add(user)
+        db.flush()
+        db.add(Trip(
+            title=trip_title,
+            destination="Replica",
+            start_date=date(2026, 5, 1),
+            end_date=date(2026, 5, 3),
+            user_id=user.id,
+        ))
+        db.commit()
+    engine.dispose()
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=NullPool
+    )
+
+
+@pytest.fixture
+def replicas(tmp_path, monkeypatch):
+    """Route reads to two replica files for the test."""
+    router = ReplicaRouter(
+        [
+            _replica_file(tmp_path / "one.db", "From replica one"),
+            _replica_file(tmp_path / "two.db", "From replica two"),
+        ],
+        sticky_seconds=60,
+    )
+    monkeypatch.setattr(
+        database, "_engines", init_engines()._replace(replicas=router)
+    )
+    return router
+
+
+def _titles(client, headers, **params):
+    response = client.get("/api/v1/trips", headers=headers, params=params)
+    assert response.status_code == 200
+    return [trip["title"] for trip in response.json()["items"]]
+
+
+class TestReplicaRouting:
+    """Reads go to replicas; writes and read-your-writes to the primary."""
+
+    def test_reads_round_robin_across_replicas(
+        self, client, auth_headers, replicas
+    ):
+        # Unknown token: authenticated (and served) by the primary
+        assert _titles(client, auth_headers) == []
+        assert _titles(client, auth_headers, limit=10) == [
+            "From replica one"
+        ]
+        assert _titles(client, auth_headers, limit=11) == [
+            "From replica two"
+        ]
+        assert _titles(client, auth_headers, limit=12) == [
+            "From replica one"
+        ]
+
+    def test_reads_stick_to_primary_after_write(
+        self, client, auth_headers, replicas
+    ):
+        _titles(client, auth_headers)
+        response = client.post("/api/v1/trips", headers=auth_headers, json={
+            "title": "Just written",
+            "destination": "Primary",
+            "start_date": "2026-06-01",
+            "end_date": "2026-06-02",
+        })
+        assert response.status_code == 201
+        assert _titles(client, auth_headers, limit=10) == ["Just written"]
+
+        replicas.sticky_seconds = 0
+        replicas._sticky_until.clear()
+        assert _titles(client, auth_headers, limit=11) == [
+            "From replica one"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_replica_is_skipped(self, tmp_path):
+        missing = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db",
+            poolclass=NullPool,
+        )
+        router = ReplicaRouter(
+            [_replica_file(tmp_path / "one.db", "From replica one"), missing],
+            sticky_seconds=60,
+        )
+        assert await router.check_health(timeout=2) == 1
+        healthy, down = router.replicas
+        assert not down.healthy
+        assert [router.reader(1) for _ in range(3)] == [healthy] * 3
+
+        healthy.mark(False)
+        assert router.reader(1) is None
+        assert router.reader(None) is None
+
+    def test_sticky_window_is_per_user(self):
+        router = ReplicaRouter(
+            [create_async_engine("sqlite+aiosqlite://")], sticky_seconds=60
+        )
+        router.record_write(1)
+        assert router.reader(1) is None
+        assert router.reader(2) is router.replicas[0]
+        assert router.reader(None) is router.replicas[0]
+
+    def test_no_replicas_uses_primary(self, client, auth_headers):
+        assert init_engines().replicas.replicas == []
+        assert _titles(client, auth_headers) == []
+        assert _titles(client, auth_headers, limit=10) == []
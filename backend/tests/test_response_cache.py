@@ -0,0 +1,100 @@
+"""Tests for ETag / If-None-Match handling."""
+from response_cache import response_cache_backend, response_cache_stats
+
+TRIPS = "/api/v1/trips"
+
+
+def _etag(client, headers, url=TRIPS):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_conditional_get_returns_304(client, auth_headers, create_trip):
+    """A matching If-None-Match is answered with 304 and no body."""
+    create_trip(auth_headers)
+    etag = _etag(client, auth_headers)
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        TRIPS, headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert response_cache_stats.not_modified == 1
+    assert response_cache_stats.bytes_saved > 0
+    assert response_cache_stats.queries_saved >= 1
+
+
+def test_304_runs_no_sql(client, auth_headers, create_trip, count_statements):
+    """Revalidation does not touch the database."""
+    create_trip(auth_headers)
+    etag = _etag(client, auth_headers)
+    with count_statements() as statements:
+        response = client.get(
+            TRIPS, headers={**auth_headers, "If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    assert statements == []
+
+
+def test_write_changes_etag(client, auth_headers, create_trip):
+    """A successful write invalidates the user's ETags."""
+    create_trip(auth_headers)
+    etag = _etag(client, auth_headers)
+    create_trip(auth_headers, title="Bergen")
+
+    response = client.get(
+        TRIPS, headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["items"]) == 2
+
+
+def test_cached_body_replayed(client, auth_headers, create_trip):
+    """An unchanged resource is replayed from the body cache."""
+    create_trip(auth_headers)
+    first = client.get(TRIPS, headers=auth_headers)
+    second = client.get(TRIPS, headers=auth_headers)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert response_cache_stats.body_hits == 1
+
+
+def test_users_do_not_share_cache(
+    client, auth_headers, make_auth_headers, create_trip
+):
+    """Cached bodies are keyed by user."""
+    create_trip(auth_headers)
+    other = make_auth_headers("otheruser")
+    client.get(TRIPS, headers=auth_headers)
+    client.get(TRIPS, headers=other)
+    response = client.get(TRIPS, headers=other)
+    assert response.json()["items"] == []
+
+
+def test_unauthenticated_requests_untouched(client):
+    """Requests without a cached principal get no ETag."""
+    response = client.get(TRIPS)
+    assert response.status_code == 401
+    assert "ETag" not in response.headers
+
+
+def test_etags_do_not_outlive_the_counters(client, auth_headers, create_trip):
+    """Counters that restart from zero do not revalidate old ETags."""
+    trip_id = create_trip(auth_headers, title="Old").json()["id"]
+    url = f"{TRIPS}/{trip_id}"
+    etag = _etag(client, auth_headers, url)
+
+    # As after a restart, or on another worker
+    response_cache_backend.clear()
+    client.put(url, json={"title": "New"}, headers=auth_headers)
+
+    response = client.get(
+        url, headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "New"
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,136 @@
+"""Tests for the day route optimizer."""
+import itertools
+import random
+
+from geo import haversine_m
+from routing import Stop, distance_matrix, optimize_route
+
+ACTIVITIES = "/api/v1/activities"
+
+
+def _path_length(stops, order):
+    return sum(
+        haversine_m(a.lat, a.lon, b.lat, b.lon)
+        for a, b in zip(
+            [stops[i] for i in order], [stops[i] for i in order[1:]]
+        )
+    )
+
+
+class TestOptimizeRoute:
+    """Tests for routing.optimize_route."""
+
+    def test_matrix_matches_haversine(self):
+        rng = random.Random(2)
+        points = [(rng.uniform(-60, 60), rng.uniform(-180, 180))
+                  for _ in range(30)]
+        matrix = distance_matrix(points)
+        for i, j in ((0, 1), (5, 17), (29, 3)):
+            assert abs(
+                matrix[i][j] - haversine_m(*points[i], *points[j])
+            ) < 1e-3
+            assert matrix[i][j] == matrix[j][i]
+
+    def test_points_on_a_line_are_visited_in_order(self):
+        stops = [Stop(35.0, 135.0 + 0.01 * i) for i in range(40)]
+        shuffled = list(range(40))
+        random.Random(3).shuffle(shuffled)
+        route = optimize_route([stops[i] for i in shuffled])
+        visited = [shuffled[i] for i in route.order]
+        assert visited in (list(range(40)), list(range(39, -1, -1)))
+
+    def test_close_to_optimal_on_small_days(self):
+        rng = random.Random(4)
+        for _ in range(10):
+            stops = [Stop(rng.uniform(35, 35.1), rng.uniform(135.7, 135.8))
+                     for _ in range(7)]
+            best = min(
+                _path_length(stops, order)
+                for order in itertools.permutations(range(7))
+            )
+            route = optimize_route(stops)
+            assert sorted(route.order) == list(range(7))
+            assert route.distance_m <= best * 1.1
+
+    def test_time_windows_are_respected(self):
+        # Walking at 4.5 km/h, 1.1 km per 0.01 degree of latitude
+        stops = [Stop(35.0 + 0.01 * i, 135.0) for i in range(6)]
+        # The far end opens at 10:30: only heading there right after the
+        # first stop reaches it in time
+        stops[5] = stops[5]._replace(opens=9 * 60 + 90)
+        route = optimize_route(stops, start=(35.0, 135.0), stay_minutes=10)
+        assert route.order == [0, 5, 4, 3, 2, 1]
+        assert sum(route.late) == 0
+        plain = optimize_route(
+            [s._replace(opens=None) for s in stops], start=(35.0, 135.0)
+        )
+        assert plain.order == [0, 1, 2, 3, 4, 5]
+
+
+class TestOptimizeDayEndpoint:
+    """Tests for POST /api/v1/trips/{id}/days/{n}/optimize."""
+
+    def _day(self, client, create_trip, headers):
+        trip_id = create_trip(headers, end_date="2026-05-02").json()["id"]
+        ids = {}
+        for name, lon in (("C", 12.50), ("A", 12.48), ("D", 12.51),
+                          ("B", 12.49)):
+            ids[name] = client.post(ACTIVITIES, json={
+                "trip_id": trip_id, "day_number": 1, "name": name,
+                "latitude": 41.9, "longitude": lon,
+            }, headers=headers).json()["id"]
+        ids["Unplaced"] = client.post(ACTIVITIES, json={
+            "trip_id": trip_id, "day_number": 1, "name": "Unplaced",
+        }, headers=headers).json()["id"]
+        return trip_id, ids
+
+    def _names(self, client, headers, trip_id):
+        return [a["name"] for a in client.get(
+            ACTIVITIES, params={"trip_id": trip_id}, headers=headers
+        ).json()]
+
+    def test_preview_then_apply(self, client, auth_headers, create_trip):
+        trip_id, ids = self._day(client, create_trip, auth_headers)
+        url = f"/api/v1/trips/{trip_id}/days/1/optimize"
+        preview = client.post(url, json={
+            "start_latitude": 41.9, "start_longitude": 12.47,
+        }, headers=auth_headers)
+        assert preview.status_code == 200
+        plan = preview.json()
+        assert [s["name"] for s in plan["stops"]] == ["A", "B", "C", "D"]
+        assert plan["unrouted"] == [ids["Unplaced"]]
+        assert plan["applied"] is False
+        assert plan["stops"][0]["arrival_minute"] > 9 * 60
+        assert abs(plan["distance_m"] - sum(
+            s["distance_m"] for s in plan["stops"]
+        )) < 1e-6
+        assert self._names(client, auth_headers, trip_id) == [
+            "C", "A", "D", "B", "Unplaced",
+        ]
+
+        applied = client.post(url, json={
+            "start_latitude": 41.9, "start_longitude": 12.47,
+            "apply": True,
+        }, headers=auth_headers)
+        assert applied.json()["applied"] is True
+        assert self._names(client, auth_headers, trip_id) == [
+            "A", "B", "C", "D", "Unplaced",
+        ]
+
+    def test_checks_trip_and_day(
+        self, client, auth_headers, make_auth_headers, create_trip
+    ):
+        trip_id, _ = self._day(client, create_trip, auth_headers)
+        for day in (3, 0, -1):
+            response = client.post(
+                f"/api/v1/trips/{trip_id}/days/{day}/optimize",
+                headers=auth_headers,
+            )
+            assert response.status_code == 422
+            assert response.json()["detail"] == (
+                "day_number must be between 1 and 2"
+            )
+        assert client.post(
+            f"/api/v1/trips/{trip_id}/days/1/optimize",
+            headers=make_auth_headers("other"),
+        ).status_code == 404
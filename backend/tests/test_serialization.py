@@ -0,0 +1,90 @@
+"""Tests for orjson responses and row encoding."""
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from main import app
+from schemas import ActivityResponse, ExpenseResponse, TripResponse
+from serialization import (
+    activity_row,
+    dumps,
+    expense_row,
+    trip_row,
+)
+
+ROWS = [
+    (trip_row, TripResponse, SimpleNamespace(
+        id=1, user_id=2, title="Kyoto", destination="Kyoto, Japan",
+        description=None, start_date=datetime(2026, 4, 1).date(),
+        end_date=datetime(2026, 4, 5).date(), budget=Decimal("1500.50"),
+        created_at=datetime(2026, 3, 1, 9, 30, 0, 123456, timezone.utc),
+    )),
+    (trip_row, TripResponse, SimpleNamespace(
+        id=3, user_id=2, title="Oslo", destination="Oslo, Norway",
+        description="Fjords", start_date=datetime(2026, 6, 1).date(),
+        end_date=datetime(2026, 6, 1).date(), budget=None,
+        created_at=datetime(2026, 3, 1, 9, 30),
+    )),
+    (activity_row, ActivityResponse, SimpleNamespace(
+        id=4, trip_id=1, order_key=1024, day_number=2, name="Temple",
+        start_time=time(9, 15), location=None, activity_type="sight",
+        cost=Decimal("12.00"), notes=None, latitude=35.0, longitude=135.7,
+    )),
+    (expense_row, ExpenseResponse, SimpleNamespace(
+        id=5, trip_id=1, activity_id=None, day_number=None,
+        amount=Decimal("0.10"), currency="JPY", category="food",
+        description="Tea",
+    )),
+]
+
+
+class TestRowEncoder:
+    """Rows encoded directly match the response models' JSON."""
+
+    def test_same_json_as_response_model(self):
+        for encode, model, row in ROWS:
+            expected = model.model_validate(row).model_dump_json()
+            assert dumps(encode(row)).decode() == expected
+
+    def test_unloaded_attributes_go_through_the_row(self):
+        class Expired:
+            # Attributes not in the instance __dict__, like expired ones
+            def __getattr__(self, name):
+                return getattr(ROWS[3][2], name)
+
+        assert expense_row(Expired()) == expense_row(ROWS[3][2])
+
+    def test_other_offsets_and_decimals(self):
+        moment = datetime(2026, 1, 1, 8, tzinfo=timezone(timedelta(hours=2)))
+        assert dumps({"at": moment, "total": Decimal("1.50")}) == (
+            b'{"at":"2026-01-01T08:00:00+02:00","total":"1.50"}'
+        )
+
+
+class TestListEndpoints:
+    """List endpoints keep their documented schemas."""
+
+    def test_openapi_response_models(self):
+        paths = app.openapi()["paths"]
+
+        def schema(path):
+            return paths[path]["get"]["responses"]["200"]["content"][
+                "application/json"
+            ]["schema"]
+
+        assert schema("/api/v1/trips")["$ref"].endswith("/TripPage")
+        assert schema("/api/v1/activities")["items"]["$ref"].endswith(
+            "/ActivityResponse"
+        )
+        assert schema("/api/v1/expenses")["items"]["$ref"].endswith(
+            "/ExpenseResponse"
+        )
+
+    def test_list_trips(self, client, auth_headers, create_trip):
+        create_trip(auth_headers, budget="1500.50")
+        response = client.get("/api/v1/trips", headers=auth_headers)
+        assert response.headers["content-type"] == "application/json"
+        page = response.json()
+        assert page["next_cursor"] is None
+        assert page["items"][0]["budget"] == 1500.5
+        TripResponse.model_validate(page["items"][0])
@@ -0,0 +1,184 @@
+"""Tests for trip sharing and the permission cache."""
+from permissions import PermissionCache, trip_permissions
+
+TRIPS = "/api/v1/trips"
+ACTIVITIES = "/api/v1/activities"
+EXPENSES = "/api/v1/expenses"
+
+
+def _setup(client, create_trip, make_auth_headers, permission=None):
+    owner = make_auth_headers("owner")
+    guest = make_auth_headers("guest")
+    trip_id = create_trip(owner).json()["id"]
+    if permission is not None:
+        response = client.put(
+            f"{TRIPS}/{trip_id}/shares",
+            json={"username": "guest", "permission": permission},
+            headers=owner,
+        )
+        assert response.status_code == 200
+    return owner, guest, trip_id
+
+
+class TestSharing:
+    """Owners share trips; viewers read and editors write."""
+
+    def test_unshared_trip_is_not_found(
+        self, client, make_auth_headers, create_trip
+    ):
+        _, guest, trip_id = _setup(client, create_trip, make_auth_headers)
+        assert client.get(
+            f"{TRIPS}/{trip_id}", headers=guest
+        ).status_code == 404
+        assert client.get(
+            ACTIVITIES, params={"trip_id": trip_id}, headers=guest
+        ).status_code == 404
+
+    def test_viewer_reads_but_cannot_write(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, guest, trip_id = _setup(
+            client, create_trip, make_auth_headers, "viewer"
+        )
+        activity = client.post(ACTIVITIES, json={
+            "trip_id": trip_id, "day_number": 1, "name": "Livraria",
+        }, headers=owner).json()
+
+        assert client.get(
+            f"{TRIPS}/{trip_id}/full", headers=guest
+        ).json()["days"][0]["activities"][0]["name"] == "Livraria"
+        assert client.get(
+            f"{ACTIVITIES}/{activity['id']}", params={"fields": "name"},
+            headers=guest,
+        ).json() == {"name": "Livraria"}
+        assert client.put(
+            f"{TRIPS}/{trip_id}", json={"title": "Mine"}, headers=guest
+        ).status_code == 403
+        assert client.delete(
+            f"{ACTIVITIES}/{activity['id']}", headers=guest
+        ).status_code == 403
+        assert client.post(EXPENSES, json={
+            "trip_id": trip_id, "amount": "5.00", "currency": "EUR",
+            "category": "food",
+        }, headers=guest).status_code == 403
+
+    def test_editor_writes_but_cannot_delete_or_reshare(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, guest, trip_id = _setup(
+            client, create_trip, make_auth_headers, "editor"
+        )
+        assert client.post(ACTIVITIES, json={
+            "trip_id": trip_id, "day_number": 2, "name": "Ribeira",
+        }, headers=guest).status_code == 201
+        assert client.put(
+            f"{TRIPS}/{trip_id}", json={"title": "Porto & Douro"},
+            headers=guest,
+        ).status_code == 200
+        assert client.delete(
+            f"{TRIPS}/{trip_id}", headers=guest
+        ).status_code == 403
+        assert client.get(
+            f"{TRIPS}/{trip_id}/shares", headers=guest
+        ).status_code == 403
+
+    def test_list_change_and_revoke(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, guest, trip_id = _setup(
+            client, create_trip, make_auth_headers, "viewer"
+        )
+        shared = client.get(f"{TRIPS}/shared", headers=guest).json()
+        assert [(t["id"], t["permission"]) for t in shared] == [
+            (trip_id, "viewer")
+        ]
+        # The guest's own trip list is unchanged
+        assert client.get(TRIPS, headers=guest).json()["items"] == []
+
+        client.put(
+            f"{TRIPS}/{trip_id}/shares",
+            json={"username": "guest", "permission": "editor"},
+            headers=owner,
+        )
+        shares = client.get(f"{TRIPS}/{trip_id}/shares", headers=owner)
+        assert [
+            (s["username"], s["permission"]) for s in shares.json()
+        ] == [("guest", "editor")]
+
+        user_id = shares.json()[0]["user_id"]
+        assert client.delete(
+            f"{TRIPS}/{trip_id}/shares/{user_id}", headers=owner
+        ).status_code == 204
+        assert client.get(
+            f"{TRIPS}/{trip_id}", headers=guest
+        ).status_code == 404
+        assert client.get(f"{TRIPS}/shared", headers=guest).json() == []
+        assert client.delete(
+            f"{TRIPS}/{trip_id}/shares/{user_id}", headers=owner
+        ).status_code == 404
+
+    def test_share_with_unknown_user_or_self(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, _, trip_id = _setup(client, create_trip, make_auth_headers)
+        for username, code in (("nobody", 404), ("owner", 422)):
+            assert client.put(
+                f"{TRIPS}/{trip_id}/shares",
+                json={"username": username, "permission": "viewer"},
+                headers=owner,
+            ).status_code == code
+
+    def test_member_writes_refresh_cached_reads(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, guest, trip_id = _setup(
+            client, create_trip, make_auth_headers, "editor"
+        )
+        first = client.get(f"{TRIPS}/{trip_id}", headers=owner)
+        client.put(
+            f"{TRIPS}/{trip_id}", json={"title": "Renamed"}, headers=guest
+        )
+        second = client.get(
+            f"{TRIPS}/{trip_id}",
+            headers={**owner, "If-None-Match": first.headers["etag"]},
+        )
+        assert second.status_code == 200
+        assert second.json()["title"] == "Renamed"
+
+    def test_deleted_trip_is_unshared(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, guest, trip_id = _setup(
+            client, create_trip, make_auth_headers, "viewer"
+        )
+        client.get(f"{TRIPS}/{trip_id}", headers=guest)
+        client.delete(f"{TRIPS}/{trip_id}", headers=owner)
+        assert client.get(f"{TRIPS}/shared", headers=guest).json() == []
+
+
+class TestPermissionCache:
+    """Per-user permission maps are cached and invalidated."""
+
+    def test_requests_reuse_the_map(
+        self, client, make_auth_headers, create_trip
+    ):
+        owner, _, trip_id = _setup(client, create_trip, make_auth_headers)
+        # Distinct paths, so none is replayed by the response cache
+        for path in ("", "/full", "/budget"):
+            client.get(f"{TRIPS}/{trip_id}{path}", headers=owner)
+        stats = trip_permissions.stats()
+        assert (stats["misses"], stats["hits"]) == (1, 2)
+
+    def test_stale_load_not_stored(self):
+        cache = PermissionCache(max_users=2, ttl_seconds=60)
+        generation = cache.generation
+        cache.invalidate_users([1])
+        cache.put(1, {7: "viewer"}, generation)
+        assert cache.get(1) is None
+
+    def test_bounded(self):
+        cache = PermissionCache(max_users=2, ttl_seconds=60)
+        for user_id in (1, 2, 3):
+            cache.put(user_id, {}, cache.generation)
+        assert cache.get(1) is None
+        assert cache.get(3) == {}
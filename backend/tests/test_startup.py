@@ -0,0 +1,60 @@
+"""Tests for lazy initialization and the startup lifespan."""
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from config import settings
+from hashing import load_backend
+from main import app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_is_side_effect_free(tmp_path):
+    """Importing the app loads no driver, jose or passlib, and no DB."""
+    db_file = tmp_path / "startup.db"
+    code = (
+        "import sys, database, main\n"
+        "assert database._engines is None\n"
+        "heavy = {'jose', 'passlib', 'aiosqlite', 'asyncpg'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+    )
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_file}",
+        "DEBUG": "false",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+    assert not db_file.exists()
+
+
+def test_lifespan_records_timings():
+    """The lifespan times each startup step; pool warm-up is off by default."""
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        timings = app.state.startup_timings
+    assert {"boot_cpu", "engines", "revocations"} <= set(timings)
+    assert "db_pool" not in timings
+
+
+def test_lifespan_warms_pool(monkeypatch):
+    """STARTUP_WARM_DB_POOL opens pool connections during startup."""
+    monkeypatch.setattr(settings, "STARTUP_WARM_DB_POOL", True)
+    with TestClient(app):
+        timings = app.state.startup_timings
+    assert "db_pool" in timings
+
+
+def test_load_backend():
+    """The bcrypt backend, left out of the import, loads on demand."""
+    assert load_backend() == "bcrypt"
@@ -0,0 +1,295 @@
+"""Tests for trip endpoints."""
+import json
+from decimal import Decimal
+
+import pytest
+
+from config import settings
+from database import SessionLocal
+from expense import Expense
+from tests.conftest import TRIP
+
+TRIPS = "/api/v1/trips"
+
+
+def _trip(**overrides):
+    return {**TRIP, **overrides}
+
+
+class TestCreateTrip:
+    """Tests for POST /api/v1/trips."""
+
+    def test_create_success(self, client, auth_headers, create_trip):
+        """Creating a trip returns 201 with the stored fields."""
+        response = create_trip(auth_headers)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["title"] == "Lisbon weekend"
+        assert data["start_date"] == "2026-05-01"
+        assert data["budget"] == 850.5
+        assert "id" in data and "user_id" in data
+
+    def test_create_end_before_start(self, client, auth_headers, create_trip):
+        """A trip ending before it starts is rejected."""
+        response = create_trip(auth_headers, end_date="2026-04-30")
+        assert response.status_code == 422
+
+    def test_create_requires_auth(self, client):
+        """Creating a trip without a token returns 401."""
+        assert client.post(TRIPS, json=_trip()).status_code == 401
+
+
+class TestListTrips:
+    """Tests for GET /api/v1/trips."""
+
+    def test_keyset_pagination(self, client, auth_headers, create_trip):
+        """Pages follow (start_date, id) order without gaps or repeats."""
+        for day in (5, 1, 3, 3, 2):
+            create_trip(
+                auth_headers,
+                start_date=f"2026-06-0{day}",
+                end_date="2026-06-09",
+            )
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get(
+                TRIPS, params=params, headers=auth_headers
+            ).json()
+            seen.extend(
+                (t["start_date"], t["id"]) for t in page["items"]
+            )
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 5
+        assert seen == sorted(seen)
+
+    def test_lists_only_own_trips(
+        self, client, auth_headers, make_auth_headers, create_trip
+    ):
+        """Other users' trips are not listed."""
+        create_trip(auth_headers)
+        other = make_auth_headers("otheruser")
+        page = client.get(TRIPS, headers=other).json()
+        assert page == {"items": [], "next_cursor": None}
+
+    def test_invalid_cursor(self, client, auth_headers):
+        """A malformed cursor returns 400."""
+        response = client.get(
+            TRIPS, params={"cursor": "not-a-cursor"}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
+
+class TestTripDetail:
+    """Tests for GET/PUT/DELETE /api/v1/trips/{id}."""
+
+    def test_get_update_delete(self, client, auth_headers, create_trip):
+        """A trip can be read, updated and deleted by its owner."""
+        trip_id = create_trip(auth_headers).json()["id"]
+        url = f"{TRIPS}/{trip_id}"
+
+        assert client.get(url, headers=auth_headers).json()["id"] == (
+            trip_id
+        )
+        response = client.put(
+            url, json={"title": "Porto instead"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["title"] == "Porto instead"
+        assert response.json()["destination"] == "Lisbon, Portugal"
+
+        assert client.delete(url, headers=auth_headers).status_code == 204
+        assert client.get(url, headers=auth_headers).status_code == 404
+
+    def test_other_users_trip_not_found(
+        self, client, auth_headers, make_auth_headers, create_trip
+    ):
+        """Another user's trip is reported as missing."""
+        trip_id = create_trip(auth_headers).json()["id"]
+        other = make_auth_headers("otheruser")
+        response = client.get(f"{TRIPS}/{trip_id}", headers=other)
+        assert response.status_code == 404
+
+    def test_update_end_before_start(self, client, auth_headers, create_trip):
+        """An update that inverts the dates is rejected."""
+        trip_id = create_trip(auth_headers).json()["id"]
+        response = client.put(
+            f"{TRIPS}/{trip_id}",
+            json={"end_date": "2026-04-01"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize(
+        "field", ["title", "destination", "start_date", "end_date"]
+    )
+    def test_update_rejects_null(
+        self, client, auth_headers, field, create_trip
+    ):
+        """A required field cannot be cleared with an explicit null."""
+        trip_id = create_trip(auth_headers).json()["id"]
+        response = client.put(
+            f"{TRIPS}/{trip_id}", json={field: None}, headers=auth_headers
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == f"{field} may not be null"
+        trip = client.get(f"{TRIPS}/{trip_id}", headers=auth_headers)
+        assert trip.json()["title"] == "Lisbon weekend"
+
+
+def _add_activities(client, headers, trip_id, count):
+    for n in range(count):
+        client.post("/api/v1/activities", json={
+            "trip_id": trip_id,
+            "day_number": 1 + n % 3,
+            "name": f"Activity {n}",
+        }, headers=headers)
+
+
+class TestTripFull:
+    """Tests for GET /api/v1/trips/{id}/full."""
+
+    def test_full_itinerary(self, client, auth_headers, create_trip):
+        """Activities come grouped by day, in order, with expenses."""
+        trip_id = create_trip(auth_headers).json()["id"]
+        _add_activities(client, auth_headers, trip_id, 5)
+        db = SessionLocal()
+        db.add(Expense(
+            trip_id=trip_id, amount=Decimal("12.50"), currency="EUR",
+            category="food", day_number=1,
+        ))
+        db.commit()
+        db.close()
+
+        response = client.get(
+            f"{TRIPS}/{trip_id}/full", headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["title"] == "Lisbon weekend"
+        assert [d["day_number"] for d in data["days"]] == [1, 2, 3]
+        assert [a["name"] for a in data["days"][0]["activities"]] == [
+            "Activity 0", "Activity 3",
+        ]
+        assert data["expenses"][0]["amount"] == 12.5
+        assert data["expenses"][0]["currency"] == "EUR"
+
+    def test_query_count_independent_of_size(
+        self, client, auth_headers, create_trip, count_statements
+    ):
+        """The number of SQL statements does not grow with activities."""
+        small = create_trip(auth_headers).json()["id"]
+        large = create_trip(auth_headers).json()["id"]
+        _add_activities(client, auth_headers, small, 2)
+        _add_activities(client, auth_headers, large, 20)
+
+        counts = []
+        for trip_id in (small, large):
+            with count_statements() as statements:
+                response = client.get(
+                    f"{TRIPS}/{trip_id}/full", headers=auth_headers
+                )
+            assert response.status_code == 200
+            counts.append(len(statements))
+        assert counts[0] == counts[1]
+        assert counts[1] <= 3
+
+    def test_full_other_users_trip(
+        self, client, auth_headers, make_auth_headers, create_trip
+    ):
+        """Another user's trip is reported as missing."""
+        trip_id = create_trip(auth_headers).json()["id"]
+        other = make_auth_headers("otheruser")
+        response = client.get(f"{TRIPS}/{trip_id}/full", headers=other)
+        assert response.status_code == 404
+
+
+def _ndjson(*trips):
+    return "".join(json.dumps(trip) + "\n" for trip in trips)
+
+
+class TestImportExport:
+    """Tests for POST /import and GET /export (NDJSON)."""
+
+    def _import(self, client, headers, body):
+        return client.post(
+            f"{TRIPS}/import",
+            content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+
+    def _export(self, client, headers):
+        response = client.get(f"{TRIPS}/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_import_then_export(self, client, auth_headers, monkeypatch):
+        """Trips round-trip with activity order kept across batches."""
+        monkeypatch.setattr(settings, "BULK_BATCH_ROWS", 2)
+        rome = _trip(title="Rome", start_date="2026-04-01",
+                     end_date="2026-04-03")
+        rome["activities"] = [
+            {"day_number": 2, "name": "Forum"},
+            {"day_number": 1, "name": "Colosseum", "cost": "18.00"},
+            {"day_number": 2, "name": "Pantheon"},
+        ]
+        body = _ndjson(_trip(title="Lisbon"), rome, _trip(title="Oslo"))
+        response = self._import(client, auth_headers, body)
+        assert response.status_code == 201
+        assert response.json() == {"trips": 3, "activities": 3}
+
+        exported = self._export(client, auth_headers)
+        assert [t["title"] for t in exported] == ["Lisbon", "Rome", "Oslo"]
+        assert exported[0]["activities"] == []
+        assert exported[0]["budget"] == "850.50"
+        assert [
+            (a["day_number"], a["name"]) for a in exported[1]["activities"]
+        ] == [(1, "Colosseum"), (2, "Forum"), (2, "Pantheon")]
+
+    def test_export_reimports(self, client, auth_headers):
+        """Exported lines can be imported again unchanged."""
+        trip = _trip(start_date="2026-04-01", end_date="2026-04-02")
+        trip["activities"] = [{"day_number": 1, "name": "Tram 28"}]
+        self._import(client, auth_headers, _ndjson(trip))
+        exported = self._export(client, auth_headers)
+
+        response = self._import(
+            client, auth_headers, _ndjson(*exported)
+        )
+        assert response.json() == {"trips": 1, "activities": 1}
+        assert self._export(client, auth_headers) == exported * 2
+
+    def test_invalid_line_rejects_import(self, client, auth_headers):
+        """One invalid line rejects the whole import, naming the line."""
+        body = _ndjson(_trip()) + "\n" + '{"title": ""}\n'
+        response = self._import(client, auth_headers, body)
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("Line 3:")
+        assert self._export(client, auth_headers) == []
+
+    def test_activity_outside_trip(self, client, auth_headers):
+        """Activities must fall on a day of their trip."""
+        trip = _trip(start_date="2026-04-01", end_date="2026-04-02")
+        trip["activities"] = [{"day_number": 3, "name": "Too late"}]
+        response = self._import(client, auth_headers, _ndjson(trip))
+        assert response.status_code == 422
+        assert "between 1 and 2" in response.json()["detail"]
+
+    def test_export_only_own_trips(
+        self, client, auth_headers, make_auth_headers
+    ):
+        """Users only export their own trips."""
+        self._import(client, auth_headers, _ndjson(_trip()))
+        other = make_auth_headers("otheruser")
+        assert self._export(client, other) == []
+
+    def test_requires_auth(self, client):
+        """Import and export need a signed-in user."""
+        assert client.get(f"{TRIPS}/export").status_code == 401
+        assert self._import(client, {}, "").status_code == 401
@@ -0,0 +1,69 @@
+"""Tests for the bounded, expiring LRU behind the in-process caches."""
+from ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(max_size=2, ttl_seconds=60):
+    clock = Clock()
+    return TTLCache(max_size, ttl_seconds, clock=clock), clock
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_entries_expire(self):
+        """Entries go after the TTL or an earlier expiry, if given."""
+        cache, clock = _cache()
+        cache.put("a", 1)
+        cache.put("b", 2, expires_at=clock.now + 10)
+        clock.now += 10
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        clock.now += 50
+        assert cache.get("a") is None
+        assert cache.stats() == {
+            "hits": 1, "misses": 2, "size": 0, "max_size": 2,
+        }
+
+    def test_least_recently_used_evicted(self):
+        """Reads refresh an entry's position; peeks do not."""
+        cache, _ = _cache()
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        assert cache.peek("b") == 2
+        cache.put("c", 3)
+        assert cache.peek("b") is None
+        assert (cache.peek("a"), cache.peek("c")) == (1, 3)
+        assert cache.stats()["hits"] == 1
+
+    def test_invalidate(self):
+        """Entries are dropped by key or by predicate."""
+        cache, _ = _cache(max_size=10)
+        for key in range(5):
+            cache.put(key, key * 10)
+        cache.invalidate(0)
+        assert cache.invalidate_where(lambda key, value: value > 20) == 2
+        assert len(cache) == 2
+
+    def test_prune(self):
+        """Expired entries can be dropped without being read."""
+        cache, clock = _cache()
+        cache.put("a", 1, expires_at=clock.now + 1)
+        cache.put("b", 2)
+        clock.now += 1
+        assert cache.prune() == 1
+        assert len(cache) == 1
+
+    def test_zero_size_disables(self):
+        """A cache of size 0 stores nothing."""
+        cache, _ = _cache(max_size=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
@@ -0,0 +1,59 @@
+"""In-process cache of verified access tokens.
+
+``get_current_user`` would otherwise decode the JWT and query the users
+table on every authenticated request. Verified tokens are cached here as
+immutable ``Principal`` snapshots, bounded in size (LRU) and never kept
+past the token's own ``exp`` claim or ``TOKEN_CACHE_TTL_SECONDS``.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from config import settings
+from ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated user."""
+
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+
+class TokenCache(TTLCache[str, Principal]):
+    """Token -> Principal, each kept until its ``exp`` at the latest.
+
+    ``put``'s third argument is the token's ``exp`` claim.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        super().__init__(max_size, ttl_seconds, clock=time.time)
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every cached token for a user; returns how many."""
+        return self.invalidate_where(
+            lambda _, principal: principal.id == user_id
+        )
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
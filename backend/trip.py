@@ -0,0 +1,53 @@
+from sqlalchemy import (Column, Date, DateTime, ForeignKey, Index, Integer,
+                        Numeric, String, Text)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from database import Base
+import activity  # noqa: F401 — relationship targets
+import expense  # noqa: F401
+import budget_rollup  # noqa: F401
+
+
+class Trip(Base):
+    """Trip model owned by a user"""
+
+    __tablename__ = "trips"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"),
+                     nullable=False)
+    title = Column(String(255), nullable=False)
+    destination = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    budget = Column(Numeric(12, 2), nullable=True)
+
+    created_at = Column(DateTime(timezone=True),
+                        server_default=func.now())
+    updated_at = Column(DateTime(timezone=True),
+                        server_default=func.now(), onupdate=func.now())
+
+    # lazy="raise": itinerary loads must opt in with selectinload, and
+    # deletes rely on the database's ON DELETE CASCADE
+    activities = relationship(
+        "Activity",
+        lazy="raise",
+        passive_deletes=True,
+        order_by="(Activity.day_number, Activity.order_key)",
+    )
+    expenses = relationship(
+        "Expense",
+        lazy="raise",
+        passive_deletes=True,
+        order_by="Expense.id",
+    )
+
+    __table_args__ = (
+        # Keyset pagination of a user's trips: (user_id, start_date, id)
+        Index("ix_trips_user_start_id", "user_id", "start_date", "id"),
+    )
+
+    def __repr__(self):
+        return (f"<Trip(id={self.id}, user_id={self.user_id}, "
+                f"title={self.title})>")
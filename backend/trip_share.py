@@ -0,0 +1,32 @@
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer,
+                        String)
+from sqlalchemy.sql import func
+from database import Base
+
+
+class TripShare(Base):
+    """Access to a trip granted by its owner to another user"""
+
+    __tablename__ = "trip_shares"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"),
+                     primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"),
+                     primary_key=True)
+    # "viewer" or "editor"; owners are not listed (see permissions.py)
+    permission_level = Column(String(10), nullable=False)
+
+    created_at = Column(DateTime(timezone=True),
+                        server_default=func.now())
+
+    __table_args__ = (
+        # A user's permission map is loaded by user_id (the primary key
+        # serves lookups by trip)
+        Index("ix_trip_shares_user_trip", "user_id", "trip_id",
+              "permission_level"),
+    )
+
+    def __repr__(self):
+        return (f"<TripShare(trip_id={self.trip_id}, "
+                f"user_id={self.user_id}, "
+                f"permission_level={self.permission_level})>")
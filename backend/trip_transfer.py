@@ -0,0 +1,204 @@
+"""Bulk trip import and export as NDJSON (one ``TripTransfer`` per line).
+
+Both directions stream: an import validates one line at a time and
+writes in batches of about ``BULK_BATCH_ROWS`` rows (one multi-row
+``INSERT ... RETURNING`` for the trips, one executemany for their
+activities), and an export walks a trip/activity join with a server-side
+cursor, emitting each trip as soon as its last activity has been read.
+Memory stays bounded by one batch or one trip either way.
+"""
+from collections import defaultdict
+from typing import AsyncIterable, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from activity import Activity
+from geo import geo_key
+from ordering import GAP
+from schemas import ActivityBase, ImportSummary, TripTransfer
+from trip import Trip
+
+# Longest accepted NDJSON line (one trip with all its activities)
+MAX_LINE_BYTES = 4 * 1024 * 1024
+# Export lines are sent in chunks of about this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+TRIP_COLUMNS = [
+    Trip.id, Trip.title, Trip.destination, Trip.description,
+    Trip.start_date, Trip.end_date, Trip.budget,
+]
+ACTIVITY_COLUMNS = [
+    Activity.day_number, Activity.name, Activity.start_time,
+    Activity.location, Activity.activity_type, Activity.cost,
+    Activity.notes, Activity.latitude, Activity.longitude,
+]
+
+
+class ImportLineError(ValueError):
+    """A line of an import could not be parsed or validated."""
+
+    def __init__(self, line_number: int, message: str):
+        super().__init__(f"Line {line_number}: {message}")
+        self.line_number = line_number
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into numbered, non-blank lines."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > max_line_bytes:
+            raise ImportLineError(
+                line_number + 1, f"longer than {max_line_bytes} bytes"
+            )
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        ".".join(str(part) for part in error["loc"]) + ": " + error["msg"]
+        if error["loc"] else error["msg"]
+        for error in exc.errors()[:3]
+    )
+
+
+def _activity_rows(
+    trip_id: int, activities: List[ActivityBase]
+) -> List[dict]:
+    """Insert rows keeping list order within each day."""
+    next_key: Dict[int, int] = defaultdict(int)
+    rows = []
+    for activity in activities:
+        next_key[activity.day_number] += GAP
+        rows.append({
+            **activity.model_dump(),
+            "trip_id": trip_id,
+            "order_key": next_key[activity.day_number],
+            "geo_key": geo_key(activity.latitude, activity.longitude),
+        })
+    return rows
+
+
+async def _flush(
+    db: AsyncSession, user_id: int, batch: List[TripTransfer]
+) -> int:
+    """Insert a batch of trips and their activities; returns activities."""
+    trip_ids = (await db.scalars(
+        insert(Trip).returning(Trip.id, sort_by_parameter_order=True),
+        [
+            {**trip.model_dump(exclude={"activities"}), "user_id": user_id}
+            for trip in batch
+        ],
+    )).all()
+    activity_rows = [
+        row
+        for trip_id, trip in zip(trip_ids, batch)
+        for row in _activity_rows(trip_id, trip.activities)
+    ]
+    if activity_rows:
+        await db.execute(insert(Activity), activity_rows)
+    return len(activity_rows)
+
+
+async def import_trips(
+    db: AsyncSession,
+    user_id: int,
+    lines: AsyncIterable[Tuple[int, bytes]],
+    batch_rows: int,
+) -> ImportSummary:
+    """Validate and insert every line; the caller commits.
+
+    Raises ``ImportLineError`` for the first invalid line.
+    """
+    summary = ImportSummary(trips=0, activities=0)
+    batch: List[TripTransfer] = []
+    pending_rows = 0
+    async for line_number, line in lines:
+        try:
+            trip = TripTransfer.model_validate_json(line)
+        except ValidationError as exc:
+            raise ImportLineError(line_number, _describe(exc))
+        batch.append(trip)
+        pending_rows += 1 + len(trip.activities)
+        if pending_rows >= batch_rows:
+            summary.activities += await _flush(db, user_id, batch)
+            summary.trips += len(batch)
+            batch, pending_rows = [], 0
+    if batch:
+        summary.activities += await _flush(db, user_id, batch)
+        summary.trips += len(batch)
+    return summary
+
+
+def export_query(user_id: int):
+    """A user's trips joined to their activities, in itinerary order."""
+    return (
+        select(*TRIP_COLUMNS, *ACTIVITY_COLUMNS)
+        .outerjoin(Activity, Activity.trip_id == Trip.id)
+        .where(Trip.user_id == user_id)
+        .order_by(Trip.id, Activity.day_number, Activity.order_key)
+    )
+
+
+def _line(trip_row, activity_rows) -> bytes:
+    """Serialize one trip and its activities without re-validation."""
+    trip = TripTransfer.model_construct(
+        **{column.key: value for column, value in zip(
+            TRIP_COLUMNS[1:], trip_row[1:len(TRIP_COLUMNS)]
+        )},
+        activities=[
+            ActivityBase.model_construct(**{
+                column.key: value for column, value in zip(
+                    ACTIVITY_COLUMNS, row[len(TRIP_COLUMNS):]
+                )
+            })
+            for row in activity_rows
+        ],
+    )
+    return trip.model_dump_json().encode() + b"\n"
+
+
+async def export_trips(
+    db: AsyncSession, user_id: int, batch_rows: int
+) -> AsyncIterator[bytes]:
+    """Yield a user's trips as NDJSON, streaming the join.
+
+    Lines are grouped into chunks of about ``EXPORT_CHUNK_BYTES``.
+    """
+    result = await db.stream(
+        export_query(user_id).execution_options(yield_per=batch_rows)
+    )
+    trip_row = None
+    activity_rows: list = []
+    chunk: List[bytes] = []
+    chunk_size = 0
+    # Whole partitions at a time: per-row async iteration is much slower
+    async for partition in result.partitions():
+        for row in partition:
+            if trip_row is None or row.id != trip_row.id:
+                if trip_row is not None:
+                    line = _line(trip_row, activity_rows)
+                    chunk.append(line)
+                    chunk_size += len(line)
+                trip_row, activity_rows = row, []
+            # Outer join: a trip without activities has a NULL name
+            if row.name is not None:
+                activity_rows.append(row)
+        if chunk_size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(chunk)
+            chunk, chunk_size = [], 0
+    if trip_row is not None:
+        chunk.append(_line(trip_row, activity_rows))
+    if chunk:
+        yield b"".join(chunk)
@@ -0,0 +1,130 @@
+"""Bounded in-process LRU whose entries expire.
+
+Backs the caches that front the database per process: verified tokens
+(``token_cache``), permission maps (``permissions``), per-trip geo
+indexes (``geo``) and recently revoked refresh tokens (``revocation``).
+Entries live at most ``ttl_seconds``, or less when ``put`` is given an
+earlier expiry; the least recently used one is evicted past
+``max_size``. A ``max_size`` of 0 disables the cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU of key -> value with per-entry expiry.
+
+    ``clock`` is the time base of ``put``'s ``expires_at``: wall-clock
+    time for expiries that come from outside (JWT ``exp`` claims),
+    monotonic otherwise.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        """Return the cached value, if still fresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= self.clock():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: K) -> Optional[V]:
+        """Like ``get`` but without touching LRU order or counters."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= self.clock():
+            return None
+        return entry[0]
+
+    def put(
+        self, key: K, value: V, expires_at: Optional[float] = None
+    ) -> None:
+        """Cache ``value`` until ``expires_at`` or the TTL ends."""
+        if self.max_size <= 0:
+            return
+        deadline = self.clock() + self.ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._entries[key] = (value, deadline)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Drop ``key`` if cached."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[K, V], bool]) -> int:
+        """Drop every entry matching ``predicate``; returns how many."""
+        with self._lock:
+            stale = [
+                key
+                for key, (value, _) in self._entries.items()
+                if predicate(key, value)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def prune(self) -> int:
+        """Drop expired entries now; returns how many."""
+        now = self.clock()
+        with self._lock:
+            expired = [
+                key
+                for key, (_, deadline) in self._entries.items()
+                if deadline <= now
+            ]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size, for sizing the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
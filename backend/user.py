@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -22,6 +22,14 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True),
                         server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Case-insensitive uniqueness and login lookups
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index(
+            "ix_users_username_lower", func.lower(username), unique=True
+        ),
+    )
+
     def __repr__(self):
         return (f"<User(id={self.id}, username={self.username}, "
                 f"email={self.email})>")